@@ -6,15 +6,27 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
-from homeassistant.config_entries import ConfigEntry
+from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.data_entry_flow import FlowResultType
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 import voluptuous as vol
 
+from .core.bus_trace import TRACE_DEFAULT_DURATION, TRACE_MAX_DURATION
 from .const import DOMAIN
 from .coordinator import MideaModbusCoordinator
+from .metrics_view import async_setup_metrics_view
 from .profile_manager import ProfileManager
+from .provisioning import (
+    DEFAULT_MAX_CONCURRENT,
+    FleetRowError,
+    async_validate_fleet,
+    build_row_config,
+    parse_fleet,
+)
+from .websocket_api import async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,9 +39,14 @@ PLATFORMS: list[Platform] = [
     Platform.SELECT,
 ]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 # Service schemas
 SERVICE_EXPORT_PROFILE = "export_profile"
 SERVICE_IMPORT_PROFILE = "import_profile"
+SERVICE_IMPORT_FLEET = "import_fleet"
+SERVICE_START_TRACE = "start_trace"
+SERVICE_STOP_TRACE = "stop_trace"
 
 EXPORT_PROFILE_SCHEMA = vol.Schema({
     vol.Optional("entry_id"): cv.string,
@@ -41,6 +58,118 @@ IMPORT_PROFILE_SCHEMA = vol.Schema({
     vol.Required("profile_json"): cv.string,
 })
 
+START_TRACE_SCHEMA = vol.Schema({
+    vol.Optional("entry_id"): cv.string,
+    vol.Optional("duration", default=TRACE_DEFAULT_DURATION): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=TRACE_MAX_DURATION)
+    ),
+})
+
+STOP_TRACE_SCHEMA = vol.Schema({
+    vol.Optional("entry_id"): cv.string,
+})
+
+IMPORT_FLEET_SCHEMA = vol.Schema({
+    vol.Required("fleet"): cv.string,
+    vol.Optional("validate", default=True): cv.boolean,
+    vol.Optional("max_concurrent", default=DEFAULT_MAX_CONCURRENT): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=32)
+    ),
+})
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Midea Heat Pump Water Heater component."""
+    # Websocket commands and the metrics view are domain-wide, register them once
+    async_setup_websocket_api(hass)
+    async_setup_metrics_view(hass)
+
+    # Fleet import must work before any heater is configured
+    async def handle_import_fleet(call: ServiceCall) -> None:
+        """Handle fleet import service call."""
+        await _async_import_fleet(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_FLEET,
+        handle_import_fleet,
+        schema=IMPORT_FLEET_SCHEMA,
+    )
+    return True
+
+
+async def _async_import_fleet(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Create config entries for every row of a CSV/YAML fleet list."""
+    notification_id = f"midea_fleet_import_{datetime.now():%Y%m%d%H%M%S}"
+    try:
+        rows = parse_fleet(call.data["fleet"])
+    except Exception as err:
+        _LOGGER.error("Invalid fleet list: %s", err)
+        await hass.services.async_call(
+            "persistent_notification",
+            "create",
+            {
+                "title": "❌ Fleet Import Failed",
+                "message": f"The fleet list could not be parsed: {err}",
+                "notification_id": notification_id,
+            }
+        )
+        return
+
+    profile_manager = ProfileManager(hass)
+    profiles = await hass.async_add_executor_job(profile_manager.get_available_profiles)
+
+    # Row index -> outcome; rows with a config still need validation/creation
+    outcomes: dict[int, str] = {}
+    configs: dict[int, dict] = {}
+    for index, row in enumerate(rows):
+        try:
+            configs[index] = build_row_config(profile_manager, profiles, row)
+        except FleetRowError as err:
+            outcomes[index] = f"❌ {err}"
+
+    if call.data["validate"] and configs:
+        indexes = list(configs)
+        # Gateways already polled are validated over their open connection
+        coordinators = {
+            (coordinator.transport, coordinator.host, coordinator.port): coordinator
+            for coordinator in (entry_data["coordinator"] for entry_data in hass.data.get(DOMAIN, {}).values())
+        }
+        errors = await async_validate_fleet(
+            [configs[index] for index in indexes], call.data["max_concurrent"], coordinators
+        )
+        for position, index in enumerate(indexes):
+            if errors.get(position):
+                outcomes[index] = f"❌ {errors[position]}"
+                del configs[index]
+
+    for index, config in configs.items():
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": SOURCE_IMPORT}, data=config
+        )
+        if result["type"] == FlowResultType.CREATE_ENTRY:
+            outcomes[index] = "✅ Created"
+        else:
+            outcomes[index] = f"⏭️ Skipped ({result.get('reason', result['type'])})"
+
+    created = sum(outcome.startswith("✅") for outcome in outcomes.values())
+    lines = ["| # | Host | Unit | Result |", "|---|------|------|--------|"]
+    for index, row in enumerate(rows):
+        lines.append(
+            f"| {index + 1} | {row.get('host', '?')} | {row.get('unit', 1)} | {outcomes[index]} |"
+        )
+    _LOGGER.info("Fleet import: %d of %d heaters created", created, len(rows))
+
+    await hass.services.async_call(
+        "persistent_notification",
+        "create",
+        {
+            "title": f"🏢 Fleet Import: {created} of {len(rows)} heaters added",
+            "message": "\n".join(lines),
+            "notification_id": notification_id,
+        }
+    )
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Midea Heat Pump Water Heater from a config entry."""
@@ -61,6 +190,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Entities have registered the keys they need, stop polling the rest
+    coordinator.async_start_consumer_tracking()
+
+    # Optional local Modbus TCP server for other tools (cache_server_port)
+    await coordinator.async_attach_cache_server()
+
     # Setup update listener for options flow
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
@@ -88,6 +223,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if not hass.data[DOMAIN]:
             hass.services.async_remove(DOMAIN, SERVICE_EXPORT_PROFILE)
             hass.services.async_remove(DOMAIN, SERVICE_IMPORT_PROFILE)
+            hass.services.async_remove(DOMAIN, SERVICE_START_TRACE)
+            hass.services.async_remove(DOMAIN, SERVICE_STOP_TRACE)
 
     return unload_ok
 
@@ -128,8 +265,14 @@ async def _register_services(hass: HomeAssistant) -> None:
             "integration": "midea_heatpump_hws",
             "connection": {
                 "port": config.get("port", 502),
+                "transport": config.get("transport", "tcp"),
+                "baudrate": config.get("baudrate", 9600),
+                "parity": config.get("parity", "N"),
                 "modbus_unit": config.get("modbus_unit", 1),
-                "scan_interval": config.get("scan_interval", 60)
+                "scan_interval": config.get("scan_interval", 60),
+                "adaptive_polling": config.get("adaptive_polling", False),
+                "min_scan_interval": config.get("min_scan_interval", 10),
+                "max_scan_interval": config.get("max_scan_interval", 300)
             },
             "registers": {
                 "power": config.get("power_register", 0),
@@ -181,6 +324,8 @@ async def _register_services(hass: HomeAssistant) -> None:
                 "enable_additional_sensors": config.get("enable_additional_sensors", True)
             }
         }
+        if config.get("read_layout"):
+            profile_data["polling"] = {"blocks": [list(block) for block in config["read_layout"]]}
         
         # Save to www folder for download
         www_path = hass.config.path("www")
@@ -248,6 +393,48 @@ async def _register_services(hass: HomeAssistant) -> None:
         except Exception as e:
             _LOGGER.error("Error importing profile: %s", e)
     
+    def trace_coordinator(call: ServiceCall) -> MideaModbusCoordinator | None:
+        """Return the coordinator a trace service call is for (first entry by default)."""
+        entry_id = call.data.get("entry_id") or next(iter(hass.data[DOMAIN]), None)
+        if entry_id not in hass.data[DOMAIN]:
+            _LOGGER.error("Invalid entry_id: %s", entry_id)
+            return None
+        return hass.data[DOMAIN][entry_id]["coordinator"]
+
+    async def handle_start_trace(call: ServiceCall) -> None:
+        """Handle trace start service call."""
+        coordinator = trace_coordinator(call)
+        if coordinator is None:
+            return
+        trace_dir = Path(hass.config.path("midea_traces"))
+        await hass.async_add_executor_job(lambda: trace_dir.mkdir(exist_ok=True))
+        safe_host = "".join(c if c.isalnum() else "_" for c in coordinator.host)
+        file_path = trace_dir / f"{safe_host}_{coordinator.port}_{datetime.now():%Y%m%d_%H%M%S}.trace"
+        await coordinator.async_start_trace(str(file_path), call.data["duration"])
+
+    async def handle_stop_trace(call: ServiceCall) -> None:
+        """Handle trace stop service call."""
+        coordinator = trace_coordinator(call)
+        if coordinator is None:
+            return
+        path = await coordinator.async_stop_trace()
+        if path is None:
+            _LOGGER.warning("No trace is being recorded for %s:%s", coordinator.host, coordinator.port)
+            return
+        await hass.services.async_call(
+            "persistent_notification",
+            "create",
+            {
+                "title": "📼 Modbus Trace Saved",
+                "message": (
+                    f"The trace of {coordinator.host}:{coordinator.port} was saved to `{path}`.\n\n"
+                    f"Replay it without the heater with "
+                    f"`python modbus_simulator.py --replay {Path(path).name}`."
+                ),
+                "notification_id": f"midea_trace_{datetime.now():%Y%m%d%H%M%S}"
+            }
+        )
+
     # Register services
     hass.services.async_register(
         DOMAIN,
@@ -261,4 +448,18 @@ async def _register_services(hass: HomeAssistant) -> None:
         SERVICE_IMPORT_PROFILE,
         handle_import_profile,
         schema=IMPORT_PROFILE_SCHEMA,
-    )
\ No newline at end of file
+    )
+    
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_TRACE,
+        handle_start_trace,
+        schema=START_TRACE_SCHEMA,
+    )
+    
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_TRACE,
+        handle_stop_trace,
+        schema=STOP_TRACE_SCHEMA,
+    )
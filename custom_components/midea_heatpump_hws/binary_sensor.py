@@ -16,14 +16,12 @@ from .const import (
     CONF_MODBUS_UNIT,
     CONF_HEATER_ASSIST_REGISTER,
     CONF_SANITIZE_STATE_REGISTER,
+    SANITIZE_ACTIVE_VALUES,
 )
 from .coordinator import MideaModbusCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
-# Register 109 values that indicate an active sanitize cycle
-_SANITIZE_ACTIVE_VALUES = {32, 33}
-
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -59,7 +57,7 @@ async def async_setup_entry(
                 name=f"Sanitize Cycle Active{host_suffix}",
                 register=config[CONF_SANITIZE_STATE_REGISTER],
                 device_class=BinarySensorDeviceClass.RUNNING,
-                is_on_fn=lambda v: v in _SANITIZE_ACTIVE_VALUES,
+                is_on_fn=lambda v: v in SANITIZE_ACTIVE_VALUES,
             )
         )
 
@@ -90,6 +88,11 @@ class MideaBinarySensor(CoordinatorEntity, BinarySensorEntity):
         self._attr_unique_id = f"midea_{config['host']}_{config[CONF_MODBUS_UNIT]}_{data_key}"
         self._attr_device_class = device_class
 
+    async def async_added_to_hass(self) -> None:
+        """Ask the coordinator to poll this entity's register while it exists."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_add_register_consumer(self._data_key))
+
     @property
     def device_info(self) -> dict[str, Any]:
         """Return device info to group this sensor with the main device."""
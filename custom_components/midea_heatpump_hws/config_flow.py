@@ -1,12 +1,10 @@
 """Config flow for Midea Heat Pump Water Heater integration."""
 from __future__ import annotations
 
-import asyncio
 import logging
 from typing import Any
 
 import voluptuous as vol
-from pymodbus.client import AsyncModbusTcpClient
 from pymodbus.exceptions import ModbusException
 
 from homeassistant import config_entries
@@ -15,17 +13,71 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 import homeassistant.helpers.config_validation as cv
 
+from .core.discovery import (
+    MODBUS_MAX_UNIT,
+    DiscoveredGateway,
+    async_scan_subnet,
+    async_scan_units,
+    subnet_hosts,
+)
+from .core.fingerprint import FINGERPRINT_REGISTERS, rank_profiles
 from .profile_manager import ProfileManager
-from .const import DOMAIN
+from .provisioning import (
+    VALIDATE_ATTEMPTS,
+    FleetRowError,
+    async_connect_client,
+    async_probe_unit,
+    build_row_config,
+    key_registers,
+)
+from .const import (
+    DOMAIN,
+    DEFAULT_TRANSPORT,
+    DEFAULT_BAUDRATE,
+    DEFAULT_PARITY,
+    CONF_CACHE_SERVER_PORT,
+    CONF_CACHE_SERVER_HOST,
+    CONF_CACHE_SERVER_WRITES,
+    CONF_CACHE_MAX_AGE,
+    DEFAULT_CACHE_SERVER_PORT,
+    DEFAULT_CACHE_SERVER_HOST,
+    DEFAULT_CACHE_SERVER_WRITES,
+    DEFAULT_CACHE_MAX_AGE,
+)
+from .core.transport import (
+    TRANSPORT_TCP,
+    TRANSPORT_RTU_OVER_TCP,
+    TRANSPORT_UDP,
+    TRANSPORT_SERIAL,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+TRANSPORT_OPTIONS = {
+    TRANSPORT_TCP: "Modbus TCP",
+    TRANSPORT_RTU_OVER_TCP: "RTU over TCP (transparent mode)",
+    TRANSPORT_UDP: "Modbus UDP",
+    TRANSPORT_SERIAL: "Serial RTU (USB-RS485 adapter)",
+}
+
+PARITY_OPTIONS = {
+    "N": "None",
+    "E": "Even",
+    "O": "Odd",
+}
+
 # Step 1: Connection settings
 STEP_CONNECTION_DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_HOST, default="192.168.1.60"): str,
     vol.Required(CONF_PORT, default=502): int,
+    vol.Required("transport", default=DEFAULT_TRANSPORT): vol.In(TRANSPORT_OPTIONS),
+    vol.Optional("baudrate", default=DEFAULT_BAUDRATE): int,
+    vol.Optional("parity", default=DEFAULT_PARITY): vol.In(PARITY_OPTIONS),
     vol.Required("modbus_unit", default=1): int,
     vol.Required("scan_interval", default=60): int,
+    vol.Optional("adaptive_polling", default=False): bool,
+    vol.Optional("min_scan_interval", default=10): int,
+    vol.Optional("max_scan_interval", default=300): int,
 })
 
 # Step 2: Control registers (no scaling needed)
@@ -83,10 +135,23 @@ STEP_FINAL_DATA_SCHEMA = vol.Schema({
 STEP_SETUP_METHOD_SCHEMA = vol.Schema({
     vol.Required("setup_method", default="manual"): vol.In({
         "profile": "Load from Profile",
-        "manual": "Manual Configuration"
+        "manual": "Manual Configuration",
+        "discover": "Discover on Network",
     })
 })
 
+STEP_DISCOVER_SCHEMA = vol.Schema({
+    vol.Required("subnet", default="192.168.1.0/24"): str,
+    vol.Required(CONF_PORT, default=502): int,
+})
+
+PROFILE_AUTO_DETECT = "auto"
+
+STEP_DISCOVER_UNITS_SCHEMA = vol.Schema({
+    vol.Required("last_unit", default=16): vol.All(int, vol.Range(min=1, max=MODBUS_MAX_UNIT)),
+    vol.Optional("expected_units", default=0): vol.All(int, vol.Range(min=0, max=MODBUS_MAX_UNIT)),
+})
+
 STEP_PROFILE_SELECT_SCHEMA = lambda profiles: vol.Schema({
     vol.Required("profile"): vol.In(profiles),
     vol.Required(CONF_HOST): str,
@@ -100,76 +165,104 @@ STEP_SAVE_PROFILE_SCHEMA = vol.Schema({
 })
 
 
+def _find_gateway_coordinator(hass: HomeAssistant, data: dict[str, Any]):
+    """Return a running coordinator connected to the same gateway, if any."""
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        coordinator = entry_data.get("coordinator")
+        if (
+            coordinator is not None
+            and coordinator.host == data[CONF_HOST]
+            and coordinator.port == data[CONF_PORT]
+            and coordinator.transport == data.get("transport", DEFAULT_TRANSPORT)
+        ):
+            return coordinator
+    return None
+
+
+async def probe_device(hass: HomeAssistant, data: dict[str, Any], registers) -> dict[int, int]:
+    """Read registers of the configured unit, return register -> raw value.
+
+    Raises if the device cannot be reached or nothing could be read.
+    """
+    unit = data.get("modbus_unit", 1)
+
+    # A heater behind this gateway is already polled: ask over its connection
+    # instead of opening a second socket the gateway may refuse
+    coordinator = _find_gateway_coordinator(hass, data)
+    if coordinator is not None:
+        try:
+            snapshot = await coordinator.async_probe(unit, registers)
+        except Exception as ex:
+            _LOGGER.debug("Probe over existing connection failed: %s", ex)
+        else:
+            if snapshot:
+                return snapshot
+
+    client = await async_connect_client(data)
+    if client is None:
+        raise Exception(f"Unable to connect to modbus device after {VALIDATE_ATTEMPTS} attempts")
+
+    try:
+        snapshot = await async_probe_unit(client, unit, registers)
+    except ModbusException as ex:
+        raise Exception(f"Modbus error: {ex}")
+    except Exception as ex:
+        raise Exception(f"No response from modbus device: {str(ex) or type(ex).__name__}")
+    finally:
+        client.close()
+
+    if not snapshot:
+        raise Exception("Unable to read from modbus device")
+    return snapshot
+
+
 async def validate_connection(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
-    """Validate the modbus connection with retry logic."""
-    
+    """Validate the modbus connection and probe the key registers.
+
+    Returns the entry title and a register -> raw value snapshot for the
+    later steps.
+    """
+    title = f"Midea Heat Pump ({data[CONF_HOST]})"
+
     # Skip validation if requested
     if data.get("skip_validation", False):
         _LOGGER.info("Skipping connection validation as requested")
-        return {"title": f"Midea Heat Pump ({data[CONF_HOST]})"}
-    
-    client = None
-    max_retries = 3
-    
-    for attempt in range(max_retries):
-        client = AsyncModbusTcpClient(host=data[CONF_HOST], port=data[CONF_PORT])
-        
-        try:
-            # Connect with timeout
-            connect_result = await client.connect()
-            if not client.connected:
-                if attempt < max_retries - 1:
-                    _LOGGER.warning("Connection attempt %d failed, retrying...", attempt + 1)
-                    if client:
-                        client.close()
-                    await asyncio.sleep(1)
-                    continue
-                else:
-                    raise Exception("Unable to connect to modbus device after 3 attempts")
-            
-            # Try to read a register to verify communication
-            result = await client.read_holding_registers(
-                address=data.get("mode_register", 1),
-                count=1,
-                device_id=data.get("modbus_unit", 1)
-            )
-            
-            if result.isError():
-                if attempt < max_retries - 1:
-                    _LOGGER.warning("Read attempt %d failed, retrying...", attempt + 1)
-                    client.close()
-                    await asyncio.sleep(1)
-                    continue
-                else:
-                    raise Exception("Unable to read from modbus device after 3 attempts")
-            
-            # Success!
-            client.close()
-            
-            # Return info that you want to store in the config entry
-            return {"title": f"Midea Heat Pump ({data[CONF_HOST]})"}
-            
-        except ModbusException as ex:
-            if attempt < max_retries - 1:
-                _LOGGER.warning("Modbus error on attempt %d: %s, retrying...", attempt + 1, ex)
-                if client:
-                    client.close()
-                await asyncio.sleep(1)
-                continue
-            else:
-                raise Exception(f"Modbus error after 3 attempts: {ex}")
-        except Exception as ex:
-            if attempt < max_retries - 1:
-                _LOGGER.warning("Connection error on attempt %d: %s, retrying...", attempt + 1, ex)
-                if client:
-                    client.close()
-                await asyncio.sleep(1)
-                continue
-            else:
-                raise Exception(f"Connection failed after 3 attempts: {ex}")
-    
-    # This shouldn't be reached, but just in case
-    raise Exception("Connection validation failed")
+        return {"title": title, "snapshot": {}}
+
+    snapshot = await probe_device(hass, data, key_registers(data))
+    return {"title": title, "snapshot": snapshot}
+
+
+async def detect_profile(
+    hass: HomeAssistant, profile_manager: ProfileManager, data: dict[str, Any]
+) -> list[tuple[str, float]]:
+    """Fingerprint a unit and return (profile id, confidence), best first."""
+    snapshot = await probe_device(hass, data, FINGERPRINT_REGISTERS)
+    index = await hass.async_add_executor_job(profile_manager.get_profile_features)
+    return rank_profiles(index, snapshot)
+
+
+async def fingerprint_units(
+    hass: HomeAssistant, profile_manager: ProfileManager, data: dict[str, Any], units: list[int]
+) -> dict[int, list[tuple[str, float]]]:
+    """Fingerprint every unit behind one gateway over a single connection."""
+    client = await async_connect_client(data)
+    if client is None:
+        raise Exception(f"Unable to connect to modbus device after {VALIDATE_ATTEMPTS} attempts")
+
+    index = await hass.async_add_executor_job(profile_manager.get_profile_features)
+    ranked = {}
+    try:
+        for unit in units:
+            try:
+                snapshot = await async_probe_unit(client, unit, FINGERPRINT_REGISTERS)
+            except Exception as ex:
+                _LOGGER.debug("Fingerprint read of unit %s failed: %s", unit, ex)
+                snapshot = {}
+            ranked[unit] = rank_profiles(index, snapshot) if snapshot else []
+    finally:
+        client.close()
+    return ranked
 
 
 class MideaHeatPumpConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -182,6 +275,11 @@ class MideaHeatPumpConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self.data = {}
         self.profile_manager = None
         self.selected_profile = None
+        self.snapshot: dict[int, int] = {}
+        self.discovered: dict[tuple[str, int], list[DiscoveredGateway]] = {}
+        self.discovery_key: tuple[str, int] | None = None
+        self.gateway: DiscoveredGateway | None = None
+        self.unit_matches: dict[int, tuple[str, float]] = {}
 
     @staticmethod
     @callback
@@ -207,46 +305,286 @@ class MideaHeatPumpConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     
         if user_input["setup_method"] == "profile":
             return await self.async_step_load_profile()
+        elif user_input["setup_method"] == "discover":
+            return await self.async_step_discover()
         else:
             return await self.async_step_connection()
 
-    async def async_step_load_profile(
+    async def async_step_discover(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Load configuration from a profile."""
+        """Sweep a subnet for Modbus gateways."""
+        errors = {}
+        if user_input is not None:
+            subnet = user_input["subnet"].strip()
+            port = user_input[CONF_PORT]
+            try:
+                subnet_hosts(subnet)
+            except ValueError as ex:
+                _LOGGER.debug("Invalid discovery subnet %s: %s", subnet, ex)
+                errors["subnet"] = "invalid_subnet"
+            else:
+                # Sweeps are cached for the lifetime of the flow, going back
+                # and forth between the steps does not scan again
+                if (subnet, port) not in self.discovered:
+                    self.discovered[(subnet, port)] = await async_scan_subnet(subnet, port)
+                self.discovery_key = (subnet, port)
+                if self.discovered[(subnet, port)]:
+                    return await self.async_step_discover_select()
+                errors["base"] = "no_gateways_found"
+
+        return self.async_show_form(
+            step_id="discover",
+            data_schema=self.add_suggested_values_to_schema(STEP_DISCOVER_SCHEMA, user_input or {}),
+            errors=errors,
+        )
+
+    async def async_step_discover_select(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Pick one of the discovered gateways."""
+        gateways = {gateway.host: gateway for gateway in self.discovered[self.discovery_key]}
+
+        if user_input is None:
+            options = {
+                host: f"{host}:{gateway.port}" + (
+                    " (Modbus TCP)" if gateway.confirmed else " (port open, no Modbus TCP reply)"
+                )
+                for host, gateway in gateways.items()
+            }
+            return self.async_show_form(
+                step_id="discover_select",
+                data_schema=vol.Schema({
+                    vol.Required(CONF_HOST, default=next(iter(options))): vol.In(options),
+                    vol.Required("setup_method", default="profile"): vol.In({
+                        "profile": "Load from Profile",
+                        "manual": "Manual Configuration",
+                        "units": "Find All Heaters on this Adapter",
+                    }),
+                }),
+                description_placeholders={"count": str(len(gateways))},
+            )
+
+        self.gateway = gateways[user_input[CONF_HOST]]
+        if user_input["setup_method"] == "profile":
+            return await self.async_step_load_profile()
+        if user_input["setup_method"] == "units":
+            return await self.async_step_discover_units()
+        return await self.async_step_connection()
+
+    def _gateway_data(self) -> dict[str, Any]:
+        """Return connection data for the discovered gateway."""
+        return {
+            CONF_HOST: self.gateway.host,
+            CONF_PORT: self.gateway.port,
+            "transport": TRANSPORT_TCP if self.gateway.confirmed else TRANSPORT_RTU_OVER_TCP,
+        }
+
+    async def async_step_discover_units(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Find the unit ids answering behind the discovered gateway."""
+        errors = {}
+        if user_input is not None:
+            try:
+                units = await async_scan_units(
+                    self.gateway.host,
+                    self.gateway.port,
+                    last=user_input["last_unit"],
+                    expected=user_input.get("expected_units") or None,
+                    rtu=not self.gateway.confirmed,
+                )
+                ranked = await fingerprint_units(self.hass, self.profile_manager, self._gateway_data(), units)
+            except Exception as ex:
+                _LOGGER.warning("Unit scan of %s failed: %s", self.gateway.host, ex)
+                errors["base"] = "cannot_connect"
+            else:
+                _LOGGER.info("Units behind %s: %s", self.gateway.host, {
+                    unit: matches[:1] for unit, matches in ranked.items()
+                })
+                self.unit_matches = {
+                    unit: matches[0] for unit, matches in ranked.items() if matches and matches[0][1] > 0
+                }
+                if self.unit_matches:
+                    return await self.async_step_discover_units_select()
+                errors["base"] = "no_units_found"
+
+        return self.async_show_form(
+            step_id="discover_units",
+            data_schema=self.add_suggested_values_to_schema(STEP_DISCOVER_UNITS_SCHEMA, user_input or {}),
+            errors=errors,
+            description_placeholders={"host": self.gateway.host},
+        )
+
+    async def async_step_discover_units_select(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Create entries for the units found, with their detected profiles."""
+        profiles = self.profile_manager.get_available_profiles()
+        configured = self._async_current_ids()
+        options = {
+            str(unit): f"Unit {unit}: {profiles[profile_id]['name']} ({confidence:.0%} match)"
+            for unit, (profile_id, confidence) in sorted(self.unit_matches.items())
+            if profile_id in profiles and f"{self.gateway.host}_{unit}" not in configured
+        }
+        if not options:
+            return self.async_abort(reason="already_configured")
+
         if user_input is None:
-            # Get available profiles
-            profiles = self.profile_manager.get_available_profiles()
-            
-            if not profiles:
-                # No profiles available, go to manual setup
-                return await self.async_step_connection()
-            
-            # Create display names for profiles - SIMPLE VERSION
-            profile_options = {}
-            for profile_id, profile_info in profiles.items():
-                display_name = f"{profile_info['name']} ({profile_info['model']}) - {profile_info['type']}"
-                profile_options[profile_id] = display_name
-            
             return self.async_show_form(
-                step_id="load_profile",
+                step_id="discover_units_select",
                 data_schema=vol.Schema({
-                    vol.Required("profile"): vol.In(profile_options),
-                    vol.Required(CONF_HOST): str,
+                    vol.Required("units", default=list(options)): cv.multi_select(options),
                     vol.Optional(CONF_NAME, default="Hot Water System"): str,
                 }),
-                description_placeholders={
-                    "title": "Select Profile",
-                    "description": "Choose a profile and enter your connection details"
-                },
+                description_placeholders={"host": self.gateway.host, "count": str(len(options))},
             )
-        
+
+        selected = sorted(int(unit) for unit in user_input["units"] if unit in options)
+        if not selected:
+            return await self.async_step_discover_units_select()
+
+        configs = []
+        for unit in selected:
+            name = user_input[CONF_NAME]
+            if len(selected) > 1:
+                name = f"{name} {unit}"
+            try:
+                configs.append(build_row_config(self.profile_manager, profiles, {
+                    **self._gateway_data(),
+                    "unit": unit,
+                    "profile": self.unit_matches[unit][0],
+                    "name": name,
+                }))
+            except FleetRowError as ex:
+                _LOGGER.warning("Skipping unit %s: %s", unit, ex)
+
+        if not configs:
+            return self.async_abort(reason="no_units_found")
+
+        # This flow creates the first entry, import flows the others
+        for config in configs[1:]:
+            self.hass.async_create_task(
+                self.hass.config_entries.flow.async_init(
+                    DOMAIN, context={"source": config_entries.SOURCE_IMPORT}, data=config
+                )
+            )
+        return await self.async_step_import(configs[0])
+
+    def _profile_connection(self, user_input: dict[str, Any]) -> dict[str, Any]:
+        """Return the host, unit and discovered gateway settings entered on the profile form."""
+        data = {CONF_HOST: user_input[CONF_HOST], "modbus_unit": user_input.get("modbus_unit", 1)}
+        if self.gateway is not None and self.gateway.host == user_input[CONF_HOST]:
+            data.update(self._gateway_data())
+        return data
+
+    def _connection_schema(self) -> vol.Schema:
+        """Return the connection schema, pre-filled from a discovered gateway."""
+        if self.gateway is None:
+            return STEP_CONNECTION_DATA_SCHEMA
+        return self.add_suggested_values_to_schema(STEP_CONNECTION_DATA_SCHEMA, {
+            CONF_HOST: self.gateway.host,
+            CONF_PORT: self.gateway.port,
+            # Bridges in transparent mode accept connections but not MBAP
+            "transport": TRANSPORT_TCP if self.gateway.confirmed else TRANSPORT_RTU_OVER_TCP,
+        })
+
+    def _live_values(self) -> str:
+        """Format the register snapshot taken while validating the connection."""
+        if not self.snapshot:
+            return ""
+        values = ", ".join(f"{register} = {value}" for register, value in sorted(self.snapshot.items()))
+        return f"Live values (register = raw value): {values}"
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Create an entry from a fleet import row (validated by the service)."""
+        await self.async_set_unique_id(f"{import_data[CONF_HOST]}_{import_data['modbus_unit']}")
+        self._abort_if_unique_id_configured()
+
+        title = f"Midea Heat Pump ({import_data[CONF_HOST]})"
+        if import_data["modbus_unit"] != 1:
+            title = f"Midea Heat Pump ({import_data[CONF_HOST]} #{import_data['modbus_unit']})"
+        return self.async_create_entry(
+            title=title,
+            data={**import_data, "title": title},
+        )
+
+    def _load_profile_form(
+        self,
+        profile_options: dict[str, str],
+        defaults: dict[str, Any] | None = None,
+        detection: str = "",
+        errors: dict[str, str] | None = None,
+    ) -> FlowResult:
+        """Show the profile selection form."""
+        defaults = defaults or {}
+        return self.async_show_form(
+            step_id="load_profile",
+            data_schema=vol.Schema({
+                vol.Required("profile", default=defaults.get("profile", PROFILE_AUTO_DETECT)): vol.In(profile_options),
+                vol.Required(CONF_HOST, description={"suggested_value": defaults.get(CONF_HOST)}): str,
+                vol.Optional("modbus_unit", default=defaults.get("modbus_unit", 1)): int,
+                vol.Optional(CONF_NAME, default=defaults.get(CONF_NAME, "Hot Water System")): str,
+            }),
+            errors=errors or {},
+            description_placeholders={
+                "title": "Select Profile",
+                "description": "Choose a profile and enter your connection details",
+                "detection": detection,
+            },
+        )
+
+    async def async_step_load_profile(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Load configuration from a profile."""
+        # Get available profiles
+        profiles = self.profile_manager.get_available_profiles()
+
+        if not profiles:
+            # No profiles available, go to manual setup
+            return await self.async_step_connection()
+
+        # Create display names for profiles - SIMPLE VERSION
+        profile_options = {PROFILE_AUTO_DETECT: "🔍 Detect automatically"}
+        for profile_id, profile_info in profiles.items():
+            display_name = f"{profile_info['name']} ({profile_info['model']}) - {profile_info['type']}"
+            profile_options[profile_id] = display_name
+
+        if user_input is None:
+            defaults = {CONF_HOST: self.gateway.host} if self.gateway else None
+            return self._load_profile_form(profile_options, defaults)
+
+        if user_input["profile"] == PROFILE_AUTO_DETECT:
+            # Fingerprint the device, then show the form again with the best
+            # match pre-selected for the user to confirm
+            try:
+                ranked = await detect_profile(
+                    self.hass, self.profile_manager, {CONF_PORT: 502, **self._profile_connection(user_input)}
+                )
+            except Exception as ex:
+                _LOGGER.warning("Profile detection failed: %s", ex)
+                return self._load_profile_form(profile_options, user_input, errors={"base": "cannot_connect"})
+
+            if not ranked or ranked[0][1] == 0:
+                return self._load_profile_form(
+                    profile_options, user_input, "No profile matched this device, please choose one."
+                )
+
+            best_id, confidence = ranked[0]
+            detection = f"Detected **{profiles[best_id]['name']}** ({confidence:.0%} match)"
+            if len(ranked) > 1 and ranked[1][1] > 0:
+                runner_up, runner_up_confidence = ranked[1]
+                detection += f", next best: {profiles[runner_up]['name']} ({runner_up_confidence:.0%})"
+            _LOGGER.info("Profile detection for %s: %s", user_input[CONF_HOST], ranked[:3])
+            return self._load_profile_form(profile_options, {**user_input, "profile": best_id}, detection)
+
         # Load the selected profile - SIMPLE VERSION
         profile_data = self.profile_manager.load_profile(user_input["profile"])
         if profile_data:
             # Apply profile to configuration
             self.data = self.profile_manager.apply_profile_to_config(profile_data, user_input)
-            self.data[CONF_HOST] = user_input[CONF_HOST]
+            self.data.update(self._profile_connection(user_input))
             self.data[CONF_NAME] = user_input.get(CONF_NAME, profile_data.get("name", "Hot Water System"))
             
             # Skip to validation
@@ -277,7 +615,7 @@ class MideaHeatPumpConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is None:
             return self.async_show_form(
                 step_id="connection",
-                data_schema=STEP_CONNECTION_DATA_SCHEMA,
+                data_schema=self._connection_schema(),
                 description_placeholders={
                     "title": "Modbus Connection Settings",
                     "description": "Configure the TCP connection to your EW11-A adapter"
@@ -285,22 +623,25 @@ class MideaHeatPumpConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             )
         
         errors = {}
-        
-        try:
-            # Validate connection
-            info = await validate_connection(self.hass, user_input)
-            
-            self.data.update(user_input)
-            self.data["title"] = info["title"]
-            return await self.async_step_registers()
-            
-        except Exception as ex:
-            _LOGGER.exception("Unexpected exception: %s", ex)
-            errors["base"] = "cannot_connect"
+        if user_input.get("min_scan_interval", 10) > user_input.get("max_scan_interval", 300):
+            errors["base"] = "invalid_scan_range"
+        else:
+            try:
+                # Validate connection
+                info = await validate_connection(self.hass, user_input)
+
+                self.data.update(user_input)
+                self.data["title"] = info["title"]
+                self.snapshot = info["snapshot"]
+                return await self.async_step_registers()
+
+            except Exception as ex:
+                _LOGGER.exception("Unexpected exception: %s", ex)
+                errors["base"] = "cannot_connect"
         
         return self.async_show_form(
             step_id="connection",
-            data_schema=STEP_CONNECTION_DATA_SCHEMA,
+            data_schema=self._connection_schema(),
             errors=errors,
             description_placeholders={
                 "title": "Modbus Connection Settings",
@@ -318,7 +659,8 @@ class MideaHeatPumpConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 data_schema=STEP_CONTROL_REGISTERS_SCHEMA,
                 description_placeholders={
                     "title": "Control Register Configuration",
-                    "description": "Configure power and mode register addresses (no scaling needed)"
+                    "description": "Configure power and mode register addresses (no scaling needed)",
+                    "live_values": self._live_values(),
                 },
             )
 
@@ -335,7 +677,8 @@ class MideaHeatPumpConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 data_schema=STEP_TEMP_REGISTERS_SCHEMA,
                 description_placeholders={
                     "title": "Temperature Register Configuration",
-                    "description": "Configure temperature registers with individual offset and scale values"
+                    "description": "Configure temperature registers with individual offset and scale values",
+                    "live_values": self._live_values(),
                 },
             )
 
@@ -369,7 +712,8 @@ class MideaHeatPumpConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 data_schema=STEP_SENSORS_DATA_SCHEMA,
                 description_placeholders={
                     "title": "Optional Sensors",
-                    "description": "Configure additional temperature sensors with shared scaling"
+                    "description": "Configure additional temperature sensors with shared scaling",
+                    "live_values": self._live_values(),
                 },
             )
 
@@ -487,9 +831,13 @@ class MideaHeatPumpOptionsFlow(config_entries.OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Update connection settings."""
+        errors = {}
         if user_input is not None:
-            self.data.update(user_input)
-            return await self._update_and_reload()
+            if user_input.get("min_scan_interval", 10) > user_input.get("max_scan_interval", 300):
+                errors["base"] = "invalid_scan_range"
+            else:
+                self.data.update(user_input)
+                return await self._update_and_reload()
 
         current_data = self.config_entry.data
         return self.async_show_form(
@@ -497,11 +845,41 @@ class MideaHeatPumpOptionsFlow(config_entries.OptionsFlow):
             data_schema=vol.Schema({
                 vol.Required(CONF_HOST, default=current_data.get(CONF_HOST)): str,
                 vol.Required(CONF_PORT, default=current_data.get(CONF_PORT, 502)): int,
+                vol.Required("transport", default=current_data.get("transport", DEFAULT_TRANSPORT)): vol.In(
+                    TRANSPORT_OPTIONS
+                ),
+                vol.Optional("baudrate", default=current_data.get("baudrate", DEFAULT_BAUDRATE)): int,
+                vol.Optional("parity", default=current_data.get("parity", DEFAULT_PARITY)): vol.In(
+                    PARITY_OPTIONS
+                ),
                 vol.Required("modbus_unit", default=current_data.get("modbus_unit", 1)): int,
                 vol.Required("scan_interval", default=current_data.get("scan_interval", 60)): vol.All(
                     int, vol.Range(min=30, max=300)
                 ),
+                vol.Optional("adaptive_polling", default=current_data.get("adaptive_polling", False)): bool,
+                vol.Optional("min_scan_interval", default=current_data.get("min_scan_interval", 10)): vol.All(
+                    int, vol.Range(min=5, max=300)
+                ),
+                vol.Optional("max_scan_interval", default=current_data.get("max_scan_interval", 300)): vol.All(
+                    int, vol.Range(min=30, max=3600)
+                ),
+                vol.Optional(
+                    CONF_CACHE_SERVER_PORT,
+                    default=current_data.get(CONF_CACHE_SERVER_PORT, DEFAULT_CACHE_SERVER_PORT),
+                ): vol.All(int, vol.Range(min=0, max=65535)),
+                vol.Optional(
+                    CONF_CACHE_SERVER_HOST,
+                    default=current_data.get(CONF_CACHE_SERVER_HOST, DEFAULT_CACHE_SERVER_HOST),
+                ): str,
+                vol.Optional(
+                    CONF_CACHE_SERVER_WRITES,
+                    default=current_data.get(CONF_CACHE_SERVER_WRITES, DEFAULT_CACHE_SERVER_WRITES),
+                ): bool,
+                vol.Optional(
+                    CONF_CACHE_MAX_AGE, default=current_data.get(CONF_CACHE_MAX_AGE, DEFAULT_CACHE_MAX_AGE)
+                ): vol.All(int, vol.Range(min=1, max=3600)),
             }),
+            errors=errors,
             description_placeholders={
                 "title": "Update Connection Settings",
                 "description": "Modify Modbus connection parameters"
@@ -3,6 +3,12 @@ from homeassistant.const import Platform
 
 DOMAIN = "midea_heatpump_hws"
 
+# hass.data keys for per-gateway link state and the fleet poll scheduler
+# (kept out of hass.data[DOMAIN], which is keyed by config entry id)
+DATA_GATEWAYS = f"{DOMAIN}_gateways"
+DATA_FLEET = f"{DOMAIN}_fleet"
+DATA_CACHE_SERVERS = f"{DOMAIN}_cache_servers"
+
 PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.WATER_HEATER, Platform.SENSOR, Platform.SWITCH, Platform.SELECT]
 
 # Default register addresses
@@ -31,6 +37,15 @@ DEFAULT_TARGET_TEMP_SCALE = 1.0
 DEFAULT_SENSORS_TEMP_OFFSET = -15.0
 DEFAULT_SENSORS_TEMP_SCALE = 0.5
 DEFAULT_SCAN_INTERVAL = 60
+DEFAULT_TRANSPORT = "tcp"
+DEFAULT_BAUDRATE = 9600
+DEFAULT_PARITY = "N"
+DEFAULT_MIN_SCAN_INTERVAL = 10
+DEFAULT_MAX_SCAN_INTERVAL = 300
+DEFAULT_CACHE_SERVER_PORT = 0  # disabled
+DEFAULT_CACHE_SERVER_HOST = "127.0.0.1"
+DEFAULT_CACHE_SERVER_WRITES = False
+DEFAULT_CACHE_MAX_AGE = 120
 DEFAULT_TARGET_TEMP = 65
 DEFAULT_MIN_TEMP = 40
 DEFAULT_MAX_TEMP = 75
@@ -46,6 +61,19 @@ CONF_ELECTRIC_MAX_TEMP = "electric_max_temp"
 # Configuration keys
 CONF_MODBUS_UNIT = "modbus_unit"
 CONF_SCAN_INTERVAL = "scan_interval"
+CONF_TRANSPORT = "transport"
+CONF_BAUDRATE = "baudrate"
+CONF_PARITY = "parity"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+# Local Modbus TCP read-cache server (port 0 = off), the address it binds,
+# whether its clients may write, and the oldest cached value (seconds) it
+# answers without reading the heater again
+CONF_CACHE_SERVER_PORT = "cache_server_port"
+CONF_CACHE_SERVER_HOST = "cache_server_host"
+CONF_CACHE_SERVER_WRITES = "cache_server_writes"
+CONF_CACHE_MAX_AGE = "cache_max_age"
 CONF_POWER_REGISTER = "power_register"
 CONF_MODE_REGISTER = "mode_register"
 CONF_TEMP_REGISTER = "temp_register"
@@ -73,4 +101,14 @@ CONF_EXHAUST_TEMP_REGISTER = "exhaust_temp_register"
 CONF_SUCTION_TEMP_REGISTER = "suction_temp_register"
 CONF_ENABLE_ADDITIONAL_SENSORS = "enable_additional_sensors"
 CONF_HEATER_ASSIST_REGISTER = "heater_assist_register"
-CONF_SANITIZE_STATE_REGISTER = "sanitize_state_register"
\ No newline at end of file
+CONF_SANITIZE_STATE_REGISTER = "sanitize_state_register"
+# Profile polling blocks: [[start, count], ...] ranges read as a whole
+CONF_READ_LAYOUT = "read_layout"
+
+# Register 109 values that indicate an active sanitize cycle
+SANITIZE_ACTIVE_VALUES = {32, 33}
+
+# Adaptive polling tuning
+ADAPTIVE_TEMP_DELTA = 0.5  # °C change between polls that counts as "moving" (twice in a row, same direction)
+ADAPTIVE_WRITE_HOLD = 120  # seconds to keep fast polling after a write
+ADAPTIVE_BACKOFF_FACTOR = 1.5  # interval growth per idle poll
@@ -1,19 +1,28 @@
 """Modbus coordinator for Midea Heat Pump Water Heater integration.""" 
 import asyncio
 import logging
+import time
 import traceback
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
 from datetime import timedelta
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from pymodbus.client import AsyncModbusTcpClient
+from pymodbus.client import ModbusBaseClient
 from pymodbus.exceptions import ModbusException
 
 from .const import (
     DOMAIN,
     CONF_MODBUS_UNIT,
     CONF_SCAN_INTERVAL,
+    CONF_TRANSPORT,
+    CONF_BAUDRATE,
+    CONF_PARITY,
+    CONF_ADAPTIVE_POLLING,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
     CONF_POWER_REGISTER,
     CONF_MODE_REGISTER,
     CONF_TEMP_REGISTER,
@@ -37,10 +46,97 @@ from .const import (
     CONF_SUCTION_TEMP_REGISTER,
     CONF_HEATER_ASSIST_REGISTER,
     CONF_SANITIZE_STATE_REGISTER,
+    CONF_READ_LAYOUT,
+    CONF_CACHE_SERVER_PORT,
+    CONF_CACHE_SERVER_HOST,
+    CONF_CACHE_SERVER_WRITES,
+    CONF_CACHE_MAX_AGE,
+    DEFAULT_TRANSPORT,
+    DEFAULT_BAUDRATE,
+    DEFAULT_PARITY,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_CACHE_SERVER_PORT,
+    DEFAULT_CACHE_SERVER_HOST,
+    DEFAULT_CACHE_SERVER_WRITES,
+    DEFAULT_CACHE_MAX_AGE,
+    SANITIZE_ACTIVE_VALUES,
+    ADAPTIVE_TEMP_DELTA,
+    ADAPTIVE_WRITE_HOLD,
+    ADAPTIVE_BACKOFF_FACTOR,
+    DATA_GATEWAYS,
+    DATA_FLEET,
+    DATA_CACHE_SERVERS,
+)
+from .core.bus_trace import TraceRecorder
+from .core.cache_server import (
+    GATEWAY_TARGET_FAILED,
+    ILLEGAL_FUNCTION,
+    SERVER_DEVICE_FAILURE,
+    CacheServer,
+    CacheServerError,
+)
+from .core.decode import RegisterCodec
+from .core.fleet import FleetScheduler
+from .core.metrics import DeviceMetrics
+from .core.read_plan import (
+    PRIORITY_HIGH,
+    PollStats,
+    ReadBlock,
+    build_read_plan,
+    read_block,
+    read_registers,
+)
+from .core.transport import (
+    RTO_MAX,
+    TRANSACTION_ATTEMPTS,
+    TRANSPORT_RTU_OVER_TCP,
+    TRANSPORT_SERIAL,
+    GatewayLink,
+    ReconnectTracker,
+    apply_socket_options,
+    create_client,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Half-open connection detection: on a socket idle longer than this
+# (seconds) the cycle's first block read is a single short-timeout attempt,
+# and no answer means reconnect and read it again
+LIVENESS_IDLE = 30
+PROBE_TIMEOUT = 2.0
+
+# Connect attempts per poll cycle and the deadline for each
+RECONNECT_ATTEMPTS = 3
+CONNECT_TIMEOUT = 3.0
+
+# A cache server read-through of a span that failed without an answer is
+# not retried for this long (seconds), clients get the failure meanwhile
+CACHE_RETRY_INTERVAL = 10
+
+# Share of the update interval a poll cycle may use before low-priority
+# blocks are deferred to the next cycle
+CYCLE_BUDGET_FRACTION = 0.8
+
+# Keys the water heater, switch and select entities are built on: always
+# polled, and read every cycle regardless of the budget
+_CORE_KEYS = ("power_state", "mode", "current_temp", "target_temp", "sterilize_mode")
+_KEY_PRIORITIES = {key: PRIORITY_HIGH for key in _CORE_KEYS}
+
+# Active substates adaptive polling reacts to
+_ADAPTIVE_STATE_KEYS = ("heater_assist_raw", "sanitize_state_raw")
+
+# Decoded temperatures watched by adaptive polling
+_ADAPTIVE_TEMP_KEYS = (
+    "current_temp",
+    "tank_top_temp",
+    "tank_bottom_temp",
+    "condensor_temp",
+    "outdoor_temp",
+    "exhaust_temp",
+    "suction_temp",
+)
+
 
 class MideaModbusCoordinator(DataUpdateCoordinator):
     """Coordinate all modbus reads for Midea Heat Pump Water Heater."""
@@ -61,6 +157,10 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
         self.host = config["host"]
         self.port = config["port"]
         self.modbus_unit = config.get(CONF_MODBUS_UNIT, 1)
+        self.transport = config.get(CONF_TRANSPORT, DEFAULT_TRANSPORT)
+        # Serial line settings (serial transport only, host is the device path)
+        self.baudrate = config.get(CONF_BAUDRATE, DEFAULT_BAUDRATE)
+        self.parity = config.get(CONF_PARITY, DEFAULT_PARITY)
 
         # Store register addresses
         self.power_register = config.get(CONF_POWER_REGISTER)
@@ -88,7 +188,16 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
             "performance": config.get(CONF_PERFORMANCE_MODE_VALUE),
             "electric": config.get(CONF_ELECTRIC_MODE_VALUE),
         }
-        self.value_to_mode = {v: k for k, v in self.mode_values.items() if v is not None}
+        self.codec = RegisterCodec(
+            temp_scale=self.temp_scale,
+            temp_offset=self.temp_offset,
+            target_temp_scale=self.target_temp_scale,
+            target_temp_offset=self.target_temp_offset,
+            sensors_temp_scale=self.sensors_temp_scale,
+            sensors_temp_offset=self.sensors_temp_offset,
+            mode_values=self.mode_values,
+        )
+        self.value_to_mode = self.codec.value_to_mode
 
         # Additional sensors configuration
         self.enable_additional_sensors = config.get(CONF_ENABLE_ADDITIONAL_SENSORS, True)
@@ -107,180 +216,410 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
         self.heater_assist_register = config.get(CONF_HEATER_ASSIST_REGISTER)
         self.sanitize_state_register = config.get(CONF_SANITIZE_STATE_REGISTER)
 
-        self._client: AsyncModbusTcpClient | None = None
+        # Adaptive polling: scan_interval is the starting point, the interval
+        # then moves between min/max depending on heater activity
+        self.adaptive_polling = config.get(CONF_ADAPTIVE_POLLING, False)
+        self.min_scan_interval = config.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL)
+        self.max_scan_interval = config.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL)
+        self._last_write: float | None = None
+        self._previous_temps: dict[str, float] = {}
+        # Direction (+1/-1) of each temperature's last change of at least
+        # ADAPTIVE_TEMP_DELTA
+        self._temp_trends: dict[str, int] = {}
+
+        # The interval polling asks for (scan_interval or the adaptive one);
+        # update_interval is this stretched onto the device's fleet phase
+        self._nominal_interval = float(config.get(CONF_SCAN_INTERVAL, 60))
+        self.fleet: FleetScheduler = hass.data.setdefault(DATA_FLEET, FleetScheduler())
+        self._fleet_member = f"{self.host}:{self.port}:{self.modbus_unit}"
+        self.fleet.join(self._fleet_member)
+
+        # Round-trip and pacing state is learned per gateway and shared by
+        # every unit behind it
+        gateways = hass.data.setdefault(DATA_GATEWAYS, {})
+        gateway_key = f"{self.host}:{self.port}"
+        if gateway_key not in gateways:
+            gateways[gateway_key] = GatewayLink(self.host, self.port)
+        self.link: GatewayLink = gateways[gateway_key]
+
+        self._client: ModbusBaseClient | None = None
+        self.reconnect = ReconnectTracker()
+        self._last_activity = 0.0
+        self.probes = 0
+        self.probe_failures = 0
         self._lock = asyncio.Lock()
         self._pending_writes: dict[str, Any] = {}
+        # Bus counters and histograms for the metrics endpoint
+        self.metrics = DeviceMetrics(rtu=self.transport in (TRANSPORT_RTU_OVER_TCP, TRANSPORT_SERIAL))
+
+        # Raw register image (address -> last raw value) and the changes seen
+        # since the last push to stream listeners (websocket subscribers)
+        self.register_image: dict[int, int] = {}
+        self._register_changes: dict[int, int] = {}
+        self._stream_listeners: list[Callable[[dict[str, Any], dict[int, int]], None]] = []
+
+        # Local Modbus TCP server answering other tools from the register
+        # image: when each register was last read, and cache statistics
+        self.cache_server_port = config.get(CONF_CACHE_SERVER_PORT, DEFAULT_CACHE_SERVER_PORT)
+        self.cache_server_host = config.get(CONF_CACHE_SERVER_HOST, DEFAULT_CACHE_SERVER_HOST)
+        self.cache_server_writes = config.get(CONF_CACHE_SERVER_WRITES, DEFAULT_CACHE_SERVER_WRITES)
+        self.cache_max_age = config.get(CONF_CACHE_MAX_AGE, DEFAULT_CACHE_MAX_AGE)
+        self.cache_server: CacheServer | None = None
+        self._register_read_at: dict[int, float] = {}
+        # Read-through span (address, count) -> (expiry, exception code) of
+        # its last failure, answered without the bus until it expires
+        self._cache_failures: dict[tuple[int, int], tuple[float, int]] = {}
+        self.cache_stats = {"hits": 0, "misses": 0, "failure_hits": 0, "writes": 0}
+
+        # Block read plan, rebuilt lazily; registers that must be read on
+        # their own; block starts deferred by the last cycle's budget
+        self._read_plan: list[ReadBlock] | None = None
+        self._single_registers: set[int] = set()
+        self._deferred: set[int] = set()
+        self._read_layout: list[tuple[int, int]] = [
+            (int(start), int(count)) for start, count in config.get(CONF_READ_LAYOUT) or []
+        ]
+        self.poll_stats = PollStats()
+
+        # Optional keys are only polled while something consumes them: an
+        # enabled entity or adaptive polling. Until the platforms are set up
+        # (tracking off) everything configured is polled.
+        self._register_consumers: dict[str, int] = {}
+        self._track_consumers = False
+        if self.adaptive_polling:
+            for key in _ADAPTIVE_STATE_KEYS:
+                self._register_consumers[key] = 1
+
+    async def _transact(
+        self, method: str, max_timeout: float | None = None, attempts: int = TRANSACTION_ATTEMPTS, **kwargs: Any
+    ):
+        """Run one Modbus request over the gateway link with adaptive pacing and timeout.
+
+        See GatewayLink.transact; max_timeout caps the adaptive timeout, e.g.
+        for probes.
+        """
+        result = await self.link.transact(
+            self._client, method, kwargs, attempts, max_timeout, self.metrics.transaction
+        )
+        self._last_activity = time.monotonic()
+        return result
+
+    @asynccontextmanager
+    async def _bus_lock(self) -> AsyncIterator[None]:
+        """Hold the bus lock, recording how long it took to get it."""
+        start = time.monotonic()
+        async with self._lock:
+            self.metrics.lock_wait.observe(time.monotonic() - start)
+            yield
+
+    async def _read_holding_registers(
+        self,
+        address: int,
+        count: int,
+        device_id: int,
+        max_timeout: float | None = None,
+        attempts: int = TRANSACTION_ATTEMPTS,
+    ):
+        """Read holding registers and record the raw values in the register image."""
+        result = await self._transact(
+            "read_holding_registers",
+            max_timeout=max_timeout,
+            attempts=attempts,
+            address=address,
+            count=count,
+            device_id=device_id
+        )
+        if not result.isError():
+            now = time.monotonic()
+            for offset, raw_value in enumerate(result.registers):
+                register = address + offset
+                self._register_read_at[register] = now
+                if self.register_image.get(register) != raw_value:
+                    self.register_image[register] = raw_value
+                    self._register_changes[register] = raw_value
+        return result
+
+    @callback
+    def async_add_stream_listener(
+        self, listener: Callable[[dict[str, Any], dict[int, int]], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for decoded snapshots and raw register deltas.
+
+        Listeners are called straight from the update path, before the data
+        reaches the state machine. Returns a callable that removes the listener.
+        """
+        self._stream_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            if listener in self._stream_listeners:
+                self._stream_listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def _publish_stream(self, data: dict[str, Any]) -> None:
+        """Push the latest snapshot and register deltas to stream listeners."""
+        changes = self._register_changes
+        self._register_changes = {}
+        for listener in list(self._stream_listeners):
+            try:
+                listener(data, changes)
+            except Exception as err:
+                _LOGGER.error("Error in stream listener: %s", err)
+
+    def _planned_registers(self) -> dict[str, int]:
+        """Return the data key -> register assignments to poll."""
+        registers = {
+            "power_state": self.power_register,
+            "mode": self.mode_register,
+            "current_temp": self.temp_register,
+            "target_temp": self.target_temp_register,
+            "sterilize_mode": self.sterilize_register,
+            **self.additional_registers,
+            # Diagnostic state registers (raw integer, no scaling)
+            "heater_assist_raw": self.heater_assist_register,
+            "sanitize_state_raw": self.sanitize_state_register,
+        }
+        return {
+            key: register
+            for key, register in registers.items()
+            if register is not None
+            and (not self._track_consumers or key in _CORE_KEYS or key in self._register_consumers)
+        }
+
+    @property
+    def nominal_interval(self) -> float:
+        """Return the poll interval before fleet phase alignment (seconds)."""
+        return self._nominal_interval
+
+    @property
+    def connected(self) -> bool:
+        """Return True while the gateway connection is open."""
+        return self._client is not None and self._client.connected
+
+    @property
+    def polled_keys(self) -> list[str]:
+        """Return the data keys currently polled."""
+        return sorted(self._planned_registers())
+
+    @callback
+    def async_add_register_consumer(self, key: str) -> CALLBACK_TYPE:
+        """Declare that key must be polled. Returns a callable that releases it."""
+        self._register_consumers[key] = self._register_consumers.get(key, 0) + 1
+        self._read_plan = None
+
+        @callback
+        def remove_consumer() -> None:
+            self._register_consumers[key] -= 1
+            if not self._register_consumers[key]:
+                del self._register_consumers[key]
+                _LOGGER.debug("No consumers left for %s, no longer polling it", key)
+            self._read_plan = None
+
+        return remove_consumer
+
+    @callback
+    def async_start_consumer_tracking(self) -> None:
+        """Poll only consumed optional keys from now on (call after platform setup)."""
+        self._track_consumers = True
+        self._read_plan = None
+
+    def _decode_register(self, key: str, raw_value: int, data: dict[str, Any]) -> None:
+        """Decode one raw register value into data."""
+        self.codec.decode(key, raw_value, data)
+        _LOGGER.debug("Decoded %s: raw=%s -> %s", key, raw_value, data[key])
+
+    def _ordered_blocks(self) -> list[ReadBlock]:
+        """Return this cycle's blocks, low-priority blocks deferred last cycle first."""
+        if self._read_plan is None:
+            self._read_plan = build_read_plan(
+                self._planned_registers(),
+                _KEY_PRIORITIES,
+                singles=self._single_registers,
+                layout=self._read_layout,
+            )
+            _LOGGER.debug("Read plan: %s", self._read_plan)
+        return sorted(
+            self._read_plan,
+            key=lambda block: (-block.priority, block.start not in self._deferred, block.start),
+        )
+
+    def _over_budget(self, deadline: float) -> bool:
+        """Return True if another request would likely finish past the deadline."""
+        estimate = (self.link.rtt.srtt or self.link.rtt.timeout) + self.link.pacer.gap
+        return time.monotonic() + estimate > deadline
+
+    async def _async_read_block(self, block: ReadBlock, data: dict[str, Any], probe: bool = False) -> int:
+        """Read one block and decode its keys, return the number of registers read.
+
+        With probe the block's first request doubles as the liveness probe
+        of an idle socket.
+        """
+        async def read(address: int, count: int):
+            nonlocal probe
+            if probe:
+                probe = False
+                return await self._async_probe_read(address, count)
+            return await self._read_holding_registers(address=address, count=count, device_id=self.modbus_unit)
+
+        values: dict[str, int] = {}
+        try:
+            read_count = await read_block(read, block, values, self._on_block_rejected)
+        except UpdateFailed:
+            raise
+        except Exception as ex:
+            _LOGGER.exception("Exception reading %s: %s", block, ex)
+            # Single reads of a split block that succeeded before still count
+            read_count = len({block.keys[key] for key in values})
+
+        for key, raw_value in values.items():
+            self._decode_register(key, raw_value, data)
+        return read_count
+
+    def _on_block_rejected(self, block: ReadBlock, result: Any) -> None:
+        """Handle a block read the device answered with an exception response."""
+        if block.count == 1:
+            _LOGGER.warning("Failed to read register %s %s: %s", block.start, sorted(block.keys), result)
+            return
+        # The device may reject reads spanning unmapped registers: read the
+        # members one by one now and keep them separate from now on
+        _LOGGER.debug("Block read %s failed (%s), falling back to single reads", block, result)
+        self.poll_stats.split_blocks += 1
+        self._single_registers.update(block.registers)
+        self._read_plan = None
 
     async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch all data from modbus."""
+        """Poll in one of the fleet's slots, then line up the next phase point.
+
+        Connecting (with its backoff) happens before the slot is taken, so
+        an unreachable gateway does not keep other heaters from polling.
+        """
         try:
-            # Process any pending writes first
-            if self._pending_writes:
-                _LOGGER.debug("Pending writes present before read: %s", self._pending_writes)
-                await self._process_pending_writes()
+            await self._async_ensure_connection()
+            async with self.fleet.slot():
+                return await self._async_poll()
+        finally:
+            self.update_interval = timedelta(
+                seconds=self.fleet.next_delay(self._fleet_member, self._nominal_interval)
+            )
+            if self.link.recorder:
+                await self._async_flush_trace()
 
-            # Connect if needed
-            if not self._client or not self._client.connected:
-                await self._connect()
+    async def async_start_trace(self, path: str, duration: float) -> None:
+        """Record every request to this device's gateway into a trace file.
 
-            data = {}
+        All units behind the gateway are recorded. A recording already
+        running on the gateway is stopped first.
+        """
+        await self.async_stop_trace()
+        self.link.recorder = TraceRecorder(path, f"{self.host}:{self.port}", duration)
+        await self.hass.async_add_executor_job(self.link.recorder.write)
+        _LOGGER.info("Recording Modbus trace of %s:%s to %s", self.host, self.port, path)
 
-            # Read core registers
-            async with self._lock:
-                # Read power state
-                try:
-                    power_result = await self._client.read_holding_registers(
-                        address=self.power_register,
-                        count=1,
-                        device_id=self.modbus_unit
-                    )
-                    if not power_result.isError():
-                        data["power_state"] = bool(power_result.registers[0])
-                        _LOGGER.debug("Read power register %s -> %s", self.power_register, power_result.registers[0])
-                    else:
-                        _LOGGER.warning("Failed to read power register %s : %s", self.power_register, power_result)
-                except Exception as ex:
-                    _LOGGER.exception("Exception reading power register: %s", ex)
+    async def async_stop_trace(self) -> str | None:
+        """Stop recording the gateway's trace, return the file path."""
+        recorder, self.link.recorder = self.link.recorder, None
+        if recorder is None:
+            return None
+        await self.hass.async_add_executor_job(recorder.close, recorder.take())
+        _LOGGER.info("Stopped Modbus trace %s after %d request(s)", recorder.path, recorder.records)
+        return recorder.path
 
-                # Read mode
-                try:
-                    mode_result = await self._client.read_holding_registers(
-                        address=self.mode_register,
-                        count=1,
-                        device_id=self.modbus_unit
-                    )
-                    if not mode_result.isError():
-                        mode_value = mode_result.registers[0]
-                        data["mode_value"] = mode_value
-                        data["mode"] = self.value_to_mode.get(mode_value, "eco")
-                        _LOGGER.debug("Read mode register %s -> raw=%s mapped=%s", self.mode_register, mode_value, data["mode"])
-                    else:
-                        _LOGGER.warning("Failed to read mode register %s : %s", self.mode_register, mode_result)
-                except Exception as ex:
-                    _LOGGER.exception("Exception reading mode register: %s", ex)
+    async def _async_flush_trace(self) -> None:
+        """Write recorded requests out after a cycle, stop once the duration is over.
 
-                # Read current temperature (sensors use temp_scale/temp_offset by default)
-                try:
-                    temp_result = await self._client.read_holding_registers(
-                        address=self.temp_register,
-                        count=1,
-                        device_id=self.modbus_unit
-                    )
-                    if not temp_result.isError():
-                        raw_temp = temp_result.registers[0]
-                        data["current_temp"] = (raw_temp * self.temp_scale) + self.temp_offset
-                        data["current_temp_raw"] = raw_temp
-                        _LOGGER.debug(
-                            "Read temp register %s -> raw=%s scaled=%s (scale=%s offset=%s)",
-                            self.temp_register, raw_temp, data["current_temp"], self.temp_scale, self.temp_offset
-                        )
-                    else:
-                        _LOGGER.warning("Failed to read temperature register %s : %s", self.temp_register, temp_result)
-                except Exception as ex:
-                    _LOGGER.exception("Exception reading temperature register: %s", ex)
+        Runs at the end of every update, so a failing trace file stops the
+        recording instead of failing the poll.
+        """
+        recorder = self.link.recorder
+        try:
+            if recorder.expired:
+                await self.async_stop_trace()
+            else:
+                await self.hass.async_add_executor_job(recorder.write, recorder.take())
+        except OSError as err:
+            _LOGGER.error("Writing Modbus trace %s failed, recording stopped: %s", recorder.path, err)
+            if self.link.recorder is recorder:
+                self.link.recorder = None
+            try:
+                await self.hass.async_add_executor_job(recorder.close)
+            except OSError:
+                _LOGGER.debug("Error closing trace %s (ignored)", recorder.path)
 
-                # Read target temperature (apply target scaling)
-                try:
-                    target_result = await self._client.read_holding_registers(
-                        address=self.target_temp_register,
-                        count=1,
-                        device_id=self.modbus_unit
-                    )
-                    if not target_result.isError():
-                        raw_target = target_result.registers[0]
-                        data["target_temp_raw"] = raw_target
-                        data["target_temp"] = (raw_target * self.target_temp_scale) + self.target_temp_offset
-                        _LOGGER.debug(
-                            "Read target temp register %s -> raw=%s scaled=%s (scale=%s offset=%s)",
-                            self.target_temp_register, raw_target, data["target_temp"],
-                            self.target_temp_scale, self.target_temp_offset
-                        )
-                    else:
-                        _LOGGER.warning("Failed to read target temperature register %s : %s", self.target_temp_register, target_result)
-                except Exception as ex:
-                    _LOGGER.exception("Exception reading target temperature register: %s", ex)
-
-                # Read sterilize mode
-                if self.sterilize_register is not None:
-                    try:
-                        sterilize_result = await self._client.read_holding_registers(
-                            address=self.sterilize_register,
-                            count=1,
-                            device_id=self.modbus_unit
-                        )
-                        if not sterilize_result.isError():
-                            sterilize_value = sterilize_result.registers[0]
-                            data["sterilize_mode"] = bool(sterilize_value)
-                            _LOGGER.debug("Read sterilize register %s -> %s", self.sterilize_register, sterilize_value)
-                        else:
-                            _LOGGER.warning("Failed to read sterilize register %s : %s", self.sterilize_register, sterilize_result)
-                    except Exception as ex:
-                        _LOGGER.exception("Exception reading sterilize register: %s", ex)
+    async def _async_ensure_connection(self) -> None:
+        """Connect if needed (an idle socket is checked by the poll's first read)."""
+        try:
+            if not self._client or not self._client.connected:
+                await self._connect()
+        except UpdateFailed:
+            raise
+        except ModbusException as err:
+            _LOGGER.exception("ModbusException while connecting: %s", err)
+            raise UpdateFailed(f"Modbus communication error: {err}")
+        except Exception as err:
+            _LOGGER.error("Unexpected error: %s\n%s", err, traceback.format_exc())
+            raise UpdateFailed(f"Unexpected error: {err}")
 
-                # Determine operation state
-                if data.get("power_state", False):
-                    data["operation"] = data.get("mode", "eco")
-                else:
-                    data["operation"] = "off"
-
-                # Read additional sensors if enabled
-                if self.enable_additional_sensors:
-                    for sensor_name, register in self.additional_registers.items():
-                        if register is None:
-                            _LOGGER.debug("No register configured for sensor %s, skipping", sensor_name)
-                            continue
-
-                        try:
-                            result = await self._client.read_holding_registers(
-                                address=register,
-                                count=1,
-                                device_id=self.modbus_unit
-                            )
+    async def _async_poll(self) -> dict[str, Any]:
+        """Fetch all data from modbus within the cycle budget."""
+        cycle_start = time.monotonic()
+        interval = self._nominal_interval
+        budget = interval * CYCLE_BUDGET_FRACTION
+        deadline = cycle_start + budget
+        try:
+            # Process any pending writes first
+            if self._pending_writes:
+                _LOGGER.debug("Pending writes present before read: %s", self._pending_writes)
+                await self._process_pending_writes()
 
-                            if not result.isError():
-                                raw_value = result.registers[0]
-
-                                # Apply correct scaling:
-                                # exhaust_temp — keep raw value (as original code implied), otherwise use sensors scaling
-                                if sensor_name == "exhaust_temp":
-                                    data[sensor_name] = raw_value
-                                    _LOGGER.debug("Read %s register %s -> raw=%s (no scaling)", sensor_name, register, raw_value)
-                                else:
-                                    data[sensor_name] = (raw_value * self.sensors_temp_scale) + self.sensors_temp_offset
-                                    _LOGGER.debug(
-                                        "Read %s register %s -> raw=%s scaled=%s (scale=%s offset=%s)",
-                                        sensor_name, register, raw_value, data[sensor_name],
-                                        self.sensors_temp_scale, self.sensors_temp_offset
-                                    )
-                            else:
-                                _LOGGER.debug("Failed to read %s register %s : %s", sensor_name, register, result)
-                        except Exception as ex:
-                            _LOGGER.exception("Error reading %s: %s", sensor_name, ex)
-
-                # Read diagnostic state registers (raw integer, no scaling)
-                for reg_name, register in [
-                    ("heater_assist_raw", self.heater_assist_register),
-                    ("sanitize_state_raw", self.sanitize_state_register),
-                ]:
-                    if register is None:
+            data = {}
+            deferred: set[int] = set()
+            planned = 0
+            read = 0
+            # A socket idle for long may be half-open: the first read probes it
+            probe = time.monotonic() - self._last_activity >= LIVENESS_IDLE
+
+            async with self._bus_lock():
+                for block in self._ordered_blocks():
+                    planned += len(block.registers)
+                    if block.priority < PRIORITY_HIGH and self._over_budget(deadline):
+                        # Out of time: read it first thing next cycle, keep the
+                        # previous values meanwhile
+                        deferred.add(block.start)
+                        for key, register in block.keys.items():
+                            if register in self.register_image:
+                                self._decode_register(key, self.register_image[register], data)
                         continue
-                    try:
-                        result = await self._client.read_holding_registers(
-                            address=register,
-                            count=1,
-                            device_id=self.modbus_unit
-                        )
-                        if not result.isError():
-                            data[reg_name] = result.registers[0]
-                            _LOGGER.debug("Read %s register %s -> %s", reg_name, register, data[reg_name])
-                        else:
-                            _LOGGER.debug("Failed to read %s register %s: %s", reg_name, register, result)
-                    except Exception as ex:
-                        _LOGGER.exception("Error reading %s: %s", reg_name, ex)
+                    read += await self._async_read_block(block, data, probe)
+                    probe = False
+
+            # Determine operation state
+            if data.get("power_state", False):
+                data["operation"] = data.get("mode", "eco")
+            else:
+                data["operation"] = "off"
+
+            duration = time.monotonic() - cycle_start
+            self._deferred = deferred
+            self.metrics.cycle_duration.observe(duration)
+            self.poll_stats.cycle_finished(
+                cycle_start, duration, budget, interval, planned, read, len(deferred)
+            )
+            self.fleet.record(read)
+            if deferred or duration > budget:
+                _LOGGER.debug(
+                    "Poll cycle took %.2fs of %.2fs budget, deferred %d block(s)",
+                    duration, budget, len(deferred)
+                )
 
             _LOGGER.debug("Modbus data updated: %s", data)
+            self._adapt_update_interval(data)
+            self._publish_stream(data)
             return data
 
+        except UpdateFailed:
+            raise
         except ModbusException as err:
             _LOGGER.exception("ModbusException during update: %s", err)
             raise UpdateFailed(f"Modbus communication error: {err}")
@@ -288,53 +627,178 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
             _LOGGER.error("Unexpected error: %s\n%s", err, traceback.format_exc())
             raise UpdateFailed(f"Unexpected error: {err}")
 
+    def _is_active(self, data: dict[str, Any]) -> bool:
+        """Return True if the heater is doing something worth polling fast."""
+        # Temperatures moving since the previous poll, in the same direction
+        # as their last change: a reading flickering by one step is not
+        moving = False
+        for key in _ADAPTIVE_TEMP_KEYS:
+            value = data.get(key)
+            if value is None:
+                continue
+            previous = self._previous_temps.get(key)
+            if previous is not None and abs(value - previous) >= ADAPTIVE_TEMP_DELTA:
+                trend = 1 if value > previous else -1
+                if self._temp_trends.get(key) == trend:
+                    moving = True
+                self._temp_trends[key] = trend
+            self._previous_temps[key] = value
+
+        if moving:
+            return True
+
+        # A write just happened, follow the heater's reaction closely
+        if self._last_write is not None and time.monotonic() - self._last_write < ADAPTIVE_WRITE_HOLD:
+            return True
+
+        # Active substates: heater assist element or sanitize cycle running
+        if data.get("heater_assist_raw"):
+            return True
+        return data.get("sanitize_state_raw") in SANITIZE_ACTIVE_VALUES
+
+    def _adapt_update_interval(self, data: dict[str, Any]) -> None:
+        """Shorten the poll interval while active, back off while idle."""
+        if not self.adaptive_polling:
+            return
+
+        current = self._nominal_interval
+        if self._is_active(data):
+            interval = self.min_scan_interval
+        else:
+            interval = min(
+                self.max_scan_interval,
+                max(current, self.min_scan_interval) * ADAPTIVE_BACKOFF_FACTOR,
+            )
+
+        if interval != current:
+            _LOGGER.debug("Adaptive polling: update interval %ss -> %ss", current, interval)
+            self._nominal_interval = interval
+
     async def _connect(self) -> None:
-        """Establish modbus connection."""
-        try:
-            if self._client:
-                try:
-                    self._client.close()
-                except Exception:
-                    _LOGGER.debug("Error closing previous client (ignored)")
+        """Establish or re-establish the modbus connection.
 
-            self._client = AsyncModbusTcpClient(
+        The client object is reused across reconnects and attempts are spaced
+        with jittered exponential backoff, so a rebooted gateway is picked up
+        again within seconds.
+        """
+        if self._client is None:
+            # Per-request timeouts and retries are handled by _transact,
+            # reconnects by this method
+            self._client = create_client(
+                self.transport,
                 host=self.host,
                 port=self.port,
-                timeout=5
+                timeout=RTO_MAX,
+                retries=0,
+                reconnect_delay=0,
+                baudrate=self.baudrate,
+                parity=self.parity
+            )
+        else:
+            self.reconnect.lost()
+            try:
+                self._client.close()
+            except Exception:
+                _LOGGER.debug("Error closing previous connection (ignored)")
+
+        for _ in range(RECONNECT_ATTEMPTS):
+            delay = self.reconnect.next_delay()
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                connected = await asyncio.wait_for(self._client.connect(), timeout=CONNECT_TIMEOUT)
+            except Exception as err:
+                _LOGGER.debug("Connect attempt to %s:%s failed: %s", self.host, self.port, err)
+                connected = False
+            if connected:
+                break
+            self.reconnect.failed()
+        else:
+            _LOGGER.warning(
+                "Connection to %s:%s failed after %d attempts", self.host, self.port, RECONNECT_ATTEMPTS
             )
+            raise UpdateFailed("Failed to connect to modbus device")
 
-            connected = await self._client.connect()
-            if not connected:
-                raise UpdateFailed("Failed to connect to modbus device")
+        self._configure_socket()
+        self.reconnect.connected()
+        self._last_activity = time.monotonic()
+        _LOGGER.info(
+            "Connected to modbus device at %s:%s via %s (device_id=%s)",
+            self.host, self.port, self.transport, self.modbus_unit
+        )
 
-            _LOGGER.info("Connected to modbus device at %s:%s (device_id=%s)", self.host, self.port, self.modbus_unit)
+    def _configure_socket(self) -> None:
+        """Apply keepalive and no-delay options to the client's socket (TCP only)."""
+        transport = getattr(self._client.ctx, "transport", None)
+        sock = transport.get_extra_info("socket") if transport else None
+        # Serial and UDP transports have no stream socket, nothing to tune
+        try:
+            apply_socket_options(sock)
+        except OSError as err:
+            _LOGGER.debug("Could not set socket options: %s", err)
 
-        except Exception as err:
-            _LOGGER.exception("Connection failed: %s", err)
-            raise UpdateFailed(f"Connection failed: {err}")
+    async def _async_probe_read(self, address: int, count: int):
+        """Read registers as the liveness probe of an idle connection.
+
+        A single short attempt: any answer, even a Modbus exception
+        response, proves the socket alive. Without one the connection is
+        re-established and the registers read again normally, so the probe
+        costs no request of its own.
+        """
+        idle = time.monotonic() - self._last_activity
+        self.probes += 1
+        try:
+            return await self._read_holding_registers(
+                address=address,
+                count=count,
+                device_id=self.modbus_unit,
+                max_timeout=PROBE_TIMEOUT,
+                attempts=1,
+            )
+        except (asyncio.TimeoutError, ModbusException) as err:
+            self.probe_failures += 1
+            _LOGGER.info(
+                "Liveness probe to %s:%s failed after %.0fs idle (%s), reconnecting",
+                self.host, self.port, idle, str(err) or type(err).__name__
+            )
+        await self._connect()
+        return await self._read_holding_registers(
+            address=address, count=count, device_id=self.modbus_unit
+        )
+
+    async def async_probe(self, device_id: int, registers: list[int]) -> dict[int, int]:
+        """Read registers of any unit behind this gateway over the open connection.
+
+        Lets the config flow validate a unit without opening a second socket
+        to a gateway that may only accept one.
+        """
+        if not self._client or not self._client.connected:
+            raise ConnectionError("Not connected")
+
+        async def read(address: int, count: int):
+            return await self._transact(
+                "read_holding_registers", address=address, count=count, device_id=device_id
+            )
+
+        async with self._bus_lock():
+            return await read_registers(read, registers)
 
     async def _process_pending_writes(self) -> None:
         """Process any pending write operations."""
         if not self._pending_writes:
             return
             
-        async with self._lock:
+        async with self._bus_lock():
             for operation, params in self._pending_writes.items():
                 try:
                     if operation == "target_temp":
                         # Log the incoming request
                         _LOGGER.info("Target temp write requested: %s°C", params)
                         
-                        # Check if target temp uses scaling
-                        if self.target_temp_scale != 1.0 or self.target_temp_offset != 0.0:
-                            # Reverse the scaling when writing back
-                            raw_value = int((params - self.target_temp_offset) / self.target_temp_scale)
-                            _LOGGER.info("Writing target temp with scaling: %s°C -> raw value %d (scale=%s, offset=%s)", 
-                                        params, raw_value, self.target_temp_scale, self.target_temp_offset)
-                        else:
-                            # No scaling - write the value directly
-                            raw_value = int(params)
-                            _LOGGER.info("Writing target temp without scaling: %s°C -> raw value %d", params, raw_value)
+                        # Reverse the scaling when writing back
+                        raw_value = self.codec.encode_target_temp(params)
+                        _LOGGER.info("Writing target temp: %s°C -> raw value %d (scale=%s, offset=%s)",
+                                    params, raw_value, self.target_temp_scale, self.target_temp_offset)
                         
                         # Validate the value is within reasonable bounds
                         if raw_value < 0 or raw_value > 100:
@@ -343,7 +807,8 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
                         _LOGGER.info("Sending write_register: address=%d, value=%d, device_id=%d", 
                                     self.target_temp_register, raw_value, self.modbus_unit)
                         
-                        result = await self._client.write_register(
+                        result = await self._transact(
+                            "write_register",
                             address=self.target_temp_register,
                             value=raw_value,
                             device_id=self.modbus_unit
@@ -355,7 +820,8 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
                             _LOGGER.info("Successfully wrote target temp = %s (raw=%d)", params, raw_value)
                     
                     elif operation == "power_state":
-                        result = await self._client.write_register(
+                        result = await self._transact(
+                            "write_register",
                             address=self.power_register,
                             value=1 if params else 0,
                             device_id=self.modbus_unit
@@ -367,10 +833,12 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
                     
                     elif operation == "mode":
                         # Use lowercase mode values
-                        if params in self.mode_values:
-                            result = await self._client.write_register(
+                        mode_value = self.codec.encode_mode(params)
+                        if mode_value is not None:
+                            result = await self._transact(
+                                "write_register",
                                 address=self.mode_register,
-                                value=self.mode_values[params],
+                                value=mode_value,
                                 device_id=self.modbus_unit
                             )
                             if result.isError():
@@ -380,7 +848,8 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
 
                     elif operation == "sterilize_mode":
                         if self.sterilize_register is not None:
-                            result = await self._client.write_register(
+                            result = await self._transact(
+                                "write_register",
                                 address=self.sterilize_register,
                                 value=1 if params else 0,
                                 device_id=self.modbus_unit
@@ -394,20 +863,23 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
                         # Handle water heater operation mode changes (now lowercase!)
                         if params == "off":  # lowercase!
                             # Turn off power
-                            result = await self._client.write_register(
+                            result = await self._transact(
+                                "write_register",
                                 address=self.power_register,
                                 value=0,
                                 device_id=self.modbus_unit
                             )
-                        elif params in self.mode_values:  # mode_values should have lowercase keys
+                        elif self.codec.encode_mode(params) is not None:  # lowercase mode names
                             # Set mode first, then turn on power
-                            mode_result = await self._client.write_register(
+                            mode_result = await self._transact(
+                                "write_register",
                                 address=self.mode_register,
-                                value=self.mode_values[params],
+                                value=self.codec.encode_mode(params),
                                 device_id=self.modbus_unit
                             )
                             if not mode_result.isError():
-                                power_result = await self._client.write_register(
+                                power_result = await self._transact(
+                                    "write_register",
                                     address=self.power_register,
                                     value=1,
                                     device_id=self.modbus_unit
@@ -425,31 +897,44 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
             # Clear pending writes after processing
             self._pending_writes.clear()
 
+    def _mark_write(self) -> None:
+        """Note a write, adaptive polling then follows the heater's reaction."""
+        self._last_write = time.monotonic()
+        if self.adaptive_polling:
+            # Poll fast right away to follow the heater's reaction
+            self._nominal_interval = self.min_scan_interval
+            self.update_interval = timedelta(seconds=self.min_scan_interval)
+
     async def write_register(self, operation: str, value: Any) -> bool:
         """Queue a register write and immediately read back status."""
+        if operation in self._pending_writes:
+            # Still waiting for the bus: only the newest value is written
+            self.metrics.elided_writes += 1
         self._pending_writes[operation] = value
+        self._mark_write()
         
         # Process the write immediately
+        start = time.monotonic()
         await self._process_pending_writes()
+        self.metrics.write_latency.observe(time.monotonic() - start)
         
         # Immediately read back the relevant registers to update UI
         try:
-            async with self._lock:
+            async with self._bus_lock():
                 if operation == "target_temp":
                     # Read back target temp after write
-                    result = await self._client.read_holding_registers(
+                    result = await self._read_holding_registers(
                         address=self.target_temp_register,
                         count=1,
                         device_id=self.modbus_unit
                     )
                     if not result.isError() and result.registers:
-                        raw_target = result.registers[0]
-                        self.data["target_temp"] = (raw_target * self.target_temp_scale) + self.target_temp_offset
+                        self.codec.decode("target_temp", result.registers[0], self.data)
                         _LOGGER.debug("Read back target temp: %s", self.data["target_temp"])
                         
                 elif operation == "power_state":
                     # Read back power state after write
-                    result = await self._client.read_holding_registers(
+                    result = await self._read_holding_registers(
                         address=self.power_register,
                         count=1,
                         device_id=self.modbus_unit
@@ -463,15 +948,13 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
                         
                 elif operation == "mode":
                     # Read back mode after write
-                    result = await self._client.read_holding_registers(
+                    result = await self._read_holding_registers(
                         address=self.mode_register,
                         count=1,
                         device_id=self.modbus_unit
                     )
                     if not result.isError() and result.registers:
-                        mode_value = result.registers[0]
-                        self.data["mode_value"] = mode_value
-                        self.data["mode"] = self.value_to_mode.get(mode_value, "eco")
+                        self.codec.decode("mode", result.registers[0], self.data)
                         if self.data.get("power_state", False):
                             self.data["operation"] = self.data["mode"]
                         _LOGGER.debug("Read back mode: %s", self.data["mode"])
@@ -479,7 +962,7 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
                 elif operation == "sterilize_mode":
                     # Read back sterilize mode after write
                     if self.sterilize_register is not None:
-                        result = await self._client.read_holding_registers(
+                        result = await self._read_holding_registers(
                             address=self.sterilize_register,
                             count=1,
                             device_id=self.modbus_unit
@@ -490,12 +973,12 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
 
                 elif operation == "operation_mode":
                     # After setting operation mode, read both power and mode
-                    power_result = await self._client.read_holding_registers(
+                    power_result = await self._read_holding_registers(
                         address=self.power_register,
                         count=1,
                         device_id=self.modbus_unit
                     )
-                    mode_result = await self._client.read_holding_registers(
+                    mode_result = await self._read_holding_registers(
                         address=self.mode_register,
                         count=1,
                         device_id=self.modbus_unit
@@ -505,9 +988,7 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
                         self.data["power_state"] = bool(power_result.registers[0])
                         
                     if not mode_result.isError() and mode_result.registers:
-                        mode_value = mode_result.registers[0]
-                        self.data["mode_value"] = mode_value
-                        self.data["mode"] = self.value_to_mode.get(mode_value, "eco")
+                        self.codec.decode("mode", mode_result.registers[0], self.data)
                         
                     # Update operation based on combined state
                     if self.data.get("power_state", False):
@@ -518,6 +999,7 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
                     _LOGGER.debug("Read back operation: %s", self.data["operation"])
             
             # Notify all listeners that data has been updated
+            self._publish_stream(self.data)
             self.async_set_updated_data(self.data)
             
         except Exception as err:
@@ -525,8 +1007,157 @@ class MideaModbusCoordinator(DataUpdateCoordinator):
         
         return True
 
+    async def async_cache_read(self, address: int, count: int) -> list[int]:
+        """Return registers for the cache server, reading stale ones from the heater.
+
+        Registers read within cache_max_age are answered from the register
+        image; otherwise the span of stale registers is read over the
+        integration's connection, between poll cycles like any other read.
+        Failures are cached per span too: an exception response (e.g. a
+        register the heater does not have) for cache_max_age, a request
+        that got no answer for CACHE_RETRY_INTERVAL, so clients polling a
+        bad span do not put a request on the bus each time.
+        """
+        span = self._cache_stale_span(address, count)
+        if span is None:
+            self.cache_stats["hits"] += 1
+            return [self.register_image[register] for register in range(address, address + count)]
+        self._raise_cached_failure(span)
+
+        if not self._client or not self._client.connected:
+            raise CacheServerError(GATEWAY_TARGET_FAILED)
+        async with self._bus_lock():
+            # Another client may have read or failed the span while this one waited
+            span = self._cache_stale_span(address, count)
+            if span is None:
+                self.cache_stats["hits"] += 1
+            else:
+                self._raise_cached_failure(span)
+                self.cache_stats["misses"] += 1
+                try:
+                    result = await self._read_holding_registers(
+                        address=span[0], count=span[1], device_id=self.modbus_unit
+                    )
+                except (asyncio.TimeoutError, ModbusException) as err:
+                    _LOGGER.debug("Cache server read of %s+%s failed: %s", address, count, err)
+                    self._cache_failures[span] = (
+                        time.monotonic() + CACHE_RETRY_INTERVAL, GATEWAY_TARGET_FAILED
+                    )
+                    raise CacheServerError(GATEWAY_TARGET_FAILED) from err
+                if result.isError():
+                    code = getattr(result, "exception_code", 0) or SERVER_DEVICE_FAILURE
+                    self._cache_failures[span] = (time.monotonic() + self.cache_max_age, code)
+                    raise CacheServerError(code)
+                self._cache_failures.pop(span, None)
+        return [self.register_image[register] for register in range(address, address + count)]
+
+    def _cache_stale_span(self, address: int, count: int) -> tuple[int, int] | None:
+        """Return (address, count) spanning the stale registers of a request, None if all are fresh."""
+        now = time.monotonic()
+        stale = [
+            register
+            for register in range(address, address + count)
+            if now - self._register_read_at.get(register, -self.cache_max_age - 1) > self.cache_max_age
+        ]
+        return (stale[0], stale[-1] - stale[0] + 1) if stale else None
+
+    def _raise_cached_failure(self, span: tuple[int, int]) -> None:
+        """Raise the cached failure of a read-through span, if it has not expired."""
+        failure = self._cache_failures.get(span)
+        if failure is None:
+            return
+        expires, code = failure
+        if time.monotonic() >= expires:
+            del self._cache_failures[span]
+            return
+        self.cache_stats["failure_hits"] += 1
+        raise CacheServerError(code)
+
+    async def async_cache_write(self, address: int, values: list[int]) -> None:
+        """Write registers for the cache server over the integration's connection.
+
+        Refused with an illegal function exception unless the entry allows
+        cache server writes. The write does not go through _pending_writes:
+        that queue holds one entity operation each and keeps only its newest
+        value, while a client writes raw registers and needs the heater's own
+        answer (or exception) to the very request it sent. Queued entity
+        writes go out first, so writes still reach the heater in the order
+        they were made; the written registers are read again on the next
+        request for them and the entities follow with a refresh.
+        """
+        if not self.cache_server_writes:
+            raise CacheServerError(ILLEGAL_FUNCTION)
+        if not self._client or not self._client.connected:
+            raise CacheServerError(GATEWAY_TARGET_FAILED)
+        self._mark_write()
+        start = time.monotonic()
+        await self._process_pending_writes()
+        try:
+            async with self._bus_lock():
+                if len(values) == 1:
+                    result = await self._transact(
+                        "write_register", address=address, value=values[0], device_id=self.modbus_unit
+                    )
+                else:
+                    result = await self._transact(
+                        "write_registers", address=address, values=values, device_id=self.modbus_unit
+                    )
+        except (asyncio.TimeoutError, ModbusException) as err:
+            _LOGGER.debug("Cache server write of %s+%s failed: %s", address, len(values), err)
+            raise CacheServerError(GATEWAY_TARGET_FAILED) from err
+        if result.isError():
+            raise CacheServerError(getattr(result, "exception_code", SERVER_DEVICE_FAILURE))
+
+        self.metrics.write_latency.observe(time.monotonic() - start)
+        self.cache_stats["writes"] += 1
+        _LOGGER.info("Cache server client wrote %s to registers %s+", values, address)
+        for register in range(address, address + len(values)):
+            self._register_read_at.pop(register, None)
+        await self.async_request_refresh()
+
+    async def async_attach_cache_server(self) -> None:
+        """Serve this unit on the configured cache server port, starting the server if needed."""
+        if not self.cache_server_port:
+            return
+        servers: dict[int, CacheServer] = self.hass.data.setdefault(DATA_CACHE_SERVERS, {})
+        server = servers.get(self.cache_server_port)
+        if server is None:
+            # Registered before starting so entries set up together share it
+            server = servers[self.cache_server_port] = CacheServer(self.cache_server_port, self.cache_server_host)
+            try:
+                await server.start()
+            except OSError as err:
+                del servers[self.cache_server_port]
+                _LOGGER.error("Could not start the Modbus cache server on port %s: %s", self.cache_server_port, err)
+                return
+        elif server.host != self.cache_server_host:
+            _LOGGER.warning(
+                "Modbus cache server on port %s listens on %s, not %s as configured for %s:%s",
+                self.cache_server_port, server.host, self.cache_server_host, self.host, self.port
+            )
+        if not server.attach(self.modbus_unit, self):
+            _LOGGER.error(
+                "Modbus cache server on port %s already serves unit %s, not serving %s:%s there",
+                self.cache_server_port, self.modbus_unit, self.host, self.port
+            )
+            return
+        self.cache_server = server
+
+    async def _async_detach_cache_server(self) -> None:
+        """Stop serving this unit, stopping the server once no unit is left."""
+        server, self.cache_server = self.cache_server, None
+        if server is not None and server.detach(self.modbus_unit):
+            self.hass.data[DATA_CACHE_SERVERS].pop(server.port, None)
+            await server.stop()
+
     async def async_shutdown(self) -> None:
         """Shutdown the coordinator and close connections."""
+        self.fleet.leave(self._fleet_member)
+        await self._async_detach_cache_server()
+        try:
+            await self.async_stop_trace()
+        except OSError as err:
+            _LOGGER.error("Closing Modbus trace on shutdown failed: %s", err)
         if self._client:
             try:
                 self._client.close()
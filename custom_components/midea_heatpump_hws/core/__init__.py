@@ -0,0 +1,18 @@
+"""Protocol and decoding core of the Midea Heat Pump Water Heater integration.
+
+Nothing in this package imports Home Assistant (pymodbus only where a client
+is created), so the test tools and benchmarks in files/ load it directly and
+start in milliseconds:
+
+- decode: raw register values to data keys and back (scaling, modes)
+- read_plan: block read planning and poll cycle accounting
+- transport: client factory, round-trip and pacing state per gateway
+- fleet: domain-wide poll scheduling
+- discovery, fingerprint: gateway/unit discovery and profile ranking
+- bus_trace: Modbus traffic traces
+- timeseries: columnar sample chunk files
+- cache_server: local Modbus TCP server answering from register images
+- metrics: bus and poll counters, OpenMetrics rendering
+
+Submodules are imported explicitly, this module imports none of them.
+"""
@@ -0,0 +1,219 @@
+"""Recording of Modbus traffic to compact trace files, and reading them back.
+
+A trace starts with the magic, the wall clock start time and the gateway
+label, followed by one fixed-size record per request attempt (offset from
+the start, round trip, unit, function, outcome, exception code, address,
+count or written value, number of values) and its values: those returned
+by a read, those written by a multiple register write.
+"""
+from __future__ import annotations
+
+import struct
+import threading
+import time
+from typing import Any
+
+TRACE_MAGIC = b"MHWSTRC1"
+_HEADER = "<dB"
+_RECORD = "<dfBBBBHHH"
+
+# Recording stops by itself after this long unless a duration is given
+# (seconds), and never runs longer than the maximum
+TRACE_DEFAULT_DURATION = 600
+TRACE_MAX_DURATION = 86400
+
+# Request outcomes
+OUTCOME_OK = 0
+OUTCOME_EXCEPTION = 1  # Modbus exception response
+OUTCOME_TIMEOUT = 2  # No response within the request timeout
+OUTCOME_ERROR = 3  # Connection lost or garbled response
+
+OUTCOME_NAMES = {
+    OUTCOME_OK: "ok",
+    OUTCOME_EXCEPTION: "exception",
+    OUTCOME_TIMEOUT: "timeout",
+    OUTCOME_ERROR: "error",
+}
+
+# pymodbus client method -> Modbus function code
+FUNCTION_CODES = {
+    "read_holding_registers": 0x03,
+    "read_input_registers": 0x04,
+    "write_register": 0x06,
+    "write_registers": 0x10,
+}
+
+
+class TraceRecord:
+    """One recorded request attempt."""
+
+    __slots__ = (
+        "offset", "duration", "unit", "function", "outcome", "exception_code", "address", "count", "values",
+    )
+
+    def __init__(
+        self,
+        offset: float,
+        duration: float,
+        unit: int,
+        function: int,
+        outcome: int,
+        exception_code: int,
+        address: int,
+        count: int,
+        values: tuple[int, ...],
+    ) -> None:
+        """Initialize the record. count holds the value for single register writes."""
+        self.offset = offset
+        self.duration = duration
+        self.unit = unit
+        self.function = function
+        self.outcome = outcome
+        self.exception_code = exception_code
+        self.address = address
+        self.count = count
+        self.values = values
+
+    @property
+    def key(self) -> tuple[int, int, int, int]:
+        """Return what identifies the request: unit, function, address, count."""
+        return self.unit, self.function, self.address, self.count
+
+    def __repr__(self) -> str:
+        """Return a compact description for logs."""
+        return (
+            f"TraceRecord(+{self.offset:.3f}s unit {self.unit} fc {self.function} "
+            f"{self.address}+{self.count}: {OUTCOME_NAMES.get(self.outcome, self.outcome)} "
+            f"in {self.duration * 1000:.1f} ms)"
+        )
+
+
+class TraceRecorder:
+    """Collect request attempts in memory and append them to a trace file.
+
+    record() and take() only touch memory and belong in the event loop;
+    write() and close() do the file I/O and belong in an executor. The
+    recorder is shared by every unit behind a gateway, so file I/O is
+    serialized and a write() arriving after close() is dropped.
+    """
+
+    def __init__(self, path: str, label: str, duration: float = TRACE_DEFAULT_DURATION) -> None:
+        """Initialize the recorder, the file is created on the first flush."""
+        self.path = path
+        self.label = label
+        self.started = time.monotonic()
+        self.deadline = self.started + min(duration, TRACE_MAX_DURATION)
+        self.records = 0
+        self._start_time = time.time()
+        self._buffer = bytearray()
+        self._file = None
+        self._io_lock = threading.Lock()
+        self.closed = False
+
+    @property
+    def expired(self) -> bool:
+        """Return True once the recording duration is over."""
+        return time.monotonic() >= self.deadline
+
+    def record(self, method: str, kwargs: dict[str, Any], start: float, result: Any = None,
+               outcome: int | None = None) -> None:
+        """Record one attempt of a pymodbus client call started at start (monotonic).
+
+        Pass the response as result, or the outcome of an attempt without one.
+        """
+        duration = time.monotonic() - start
+        function = FUNCTION_CODES.get(method, 0)
+        values: tuple[int, ...] = ()
+        exception_code = 0
+        if result is None:
+            outcome = OUTCOME_ERROR if outcome is None else outcome
+        elif result.isError():
+            outcome = OUTCOME_EXCEPTION
+            exception_code = getattr(result, "exception_code", 0) or 0
+        else:
+            outcome = OUTCOME_OK
+            values = tuple(getattr(result, "registers", None) or ())
+        if "values" in kwargs:
+            # Multiple register write: the request carries the values
+            values = tuple(kwargs["values"])
+            count = len(values)
+        else:
+            count = kwargs.get("count", kwargs.get("value", 1))
+        self._buffer += struct.pack(
+            _RECORD, start - self.started, duration, kwargs.get("device_id", 1), function,
+            outcome, exception_code, kwargs.get("address", 0), count, len(values),
+        )
+        if values:
+            self._buffer += struct.pack(f"<{len(values)}H", *values)
+        self.records += 1
+
+    def take(self) -> bytes:
+        """Return the records buffered since the last call."""
+        buffer, self._buffer = self._buffer, bytearray()
+        return bytes(buffer)
+
+    def write(self, chunk: bytes = b"") -> None:
+        """Append records from take() to the file, creating it first if needed.
+
+        Does nothing once the recorder is closed.
+        """
+        with self._io_lock:
+            if not self.closed:
+                self._write(chunk)
+
+    def close(self, chunk: bytes = b"") -> None:
+        """Append the last records and close the file, only the first call does anything."""
+        with self._io_lock:
+            if self.closed:
+                return
+            self.closed = True
+            try:
+                self._write(chunk)
+            finally:
+                if self._file is not None:
+                    self._file.close()
+
+    def _write(self, chunk: bytes) -> None:
+        """Append to the file, holding the I/O lock."""
+        if self._file is None:
+            label = self.label.encode()[:255]
+            self._file = open(self.path, "wb")
+            self._file.write(TRACE_MAGIC + struct.pack(_HEADER, self._start_time, len(label)) + label)
+        self._file.write(chunk)
+        self._file.flush()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the recording state for diagnostics."""
+        return {
+            "path": self.path,
+            "records": self.records,
+            "remaining": max(0.0, self.deadline - time.monotonic()),
+        }
+
+
+def read_trace(data: bytes) -> tuple[float, str, list[TraceRecord]]:
+    """Parse a trace, return (wall clock start, gateway label, records).
+
+    A record cut short at the end (recording still running) is ignored.
+    Raises ValueError if data is not a trace.
+    """
+    if data[:len(TRACE_MAGIC)] != TRACE_MAGIC:
+        raise ValueError("Not a trace file")
+    offset = len(TRACE_MAGIC)
+    start_time, label_length = struct.unpack_from(_HEADER, data, offset)
+    offset += struct.calcsize(_HEADER)
+    label = data[offset:offset + label_length].decode(errors="replace")
+    offset += label_length
+
+    record_size = struct.calcsize(_RECORD)
+    records = []
+    while offset + record_size <= len(data):
+        fields = struct.unpack_from(_RECORD, data, offset)
+        value_count = fields[-1]
+        end = offset + record_size + 2 * value_count
+        if end > len(data):
+            break
+        values = struct.unpack_from(f"<{value_count}H", data, offset + record_size)
+        records.append(TraceRecord(*fields[:-1], values))
+        offset = end
+    return start_time, label, records
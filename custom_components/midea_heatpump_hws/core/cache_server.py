@@ -0,0 +1,181 @@
+"""Local Modbus TCP server answering from the coordinators' register images.
+
+Gateways like the EW11 accept only a few TCP clients, and every extra client
+competes with the integration for the RS485 bus. The cache server lets any
+number of local tools read the heaters through the integration instead:
+each served unit is a device object that answers reads from its register
+image (reading through to the heater only for stale registers) and, if its
+owner allows it, forwards writes over the integration's own connection.
+
+Function codes 3 (read holding registers), 6 (write single register) and
+16 (write multiple registers) are served, requests of one client are
+answered in order. Modbus TCP has no authentication, so the server binds
+the loopback interface unless told otherwise.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import struct
+from typing import Any, Protocol
+
+_LOGGER = logging.getLogger(__name__)
+
+# Modbus exception codes
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+ILLEGAL_DATA_VALUE = 0x03
+SERVER_DEVICE_FAILURE = 0x04
+GATEWAY_PATH_UNAVAILABLE = 0x0A
+GATEWAY_TARGET_FAILED = 0x0B
+
+READ_HOLDING_REGISTERS = 0x03
+WRITE_SINGLE_REGISTER = 0x06
+WRITE_MULTIPLE_REGISTERS = 0x10
+
+# Protocol limits on registers per request
+MAX_READ_COUNT = 125
+MAX_WRITE_COUNT = 123
+
+# Register addresses are 16 bit: a request may not run past the last one
+ADDRESS_SPACE = 0x10000
+
+# Loopback only: tools on the same host
+DEFAULT_HOST = "127.0.0.1"
+
+_MBAP = struct.Struct(">HHHB")  # transaction id, protocol id, length, unit id
+
+
+class CacheServerError(Exception):
+    """A request a device answers with a Modbus exception code."""
+
+    def __init__(self, code: int) -> None:
+        """Initialize the error."""
+        super().__init__(f"Modbus exception {code:#04x}")
+        self.code = code
+
+
+class CachedDevice(Protocol):
+    """A unit served by the cache server."""
+
+    async def async_cache_read(self, address: int, count: int) -> list[int]:
+        """Return count register values from address, raise CacheServerError if not possible."""
+
+    async def async_cache_write(self, address: int, values: list[int]) -> None:
+        """Write register values from address, raise CacheServerError if not possible or not allowed."""
+
+
+class CacheServer:
+    """Modbus TCP server dispatching requests by unit id to attached devices."""
+
+    def __init__(self, port: int, host: str | None = DEFAULT_HOST) -> None:
+        """Initialize the server, host None or "0.0.0.0" listens on every interface."""
+        self.host = host
+        self.port = port
+        self.devices: dict[int, CachedDevice] = {}
+        self.clients = 0
+        self.connections = 0
+        self.requests = 0
+        self.exceptions = 0
+        self._server: asyncio.Server | None = None
+
+    def attach(self, unit: int, device: CachedDevice) -> bool:
+        """Serve device as unit, False if another device has the unit id."""
+        if self.devices.get(unit, device) is not device:
+            return False
+        self.devices[unit] = device
+        return True
+
+    def detach(self, unit: int) -> bool:
+        """Stop serving unit, return True if no device is left."""
+        self.devices.pop(unit, None)
+        return not self.devices
+
+    async def start(self) -> None:
+        """Start listening. Raises OSError if the port is taken."""
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        _LOGGER.info("Modbus cache server listening on %s port %s", self.host or "every interface", self.port)
+
+    async def stop(self) -> None:
+        """Stop listening and close client connections."""
+        if self._server is None:
+            return
+        self._server.close()
+        if hasattr(self._server, "close_clients"):
+            self._server.close_clients()
+        await self._server.wait_closed()
+        self._server = None
+        _LOGGER.info("Modbus cache server on port %s stopped", self.port)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer the requests of one client until it disconnects."""
+        self.clients += 1
+        self.connections += 1
+        peer = writer.get_extra_info("peername")
+        _LOGGER.debug("Cache server client %s connected", peer)
+        try:
+            while True:
+                header = await reader.readexactly(_MBAP.size)
+                transaction, protocol, length, unit = _MBAP.unpack(header)
+                if protocol != 0 or not 2 <= length <= 254:
+                    _LOGGER.debug("Invalid MBAP header from %s, closing", peer)
+                    break
+                pdu = await reader.readexactly(length - 1)
+                response = await self._respond(unit, pdu)
+                writer.write(_MBAP.pack(transaction, 0, len(response) + 1, unit) + response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+            _LOGGER.debug("Cache server client %s disconnected", peer)
+
+    async def _respond(self, unit: int, pdu: bytes) -> bytes:
+        """Return the response PDU to a request PDU."""
+        self.requests += 1
+        function = pdu[0]
+        try:
+            device = self.devices.get(unit)
+            if device is None:
+                raise CacheServerError(GATEWAY_PATH_UNAVAILABLE)
+            if function == READ_HOLDING_REGISTERS and len(pdu) == 5:
+                address, count = struct.unpack_from(">HH", pdu, 1)
+                if not 1 <= count <= MAX_READ_COUNT:
+                    raise CacheServerError(ILLEGAL_DATA_VALUE)
+                if address + count > ADDRESS_SPACE:
+                    raise CacheServerError(ILLEGAL_DATA_ADDRESS)
+                values = await device.async_cache_read(address, count)
+                return struct.pack(f">BB{count}H", function, 2 * count, *values)
+            if function == WRITE_SINGLE_REGISTER and len(pdu) == 5:
+                address, value = struct.unpack_from(">HH", pdu, 1)
+                await device.async_cache_write(address, [value])
+                return pdu
+            if function == WRITE_MULTIPLE_REGISTERS and len(pdu) >= 6:
+                address, count, size = struct.unpack_from(">HHB", pdu, 1)
+                if not 1 <= count <= MAX_WRITE_COUNT or size != 2 * count or len(pdu) != 6 + size:
+                    raise CacheServerError(ILLEGAL_DATA_VALUE)
+                if address + count > ADDRESS_SPACE:
+                    raise CacheServerError(ILLEGAL_DATA_ADDRESS)
+                await device.async_cache_write(address, list(struct.unpack_from(f">{count}H", pdu, 6)))
+                return pdu[:5]
+            raise CacheServerError(ILLEGAL_FUNCTION)
+        except CacheServerError as err:
+            self.exceptions += 1
+            return bytes((function | 0x80, err.code))
+        except Exception as err:
+            _LOGGER.error("Error answering unit %s function %s: %s", unit, function, err)
+            self.exceptions += 1
+            return bytes((function | 0x80, SERVER_DEVICE_FAILURE))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return server statistics for diagnostics."""
+        return {
+            "host": self.host,
+            "port": self.port,
+            "units": sorted(self.devices),
+            "clients": self.clients,
+            "connections": self.connections,
+            "requests": self.requests,
+            "exceptions": self.exceptions,
+        }
@@ -0,0 +1,146 @@
+"""Decoding of raw register values into data keys, and encoding of writes."""
+from __future__ import annotations
+
+from typing import Any
+
+# Mode register values of the Midea 170L, used when a profile has none
+DEFAULT_MODE_VALUES = {"eco": 1, "performance": 2, "electric": 4}
+
+# Mode reported for a register value no configured mode maps to
+FALLBACK_MODE = "eco"
+
+# Keys decoded with the shared sensor scaling (exhaust is reported raw)
+SENSOR_KEYS = ("tank_top_temp", "tank_bottom_temp", "condensor_temp", "outdoor_temp", "suction_temp")
+
+# Profile register names (models/*.json "registers") -> data keys
+PROFILE_REGISTER_KEYS = {
+    "power": "power_state",
+    "mode": "mode",
+    "current_temp": "current_temp",
+    "target_temp": "target_temp",
+    "sterilize": "sterilize_mode",
+    "tank_top_temp": "tank_top_temp",
+    "tank_bottom_temp": "tank_bottom_temp",
+    "condensor_temp": "condensor_temp",
+    "outdoor_temp": "outdoor_temp",
+    "exhaust_temp": "exhaust_temp",
+    "suction_temp": "suction_temp",
+    "heater_assist_register": "heater_assist_raw",
+    "sanitize_state_register": "sanitize_state_raw",
+}
+
+# On/off registers
+_BOOL_KEYS = frozenset(("power_state", "sterilize_mode"))
+
+# Temperatures whose raw value is kept next to the decoded one
+_RAW_KEPT = frozenset(("current_temp", "target_temp"))
+
+
+def scale_value(raw: int, scale: float, offset: float) -> float:
+    """Return a raw value scaled, then offset (Home Assistant modbus order)."""
+    return raw * scale + offset
+
+
+def unscale_value(value: float, scale: float, offset: float) -> int:
+    """Return the raw value to write for value, the inverse of scale_value (truncated)."""
+    return int((value - offset) / scale)
+
+
+def profile_registers(profile: dict[str, Any]) -> dict[str, int]:
+    """Return data key -> register of the registers a profile maps."""
+    return {
+        PROFILE_REGISTER_KEYS[name]: register
+        for name, register in profile.get("registers", {}).items()
+        if name in PROFILE_REGISTER_KEYS and isinstance(register, int)
+    }
+
+
+class RegisterCodec:
+    """Decode the raw registers of one device configuration and encode writes.
+
+    Target temperature and sensor scaling default to the current temperature
+    scaling, like the configuration options do.
+    """
+
+    __slots__ = ("target_scaling", "mode_values", "value_to_mode", "_scaled")
+
+    def __init__(
+        self,
+        temp_scale: float = 1.0,
+        temp_offset: float = 0.0,
+        target_temp_scale: float | None = None,
+        target_temp_offset: float | None = None,
+        sensors_temp_scale: float | None = None,
+        sensors_temp_offset: float | None = None,
+        mode_values: dict[str, int | None] | None = None,
+    ) -> None:
+        """Initialize the codec."""
+        self.target_scaling = (
+            temp_scale if target_temp_scale is None else target_temp_scale,
+            temp_offset if target_temp_offset is None else target_temp_offset,
+        )
+        sensors = (
+            temp_scale if sensors_temp_scale is None else sensors_temp_scale,
+            temp_offset if sensors_temp_offset is None else sensors_temp_offset,
+        )
+        # key -> (scale, offset) for every scaled temperature
+        self._scaled = {
+            "current_temp": (temp_scale, temp_offset),
+            "target_temp": self.target_scaling,
+            **{key: sensors for key in SENSOR_KEYS},
+        }
+        self.mode_values = {
+            mode: value
+            for mode, value in (DEFAULT_MODE_VALUES if mode_values is None else mode_values).items()
+            if value is not None
+        }
+        self.value_to_mode = {value: mode for mode, value in self.mode_values.items()}
+
+    @classmethod
+    def from_profile(cls, profile: dict[str, Any]) -> RegisterCodec:
+        """Build the codec for a device profile (models/*.json)."""
+        scaling = profile.get("scaling", {})
+        current = scaling.get("current_temp", {})
+        target = scaling.get("target_temp", {})
+        sensors = scaling.get("sensors", {})
+        return cls(
+            temp_scale=current.get("scale", 1.0),
+            temp_offset=current.get("offset", 0.0),
+            target_temp_scale=target.get("scale"),
+            target_temp_offset=target.get("offset"),
+            sensors_temp_scale=sensors.get("scale"),
+            sensors_temp_offset=sensors.get("offset"),
+            mode_values=profile.get("mode_values") or None,
+        )
+
+    def decode(self, key: str, raw: int, data: dict[str, Any]) -> None:
+        """Decode the raw value of key into data."""
+        scaling = self._scaled.get(key)
+        if scaling is not None:
+            if key in _RAW_KEPT:
+                data[f"{key}_raw"] = raw
+            data[key] = raw * scaling[0] + scaling[1]
+        elif key in _BOOL_KEYS:
+            data[key] = bool(raw)
+        elif key == "mode":
+            data["mode_value"] = raw
+            data[key] = self.value_to_mode.get(raw, FALLBACK_MODE)
+        else:
+            # Exhaust temperature and diagnostic states are reported raw
+            data[key] = raw
+
+    def scaling(self, key: str) -> tuple[float, float]:
+        """Return (scale, offset) of key, (1, 0) for keys reported raw."""
+        return self._scaled.get(key, (1.0, 0.0))
+
+    def mode(self, raw: int) -> str | None:
+        """Return the mode of a mode register value, None if unknown."""
+        return self.value_to_mode.get(raw)
+
+    def encode_target_temp(self, temp: float) -> int:
+        """Return the raw value to write for a target temperature."""
+        return unscale_value(temp, *self.target_scaling)
+
+    def encode_mode(self, mode: str) -> int | None:
+        """Return the mode register value of a mode, None if not configured."""
+        return self.mode_values.get(mode)
@@ -0,0 +1,316 @@
+"""Discovery of Modbus TCP gateways and of the units behind them."""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+import struct
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Connect attempts in flight at once during a sweep
+DISCOVERY_MAX_CONCURRENT = 256
+
+# Connect deadline per host and deadline of the confirming read (seconds)
+DISCOVERY_CONNECT_TIMEOUT = 0.5
+DISCOVERY_READ_TIMEOUT = 1.0
+
+# Largest sweep accepted (a /22)
+DISCOVERY_MAX_HOSTS = 1024
+
+# Confirming read: holding register 0, one register
+_CONFIRM_FUNCTION = 0x03
+_CONFIRM_TID = 0x4D48
+
+# Unit id scan: reads queued at the gateway at once, minimum spacing between
+# reads and how long a read holds its queue slot (seconds)
+UNIT_SCAN_WINDOW = 4
+UNIT_SCAN_GAP = 0.01
+UNIT_SCAN_TIMEOUT = 0.5
+UNIT_SCAN_CONNECT_TIMEOUT = 2.0
+
+# Highest unit id allowed on a Modbus serial line
+MODBUS_MAX_UNIT = 247
+
+# Gateway exception codes: the gateway answered, but no device behind it
+_GATEWAY_EXCEPTIONS = (0x0A, 0x0B)
+
+
+class DiscoveredGateway:
+    """One host that accepted a connection on the Modbus port."""
+
+    __slots__ = ("host", "port", "confirmed", "connect_time")
+
+    def __init__(self, host: str, port: int, confirmed: bool, connect_time: float) -> None:
+        """Initialize the result."""
+        self.host = host
+        self.port = port
+        self.confirmed = confirmed
+        self.connect_time = connect_time
+
+    def __repr__(self) -> str:
+        """Return a compact description for logs."""
+        state = "modbus" if self.confirmed else "open"
+        return f"DiscoveredGateway({self.host}:{self.port}, {state}, {self.connect_time * 1000:.0f} ms)"
+
+
+def subnet_hosts(subnet: str) -> list[str]:
+    """Return the host addresses of a CIDR subnet (a bare address is a /32).
+
+    Raises ValueError for invalid or too large subnets.
+    """
+    network = ipaddress.ip_network(subnet.strip(), strict=False)
+    if network.num_addresses > DISCOVERY_MAX_HOSTS + 2:
+        raise ValueError(f"Subnet {network} is too large (at most {DISCOVERY_MAX_HOSTS} hosts)")
+    if network.num_addresses <= 2:
+        return [str(address) for address in network]
+    return [str(address) for address in network.hosts()]
+
+
+def _confirm_request(unit: int) -> bytes:
+    """Build an MBAP read of holding register 0."""
+    return struct.pack(">HHHBBHH", _CONFIRM_TID, 0, 6, unit, _CONFIRM_FUNCTION, 0, 1)
+
+
+def _crc16(frame: bytes) -> int:
+    """Compute the Modbus RTU CRC of a frame."""
+    crc = 0xFFFF
+    for byte in frame:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+def _unit_request(unit: int, rtu: bool) -> bytes:
+    """Build a read of holding register 0 addressed to one unit.
+
+    Modbus TCP requests carry the unit id as transaction id so replies can
+    be matched while several are queued; RTU replies carry the unit address.
+    """
+    pdu = struct.pack(">BHH", _CONFIRM_FUNCTION, 0, 1)
+    if rtu:
+        frame = bytes([unit]) + pdu
+        return frame + _crc16(frame).to_bytes(2, "little")
+    return struct.pack(">HHHB", unit, 0, len(pdu) + 1, unit) + pdu
+
+
+async def _read_unit_reply(reader: asyncio.StreamReader, rtu: bool) -> tuple[int, bytes] | None:
+    """Read one reply, return (unit id, PDU) or None for a garbled frame."""
+    if rtu:
+        head = await reader.readexactly(2)
+        if head[1] & 0x80:
+            rest = await reader.readexactly(3)
+        else:
+            size = await reader.readexactly(1)
+            rest = size + await reader.readexactly(size[0] + 2)
+        frame = head + rest
+        if _crc16(frame[:-2]) != int.from_bytes(frame[-2:], "little"):
+            return None
+        return frame[0], frame[1:-2]
+
+    header = await reader.readexactly(7)
+    tid, protocol, length, _ = struct.unpack(">HHHB", header)
+    body = await reader.readexactly(max(length - 1, 0))
+    if protocol != 0 or not body:
+        return None
+    return tid, body
+
+
+def _is_unit_reply(pdu: bytes) -> bool:
+    """Return True if a reply came from a device (not from the gateway)."""
+    if pdu[0] == _CONFIRM_FUNCTION:
+        return True
+    # The device exists but rejects the read of register 0
+    return pdu[0] == _CONFIRM_FUNCTION | 0x80 and len(pdu) > 1 and pdu[1] not in _GATEWAY_EXCEPTIONS
+
+
+def _is_confirm_response(header: bytes, body: bytes) -> bool:
+    """Return True if a reply is a Modbus TCP answer to the confirming read.
+
+    An exception response also proves a Modbus speaker (e.g. the unit id is
+    not the one on the bus).
+    """
+    tid, protocol, _, _ = struct.unpack(">HHHB", header)
+    if tid != _CONFIRM_TID or protocol != 0 or not body:
+        return False
+    return body[0] & 0x7F == _CONFIRM_FUNCTION
+
+
+async def async_probe_host(
+    host: str,
+    port: int = 502,
+    unit: int = 1,
+    connect_timeout: float = DISCOVERY_CONNECT_TIMEOUT,
+    read_timeout: float = DISCOVERY_READ_TIMEOUT,
+) -> DiscoveredGateway | None:
+    """Connect to one host and confirm it with a single Modbus read.
+
+    Returns None if the port is closed or the host does not answer in time.
+    Hosts that accept the connection but do not answer Modbus TCP (e.g.
+    bridges in transparent RTU mode) are returned unconfirmed.
+    """
+    start = time.monotonic()
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), timeout=connect_timeout
+        )
+    except (OSError, asyncio.TimeoutError):
+        return None
+    connect_time = time.monotonic() - start
+
+    confirmed = False
+    try:
+        writer.write(_confirm_request(unit))
+        await writer.drain()
+        header = await asyncio.wait_for(reader.readexactly(7), timeout=read_timeout)
+        length = struct.unpack(">H", header[4:6])[0]
+        if 2 <= length <= 254:
+            body = await asyncio.wait_for(reader.readexactly(length - 1), timeout=read_timeout)
+            confirmed = _is_confirm_response(header, body)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+    return DiscoveredGateway(host, port, confirmed, connect_time)
+
+
+async def async_scan_subnet(
+    subnet: str,
+    port: int = 502,
+    unit: int = 1,
+    max_concurrent: int = DISCOVERY_MAX_CONCURRENT,
+    connect_timeout: float = DISCOVERY_CONNECT_TIMEOUT,
+    read_timeout: float = DISCOVERY_READ_TIMEOUT,
+) -> list[DiscoveredGateway]:
+    """Sweep a subnet for Modbus TCP gateways.
+
+    Connects to every host concurrently (at most max_concurrent at once) and
+    confirms each responder with one read. Confirmed gateways come first,
+    then by address.
+    """
+    hosts = subnet_hosts(subnet)
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def probe(host: str) -> DiscoveredGateway | None:
+        async with semaphore:
+            return await async_probe_host(host, port, unit, connect_timeout, read_timeout)
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(probe(host) for host in hosts))
+    found = [result for result in results if result is not None]
+    found.sort(key=lambda gateway: (not gateway.confirmed, ipaddress.ip_address(gateway.host)))
+    _LOGGER.debug(
+        "Swept %d hosts of %s in %.2f s: %s", len(hosts), subnet, time.monotonic() - start, found
+    )
+    return found
+
+
+async def async_scan_units(
+    host: str,
+    port: int = 502,
+    first: int = 1,
+    last: int = MODBUS_MAX_UNIT,
+    expected: int | None = None,
+    rtu: bool = False,
+    window: int = UNIT_SCAN_WINDOW,
+    gap: float = UNIT_SCAN_GAP,
+    timeout: float = UNIT_SCAN_TIMEOUT,
+) -> list[int]:
+    """Return the unit ids answering behind a gateway.
+
+    Reads of register 0 are pipelined over one connection: up to window
+    reads are queued at the gateway, spaced by gap, and a read gives up its
+    slot after timeout (a reply arriving later still counts). The scan stops
+    at last, or as soon as expected units answered. Transparent RTU bridges
+    (rtu=True) forward bytes straight onto the bus, so they get one read at
+    a time. Raises OSError/TimeoutError if the gateway cannot be reached,
+    ConnectionError if it stops answering mid-scan (the units found so far
+    would be an incomplete list).
+    """
+    if rtu:
+        window = 1
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port), timeout=UNIT_SCAN_CONNECT_TIMEOUT
+    )
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(window)
+    pending: dict[int, asyncio.TimerHandle] = {}
+    found: set[int] = set()
+    expired = False
+
+    def release(unit: int, timed_out: bool = False) -> None:
+        nonlocal expired
+        handle = pending.pop(unit, None)
+        if handle is None:
+            return
+        if timed_out:
+            expired = True
+        else:
+            handle.cancel()
+        slots.release()
+
+    async def receive() -> None:
+        while True:
+            reply = await _read_unit_reply(reader, rtu)
+            if reply is None:
+                continue
+            unit, pdu = reply
+            if _is_unit_reply(pdu):
+                found.add(unit)
+            release(unit)
+
+    def complete() -> bool:
+        return expected is not None and len(found) >= expected
+
+    start = time.monotonic()
+    receiver = asyncio.create_task(receive())
+    try:
+        for unit in range(first, min(last, MODBUS_MAX_UNIT) + 1):
+            await slots.acquire()
+            if complete() or receiver.done():
+                slots.release()
+                break
+            writer.write(_unit_request(unit, rtu))
+            pending[unit] = loop.call_later(timeout, release, unit, True)
+            await asyncio.sleep(gap)
+
+        # Wait for the reads still queued, then give late replies one more
+        # timeout unless every expected unit already answered
+        for _ in range(window):
+            if receiver.done():
+                break
+            await slots.acquire()
+        if expired and not complete() and not receiver.done():
+            await asyncio.sleep(timeout)
+    finally:
+        receiver.cancel()
+        # Let the receiver settle so a read error is retrieved here
+        await asyncio.wait([receiver])
+        receive_error = None if receiver.cancelled() else receiver.exception()
+        for handle in pending.values():
+            handle.cancel()
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    if receive_error is not None:
+        _LOGGER.debug(
+            "Unit scan of %s:%s stopped early, found %s: %r", host, port, sorted(found), receive_error
+        )
+        raise ConnectionError(
+            f"{host}:{port} stopped answering during the unit scan: {receive_error!r}"
+        ) from receive_error
+
+    _LOGGER.debug(
+        "Scanned unit ids %d-%d on %s:%s in %.2f s: %s",
+        first, last, host, port, time.monotonic() - start, sorted(found),
+    )
+    return sorted(found)
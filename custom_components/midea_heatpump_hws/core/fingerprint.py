@@ -0,0 +1,114 @@
+"""Profile fingerprinting from a single register snapshot."""
+from __future__ import annotations
+
+from typing import Any
+
+from .decode import SENSOR_KEYS
+
+# Register ranges read once for fingerprinting (start, count): the control
+# block and the sensor/diagnostic block
+FINGERPRINT_RANGES = ((0, 11), (100, 21))
+FINGERPRINT_REGISTERS = tuple(
+    register for start, count in FINGERPRINT_RANGES for register in range(start, start + count)
+)
+_FINGERPRINT_SET = frozenset(FINGERPRINT_REGISTERS)
+
+# Plausible decoded values (°C)
+PLAUSIBLE_TEMP = (-30.0, 100.0)
+PLAUSIBLE_EXHAUST = (-30.0, 150.0)
+TARGET_MARGIN = 5.0
+DEFAULT_TARGET_RANGE = (35.0, 75.0)
+
+_ANY = (float("-inf"), float("inf"))
+
+
+class ProfileFeatures:
+    """Precomputed checks of one profile against a fingerprint snapshot.
+
+    Each check is (register, scale, offset, low, high, allowed, weight): the
+    raw value passes if it is in allowed, or if allowed is None and the
+    decoded value lies within [low, high]. Checks on registers outside the
+    fingerprint ranges are dropped when compiling.
+    """
+
+    __slots__ = ("checks", "max_score")
+
+    def __init__(self, checks: list[tuple]) -> None:
+        """Initialize the features."""
+        self.checks = tuple(check for check in checks if check[0] in _FINGERPRINT_SET)
+        self.max_score = sum(check[-1] for check in self.checks)
+
+
+def _scaling(profile: dict[str, Any], key: str) -> tuple[float, float]:
+    scaling = profile.get("scaling", {}).get(key, {})
+    return scaling.get("scale", 1.0), scaling.get("offset", 0.0)
+
+
+def compile_features(profile: dict[str, Any]) -> ProfileFeatures:
+    """Compile a profile's register map into fingerprint checks."""
+    registers = profile.get("registers", {})
+    checks = []
+
+    def add(key, scale, offset, low, high, allowed, weight):
+        register = registers.get(key)
+        if isinstance(register, int):
+            checks.append((register, scale, offset, low, high, allowed, weight))
+
+    add("power", 1.0, 0.0, *_ANY, frozenset((0, 1)), 1)
+    add("sterilize", 1.0, 0.0, *_ANY, frozenset((0, 1)), 1)
+    mode_values = frozenset(profile.get("mode_values", {}).values()) or frozenset((1, 2, 4))
+    add("mode", 1.0, 0.0, *_ANY, mode_values, 2)
+
+    limits = profile.get("temp_limits", {}).values()
+    if limits:
+        target_range = (
+            min(limit.get("min", DEFAULT_TARGET_RANGE[0]) for limit in limits) - TARGET_MARGIN,
+            max(limit.get("max", DEFAULT_TARGET_RANGE[1]) for limit in limits) + TARGET_MARGIN,
+        )
+    else:
+        target_range = DEFAULT_TARGET_RANGE
+    add("target_temp", *_scaling(profile, "target_temp"), *target_range, None, 2)
+    add("current_temp", *_scaling(profile, "current_temp"), *PLAUSIBLE_TEMP, None, 2)
+
+    sensor_scale, sensor_offset = _scaling(profile, "sensors")
+    for key in SENSOR_KEYS:
+        add(key, sensor_scale, sensor_offset, *PLAUSIBLE_TEMP, None, 1)
+    # Exhaust is reported in raw °C
+    add("exhaust_temp", 1.0, 0.0, *PLAUSIBLE_EXHAUST, None, 1)
+
+    # Diagnostic registers only need to be readable
+    add("heater_assist_register", 1.0, 0.0, *_ANY, None, 1)
+    add("sanitize_state_register", 1.0, 0.0, *_ANY, None, 1)
+    return ProfileFeatures(checks)
+
+
+def score_profile(features: ProfileFeatures, snapshot: dict[int, int]) -> float:
+    """Return the share (0-1) of a profile's checks the snapshot passes."""
+    if not features.max_score:
+        return 0.0
+    score = 0
+    for register, scale, offset, low, high, allowed, weight in features.checks:
+        raw = snapshot.get(register)
+        if raw is None:
+            continue
+        if allowed is not None:
+            if raw in allowed:
+                score += weight
+        elif low <= raw * scale + offset <= high:
+            score += weight
+    return score / features.max_score
+
+
+def rank_profiles(
+    index: dict[str, ProfileFeatures], snapshot: dict[int, int]
+) -> list[tuple[str, float]]:
+    """Return (profile id, confidence) pairs, best match first.
+
+    Ties go to the profile with more checks, i.e. the more specific one.
+    """
+    scored = [
+        (profile_id, score_profile(features, snapshot), features.max_score)
+        for profile_id, features in index.items()
+    ]
+    scored.sort(key=lambda item: (-item[1], -item[2], item[0]))
+    return [(profile_id, confidence) for profile_id, confidence, _ in scored]
@@ -0,0 +1,113 @@
+"""Domain-wide poll scheduling for fleets of heaters."""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+# Polls allowed in flight at once across all gateways
+FLEET_MAX_CONCURRENT = 8
+
+# Window for the aggregate throughput figures (seconds)
+FLEET_WINDOW = 300
+
+
+class FleetScheduler:
+    """Phase-staggered, concurrency-capped polling across all devices.
+
+    Every member gets a phase (a fraction of its interval) placed in the
+    middle of the largest free gap, so polls of equal-interval devices are
+    spread evenly instead of firing in lockstep.
+    """
+
+    def __init__(self, max_concurrent: int = FLEET_MAX_CONCURRENT) -> None:
+        """Initialize the scheduler."""
+        self.max_concurrent = max_concurrent
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._phases: dict[str, float] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.polls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent: deque[tuple[float, int]] = deque()
+
+    def join(self, member: str) -> float:
+        """Add a member and return its phase in [0, 1)."""
+        if member in self._phases:
+            return self._phases[member]
+
+        phases = sorted(self._phases.values())
+        if not phases:
+            phase = 0.0
+        else:
+            # Midpoint of the largest gap on the unit circle
+            best_start, best_gap = phases[-1], phases[0] + 1 - phases[-1]
+            for previous, current in zip(phases, phases[1:]):
+                if current - previous > best_gap:
+                    best_start, best_gap = previous, current - previous
+            phase = (best_start + best_gap / 2) % 1
+        self._phases[member] = phase
+        return phase
+
+    def leave(self, member: str) -> None:
+        """Remove a member, freeing its phase slot."""
+        self._phases.pop(member, None)
+
+    def next_delay(self, member: str, interval: float, now: float | None = None) -> float:
+        """Return the delay until the member's next phase point.
+
+        The result lies in [interval / 2, 3 * interval / 2), so a device
+        drifts onto its slot within a cycle without polling twice in a row.
+        """
+        if now is None:
+            now = time.monotonic()
+        offset = self._phases.get(member, 0.0) * interval
+        earliest = now + interval / 2
+        target = (earliest - offset) // interval * interval + offset
+        if target < earliest:
+            target += interval
+        return target - now
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the fleet's concurrent poll slots."""
+        start = time.monotonic()
+        async with self._semaphore:
+            wait = time.monotonic() - start
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    def record(self, registers: int, now: float | None = None) -> None:
+        """Record a finished poll and the number of registers it read."""
+        if now is None:
+            now = time.monotonic()
+        self.polls += 1
+        self._recent.append((now, registers))
+        while self._recent and self._recent[0][0] < now - FLEET_WINDOW:
+            self._recent.popleft()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return aggregate fleet figures for diagnostics."""
+        window = 0.0
+        if len(self._recent) > 1:
+            window = self._recent[-1][0] - self._recent[0][0]
+        return {
+            "members": len(self._phases),
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "polls": self.polls,
+            "mean_slot_wait": self.total_wait / self.polls if self.polls else None,
+            "max_slot_wait": self.max_wait,
+            "polls_per_second": (len(self._recent) - 1) / window if window else None,
+            "registers_per_second": sum(count for _, count in self._recent) / window if window else None,
+        }
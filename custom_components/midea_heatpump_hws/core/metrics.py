@@ -0,0 +1,187 @@
+"""In-memory bus and poll metrics per device, and OpenMetrics text rendering.
+
+Counters are plain attributes bumped on the request path; nothing is
+formatted until a scrape asks for the exposition. Transferred bytes are
+counted from the frame sizes Modbus defines for each request and response
+(MBAP framing for TCP/UDP, unit id and CRC for RTU), not measured on the
+socket.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any
+
+# Histogram bucket upper bounds (seconds)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CYCLE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Bytes around the PDU: MBAP header (TCP/UDP), unit id + CRC (RTU)
+_MBAP_OVERHEAD = 7
+_RTU_OVERHEAD = 3
+
+
+def _pdu_sizes(method: str, kwargs: dict[str, Any], result: Any) -> tuple[int, int]:
+    """Return the request and response PDU sizes of a transaction (response 0 if none)."""
+    if method == "write_registers":
+        request = 6 + 2 * len(kwargs.get("values", ()))
+    else:
+        # Reads and single writes: function, address, count or value
+        request = 5
+    if result is None:
+        return request, 0
+    if result.isError():
+        return request, 2
+    if method.startswith("read_"):
+        return request, 2 + 2 * kwargs.get("count", 1)
+    return request, 5
+
+
+class Histogram:
+    """Cumulative histogram of observed values."""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        """Initialize the histogram with bucket upper bounds."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one value."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class DeviceMetrics:
+    """Bus and poll counters of one device."""
+
+    def __init__(self, rtu: bool = False) -> None:
+        """Initialize the counters, rtu for RTU framing."""
+        self._overhead = _RTU_OVERHEAD if rtu else _MBAP_OVERHEAD
+        # (method, outcome) -> attempts
+        self.transactions: dict[tuple[str, str], int] = {}
+        # Modbus exception code -> responses
+        self.exception_codes: dict[int, int] = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.elided_writes = 0
+        self.transaction_time = Histogram(LATENCY_BUCKETS)
+        self.cycle_duration = Histogram(CYCLE_BUCKETS)
+        self.lock_wait = Histogram(LATENCY_BUCKETS)
+        self.write_latency = Histogram(LATENCY_BUCKETS)
+
+    def transaction(self, method: str, kwargs: dict[str, Any], duration: float, result: Any = None,
+                    outcome: str = "error") -> None:
+        """Record one request attempt: the response as result, or the outcome of an attempt without one."""
+        if result is not None:
+            if result.isError():
+                outcome = "exception"
+                code = getattr(result, "exception_code", 0) or 0
+                self.exception_codes[code] = self.exception_codes.get(code, 0) + 1
+            else:
+                outcome = "ok"
+            self.transaction_time.observe(duration)
+        key = (method, outcome)
+        self.transactions[key] = self.transactions.get(key, 0) + 1
+        request, response = _pdu_sizes(method, kwargs, result)
+        self.bytes_sent += request + self._overhead
+        if response:
+            self.bytes_received += response + self._overhead
+
+
+def _escape(value: Any) -> str:
+    """Return a label value escaped for the exposition."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, Any]) -> str:
+    """Return a label set in exposition syntax."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Return a sample value, integers without a fraction."""
+    if isinstance(value, int) or value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class Exposition:
+    """OpenMetrics text built family by family from many devices."""
+
+    def __init__(self) -> None:
+        """Initialize an empty exposition."""
+        # name -> (type, help, sample lines), in insertion order
+        self._families: dict[str, tuple[str, str, list[str]]] = {}
+
+    def _family(self, name: str, kind: str, help_text: str) -> list[str]:
+        """Return the sample lines of a family, declaring it on first use."""
+        if name not in self._families:
+            self._families[name] = (kind, help_text, [])
+        return self._families[name][2]
+
+    def counter(self, name: str, help_text: str, labels: dict[str, Any], value: float) -> None:
+        """Add a counter sample (name without the _total suffix)."""
+        self._family(name, "counter", help_text).append(f"{name}_total{_format_labels(labels)} {_format_value(value)}")
+
+    def gauge(self, name: str, help_text: str, labels: dict[str, Any], value: float | None) -> None:
+        """Add a gauge sample, skipped while the value is unknown."""
+        if value is not None:
+            self._family(name, "gauge", help_text).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def histogram(self, name: str, help_text: str, labels: dict[str, Any], histogram: Histogram) -> None:
+        """Add the buckets, count and sum of a histogram."""
+        lines = self._family(name, "histogram", help_text)
+        cumulative = 0
+        for bound, count in zip((*histogram.bounds, "+Inf"), histogram.counts):
+            cumulative += count
+            le = bound if bound == "+Inf" else repr(float(bound))
+            lines.append(f"{name}_bucket{_format_labels({**labels, 'le': le})} {cumulative}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+
+    def device(self, labels: dict[str, Any], metrics: DeviceMetrics) -> None:
+        """Add the counters and histograms of one device."""
+        for (method, outcome), count in sorted(metrics.transactions.items()):
+            self.counter(
+                "midea_hws_transactions", "Modbus request attempts by method and outcome",
+                {**labels, "method": method, "outcome": outcome}, count,
+            )
+        for code, count in sorted(metrics.exception_codes.items()):
+            self.counter(
+                "midea_hws_exception_responses", "Modbus exception responses by exception code",
+                {**labels, "code": code}, count,
+            )
+        self.counter("midea_hws_sent_bytes", "Modbus frame bytes sent", labels, metrics.bytes_sent)
+        self.counter("midea_hws_received_bytes", "Modbus frame bytes received", labels, metrics.bytes_received)
+        self.counter(
+            "midea_hws_elided_writes", "Queued writes superseded by a newer value before reaching the bus",
+            labels, metrics.elided_writes,
+        )
+        self.histogram(
+            "midea_hws_transaction_seconds", "Round trip of answered Modbus requests", labels,
+            metrics.transaction_time,
+        )
+        self.histogram("midea_hws_cycle_seconds", "Poll cycle duration", labels, metrics.cycle_duration)
+        self.histogram("midea_hws_lock_wait_seconds", "Wait for the bus lock", labels, metrics.lock_wait)
+        self.histogram(
+            "midea_hws_write_seconds", "Write latency, request to written on the bus", labels,
+            metrics.write_latency,
+        )
+
+    def render(self) -> str:
+        """Return the exposition text, terminated by # EOF."""
+        lines = []
+        for name, (kind, help_text, samples) in self._families.items():
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"# HELP {name} {help_text}")
+            lines.extend(samples)
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,228 @@
+"""Block read planning and poll cycle accounting."""
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+# Block priorities: high blocks are always read, low blocks may be deferred
+# to the next cycle when the cycle budget runs out
+PRIORITY_LOW = 0
+PRIORITY_HIGH = 1
+
+# Merge registers into one request when at most this many unused registers
+# lie between them, up to this many registers per request
+READ_BLOCK_MAX_GAP = 4
+READ_BLOCK_MAX_COUNT = 32
+
+# Largest single read allowed by the Modbus spec
+MODBUS_MAX_READ_COUNT = 125
+
+# Smoothing of the effective sample rate
+SAMPLE_RATE_ALPHA = 0.2
+
+
+class ReadBlock:
+    """One holding register read serving one or more data keys."""
+
+    def __init__(self, start: int, count: int, keys: dict[str, int], priority: int) -> None:
+        """Initialize the block."""
+        self.start = start
+        self.count = count
+        self.keys = keys
+        self.priority = priority
+
+    @property
+    def registers(self) -> set[int]:
+        """Return the registers that back a data key."""
+        return set(self.keys.values())
+
+    def __repr__(self) -> str:
+        """Return a compact description for logs."""
+        return f"ReadBlock({self.start}+{self.count}, {sorted(self.keys)})"
+
+
+def build_read_plan(
+    registers: dict[str, int],
+    priorities: dict[str, int] | None = None,
+    max_gap: int = READ_BLOCK_MAX_GAP,
+    max_count: int = READ_BLOCK_MAX_COUNT,
+    singles: set[int] | None = None,
+    layout: list[tuple[int, int]] | None = None,
+) -> list[ReadBlock]:
+    """Group key -> register assignments into as few reads as possible.
+
+    Registers in singles are always read on their own (devices that reject
+    reads spanning unmapped addresses). layout lists (start, count) ranges
+    known to be readable as a whole (a profile's polling blocks): registers
+    inside one range share a read whatever the gap, and reads never cross
+    a range boundary. Blocks are ordered high priority first, then by
+    address.
+    """
+    priorities = priorities or {}
+    singles = singles or set()
+    layout = layout or []
+
+    def layout_range(register: int) -> int | None:
+        for index, (start, count) in enumerate(layout):
+            if start <= register < start + min(count, MODBUS_MAX_READ_COUNT):
+                return index
+        return None
+
+    by_register: dict[int, dict[str, int]] = {}
+    for key, register in registers.items():
+        if register is not None:
+            by_register.setdefault(register, {})[key] = register
+
+    blocks: list[ReadBlock] = []
+    current: ReadBlock | None = None
+    current_range: int | None = None
+    for register in sorted(by_register):
+        keys = by_register[register]
+        priority = max(priorities.get(key, PRIORITY_LOW) for key in keys)
+        end = current.start + current.count - 1 if current else None
+        in_range = layout_range(register)
+        if (
+            current is not None
+            and register not in singles
+            and not current.registers & singles
+            and in_range == current_range
+            and (
+                in_range is not None
+                or (register - end - 1 <= max_gap and register - current.start + 1 <= max_count)
+            )
+        ):
+            current.count = register - current.start + 1
+            current.keys.update(keys)
+            current.priority = max(current.priority, priority)
+            continue
+        current = ReadBlock(register, 1, dict(keys), priority)
+        current_range = in_range
+        blocks.append(current)
+
+    blocks.sort(key=lambda block: (-block.priority, block.start))
+    return blocks
+
+
+async def read_block(
+    read: Callable[[int, int], Awaitable[Any]],
+    block: ReadBlock,
+    values: dict[str, int],
+    on_reject: Callable[[ReadBlock, Any], None] | None = None,
+) -> int:
+    """Read one block into values (key -> raw value), return the registers read.
+
+    read(address, count) returns a pymodbus response; its exceptions
+    propagate. A block the device rejects is read again register by
+    register. on_reject is called with every rejected block and the error
+    response, so the caller can keep split registers separate from then on.
+    """
+    result = await read(block.start, block.count)
+    if result.isError():
+        if on_reject:
+            on_reject(block, result)
+        if block.count == 1:
+            return 0
+        count = 0
+        for register in sorted(block.registers):
+            keys = {key: reg for key, reg in block.keys.items() if reg == register}
+            count += await read_block(read, ReadBlock(register, 1, keys, block.priority), values, on_reject)
+        return count
+
+    for key, register in block.keys.items():
+        values[key] = result.registers[register - block.start]
+    return len(block.registers)
+
+
+async def read_registers(
+    read: Callable[[int, int], Awaitable[Any]], registers: Iterable[int]
+) -> dict[int, int]:
+    """Read a set of registers in as few requests as possible.
+
+    Tries one block covering all of them first, then the regular block plan
+    and finally single registers for blocks the device rejects. read(address,
+    count) returns a pymodbus response. Returns register -> raw value for
+    every register that could be read.
+    """
+    wanted = sorted(set(registers))
+    if not wanted:
+        return {}
+
+    span = wanted[-1] - wanted[0] + 1
+    if span <= MODBUS_MAX_READ_COUNT:
+        result = await read(wanted[0], span)
+        if not result.isError():
+            return {register: result.registers[register - wanted[0]] for register in wanted}
+
+    values: dict[int, int] = {}
+    for block in build_read_plan({str(register): register for register in wanted}):
+        result = await read(block.start, block.count)
+        if not result.isError():
+            for register in block.registers:
+                values[register] = result.registers[register - block.start]
+            continue
+        for register in sorted(block.registers):
+            result = await read(register, 1)
+            if not result.isError():
+                values[register] = result.registers[0]
+    return values
+
+
+class PollStats:
+    """Per-cycle budget accounting for one device."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.cycles = 0
+        self.overruns = 0
+        self.deferred_blocks = 0
+        self.split_blocks = 0
+        self.last_duration: float | None = None
+        self.last_budget: float | None = None
+        self.requested_sample_rate: float | None = None
+        self.effective_sample_rate: float | None = None
+        self._last_start: float | None = None
+
+    def cycle_finished(
+        self,
+        start: float,
+        duration: float,
+        budget: float,
+        interval: float,
+        planned: int,
+        read: int,
+        deferred: int,
+    ) -> None:
+        """Record one poll cycle.
+
+        Sample rates count registers per second: requested is what the plan
+        asks for at the configured interval, effective is what was actually
+        refreshed between consecutive cycle starts.
+        """
+        self.cycles += 1
+        self.last_duration = duration
+        self.last_budget = budget
+        self.deferred_blocks += deferred
+        if duration > budget:
+            self.overruns += 1
+
+        self.requested_sample_rate = planned / interval if interval else None
+        if self._last_start is not None and start > self._last_start:
+            rate = read / (start - self._last_start)
+            if self.effective_sample_rate is None:
+                self.effective_sample_rate = rate
+            else:
+                self.effective_sample_rate += SAMPLE_RATE_ALPHA * (rate - self.effective_sample_rate)
+        self._last_start = start
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {
+            "cycles": self.cycles,
+            "overruns": self.overruns,
+            "deferred_blocks": self.deferred_blocks,
+            "split_blocks": self.split_blocks,
+            "last_cycle_duration": self.last_duration,
+            "last_cycle_budget": self.last_budget,
+            "requested_sample_rate": self.requested_sample_rate,
+            "effective_sample_rate": self.effective_sample_rate,
+        }
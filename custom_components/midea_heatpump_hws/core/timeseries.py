@@ -0,0 +1,231 @@
+"""Columnar time-series chunk files for long-running sample collection.
+
+A chunk holds a fixed number of rows, preallocated so samples are written
+in place through mmap: the magic, the row count and the header length,
+a JSON header (label, capacity, columns with their register and scaling),
+then the timestamp column (float64 Unix time) and one raw uint16 column per
+data key, each capacity rows long. Everything is little-endian. The row
+count is updated after the row itself, so a reader never sees half a row.
+
+A full chunk is followed by a new file in the same directory. Files are
+named by a sequence number and the UTC time of their first row, e.g.
+000042_20261019T101500Z.mhts, and ordered by the sequence number; readers
+map them read-only and cut columns out without copying.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Any
+
+CHUNK_MAGIC = b"MHWSTS01"
+CHUNK_SUFFIX = ".mhts"
+_PREFIX = "<II"  # rows, header length
+_DATA_OFFSET = len(CHUNK_MAGIC) + struct.calcsize(_PREFIX)
+
+# Rows per chunk file by default: a day of 5 second samples
+CHUNK_DEFAULT_ROWS = 17280
+
+# Raw value stored for a register that could not be read
+MISSING = 0xFFFF
+
+
+def _layout(header_length: int, capacity: int) -> tuple[int, int]:
+    """Return (timestamp column offset, first register column offset)."""
+    timestamps = (_DATA_OFFSET + header_length + 7) // 8 * 8
+    return timestamps, timestamps + 8 * capacity
+
+
+class ChunkWriter:
+    """Append rows to one preallocated chunk file."""
+
+    def __init__(self, path: str, mm: mmap.mmap, header: dict[str, Any], rows: int, header_length: int) -> None:
+        """Initialize the writer, use create() or resume()."""
+        self.path = path
+        self.header = header
+        self.capacity = header["capacity"]
+        self.keys = [column["key"] for column in header["columns"]]
+        self.rows = rows
+        self._mm = mm
+        self._timestamps, self._columns = _layout(header_length, self.capacity)
+
+    @classmethod
+    def create(cls, path: str, header: dict[str, Any]) -> ChunkWriter:
+        """Create a chunk file for header (needs capacity and columns)."""
+        encoded = json.dumps(header, separators=(",", ":")).encode()
+        _, columns = _layout(len(encoded), header["capacity"])
+        size = columns + 2 * header["capacity"] * len(header["columns"])
+        # Exclusive: an existing chunk is never overwritten
+        with open(path, "x+b") as f:
+            f.truncate(size)
+            mm = mmap.mmap(f.fileno(), size)
+        mm[:_DATA_OFFSET + len(encoded)] = CHUNK_MAGIC + struct.pack(_PREFIX, 0, len(encoded)) + encoded
+        return cls(path, mm, header, 0, len(encoded))
+
+    @classmethod
+    def resume(cls, path: str) -> ChunkWriter:
+        """Reopen a chunk file to append after its last row."""
+        with open(path, "r+b") as f:
+            mm = mmap.mmap(f.fileno(), 0)
+        if mm[:len(CHUNK_MAGIC)] != CHUNK_MAGIC:
+            mm.close()
+            raise ValueError(f"{path} is not a chunk file")
+        rows, header_length = struct.unpack_from(_PREFIX, mm, len(CHUNK_MAGIC))
+        header = json.loads(mm[_DATA_OFFSET:_DATA_OFFSET + header_length])
+        return cls(path, mm, header, rows, header_length)
+
+    @property
+    def full(self) -> bool:
+        """Return True once every row is used."""
+        return self.rows >= self.capacity
+
+    def append(self, timestamp: float, values: dict[str, int | None]) -> None:
+        """Write one row of raw values by key, missing keys are stored as MISSING."""
+        row = self.rows
+        struct.pack_into("<d", self._mm, self._timestamps + 8 * row, timestamp)
+        for index, key in enumerate(self.keys):
+            value = values.get(key)
+            struct.pack_into(
+                "<H", self._mm, self._columns + 2 * (index * self.capacity + row),
+                MISSING if value is None else value,
+            )
+        self.rows = row + 1
+        struct.pack_into("<I", self._mm, len(CHUNK_MAGIC), self.rows)
+
+    def flush(self) -> None:
+        """Write the mapped pages back to disk."""
+        self._mm.flush()
+
+    def close(self) -> None:
+        """Flush and unmap the file."""
+        self._mm.flush()
+        self._mm.close()
+
+
+class ChunkSeries:
+    """Rotating chunk files of one device in a directory.
+
+    Appending continues in the newest chunk if it has the same columns and
+    room left, so a restarted collector picks up where it stopped.
+    """
+
+    def __init__(self, directory: str, header: dict[str, Any]) -> None:
+        """Initialize the series, header as for ChunkWriter.create()."""
+        self.directory = directory
+        self.header = header
+        self.chunks = 0
+        self._writer: ChunkWriter | None = None
+        os.makedirs(directory, exist_ok=True)
+        existing = list_chunks(directory)
+        self._sequence = _sequence(existing[-1]) + 1 if existing else 0
+        if existing:
+            writer = ChunkWriter.resume(existing[-1])
+            if not writer.full and writer.header["columns"] == header["columns"]:
+                self._writer = writer
+            else:
+                writer.close()
+
+    @property
+    def rows(self) -> int:
+        """Return the rows in the current chunk."""
+        return self._writer.rows if self._writer else 0
+
+    def append(self, timestamp: float, values: dict[str, int | None]) -> None:
+        """Append one row, starting a new chunk when the current one is full."""
+        if self._writer is None or self._writer.full:
+            if self._writer is not None:
+                self._writer.close()
+            stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(timestamp))
+            path = os.path.join(self.directory, f"{self._sequence:06d}_{stamp}{CHUNK_SUFFIX}")
+            self._writer = ChunkWriter.create(path, {**self.header, "created": timestamp})
+            self._sequence += 1
+            self.chunks += 1
+        self._writer.append(timestamp, values)
+
+    def flush(self) -> None:
+        """Write the current chunk back to disk."""
+        if self._writer:
+            self._writer.flush()
+
+    def close(self) -> None:
+        """Close the current chunk."""
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+
+class Chunk:
+    """Read-only, memory-mapped view of a chunk file.
+
+    timestamps() and raw() return memoryviews into the mapping (no copy,
+    little-endian hosts); numpy users can map columns with
+    numpy.frombuffer(chunk.buffer, "<u2", chunk.rows, chunk.offset(key)).
+    Release those views before close().
+    """
+
+    def __init__(self, path: str) -> None:
+        """Map the file. Raises ValueError if it is not a chunk."""
+        self.path = path
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.buffer[:len(CHUNK_MAGIC)] != CHUNK_MAGIC:
+            self.buffer.close()
+            raise ValueError(f"{path} is not a chunk file")
+        _, header_length = struct.unpack_from(_PREFIX, self.buffer, len(CHUNK_MAGIC))
+        self.header = json.loads(self.buffer[_DATA_OFFSET:_DATA_OFFSET + header_length])
+        self.capacity = self.header["capacity"]
+        self.columns = {column["key"]: column for column in self.header["columns"]}
+        self._index = {key: index for index, key in enumerate(self.columns)}
+        self._timestamps, self._first_column = _layout(header_length, self.capacity)
+
+    @property
+    def rows(self) -> int:
+        """Return the rows written so far (a chunk being written grows)."""
+        return struct.unpack_from("<I", self.buffer, len(CHUNK_MAGIC))[0]
+
+    def offset(self, key: str) -> int:
+        """Return the byte offset of a key's column in buffer."""
+        return self._first_column + 2 * self._index[key] * self.capacity
+
+    def timestamps(self) -> memoryview:
+        """Return the timestamps of the written rows."""
+        return memoryview(self.buffer)[self._timestamps:self._timestamps + 8 * self.rows].cast("d")
+
+    def raw(self, key: str) -> memoryview:
+        """Return the raw values of a key's written rows (MISSING where unread)."""
+        start = self.offset(key)
+        return memoryview(self.buffer)[start:start + 2 * self.rows].cast("H")
+
+    def values(self, key: str) -> list[float | None]:
+        """Return the decoded values of a key, None where unread."""
+        column = self.columns[key]
+        scale, offset = column["scale"], column["offset"]
+        with self.raw(key) as raw:
+            return [None if value == MISSING else value * scale + offset for value in raw]
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self.buffer.close()
+
+    def __enter__(self) -> Chunk:
+        """Return the chunk for use as a context manager."""
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        """Unmap the file."""
+        self.close()
+
+
+def _sequence(path: str) -> int:
+    """Return the sequence number of a chunk file name, -1 if it has none."""
+    prefix = os.path.basename(path).partition("_")[0]
+    return int(prefix) if prefix.isdigit() else -1
+
+
+def list_chunks(directory: str) -> list[str]:
+    """Return the chunk files of a directory, oldest first (by sequence number)."""
+    paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(CHUNK_SUFFIX)]
+    return sorted(paths, key=lambda path: (_sequence(path), path))
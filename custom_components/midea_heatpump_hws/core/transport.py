@@ -0,0 +1,352 @@
+"""Link quality tracking and connection helpers for Modbus gateways."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import socket
+import time
+from collections.abc import Callable
+from typing import Any
+
+from .bus_trace import OUTCOME_ERROR, OUTCOME_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+# Retransmission timeout bounds (seconds), RFC 6298 style
+RTO_INITIAL = 5.0
+RTO_MIN = 0.5
+RTO_MAX = 10.0
+RTT_ALPHA = 1 / 8
+RTT_BETA = 1 / 4
+RTT_K = 4
+
+# Inter-request gap bounds (seconds). EW11-class bridges drop frames when
+# requests arrive back-to-back on a 9600 baud bus.
+GAP_INITIAL = 0.05
+GAP_MIN = 0.01
+GAP_MAX = 1.0
+GAP_DECAY = 0.9
+GAP_GROWTH = 2.0
+GAP_STEP = 0.05
+
+# A request that times out is retried once with the backed-off timeout
+TRANSACTION_ATTEMPTS = 2
+
+# TCP keepalive: start probing after 10 s idle, every 5 s, give up after 3
+KEEPALIVE_IDLE = 10
+KEEPALIVE_INTERVAL = 5
+KEEPALIVE_COUNT = 3
+
+# Reconnect backoff (seconds), full jitter
+RECONNECT_BASE = 0.25
+RECONNECT_CAP = 5.0
+
+# Supported transports
+TRANSPORT_TCP = "tcp"  # Modbus TCP (MBAP header)
+TRANSPORT_RTU_OVER_TCP = "rtu_over_tcp"  # RTU frames through a transparent TCP bridge
+TRANSPORT_UDP = "udp"  # Modbus TCP (MBAP) over UDP
+TRANSPORT_SERIAL = "serial"  # RTU on a local serial port (USB-RS485 dongle)
+TRANSPORTS = (TRANSPORT_TCP, TRANSPORT_RTU_OVER_TCP, TRANSPORT_UDP, TRANSPORT_SERIAL)
+
+
+def create_client(
+    transport: str,
+    host: str,
+    port: int,
+    timeout: float,
+    retries: int = 0,
+    reconnect_delay: float = 0,
+    baudrate: int = 9600,
+    parity: str = "N",
+    stopbits: int = 1,
+    bytesize: int = 8,
+):
+    """Create an async pymodbus client for the configured transport.
+
+    For the serial transport, host is the serial device path (e.g.
+    /dev/ttyUSB0) and port is ignored.
+    """
+    # Imported here so the rest of this module loads without pymodbus
+    from pymodbus.client import AsyncModbusSerialClient, AsyncModbusTcpClient, AsyncModbusUdpClient
+    from pymodbus.framer import FramerType
+
+    if transport == TRANSPORT_SERIAL:
+        return AsyncModbusSerialClient(
+            port=host,
+            framer=FramerType.RTU,
+            baudrate=baudrate,
+            parity=parity,
+            stopbits=stopbits,
+            bytesize=bytesize,
+            timeout=timeout,
+            retries=retries,
+            reconnect_delay=reconnect_delay,
+        )
+    if transport == TRANSPORT_UDP:
+        return AsyncModbusUdpClient(
+            host=host,
+            port=port,
+            timeout=timeout,
+            retries=retries,
+            reconnect_delay=reconnect_delay,
+        )
+    if transport == TRANSPORT_RTU_OVER_TCP:
+        framer = FramerType.RTU
+    elif transport == TRANSPORT_TCP:
+        framer = FramerType.SOCKET
+    else:
+        raise ValueError(f"Unsupported transport: {transport}")
+    return AsyncModbusTcpClient(
+        host=host,
+        port=port,
+        framer=framer,
+        timeout=timeout,
+        retries=retries,
+        reconnect_delay=reconnect_delay,
+    )
+
+
+def apply_socket_options(sock: socket.socket | None) -> bool:
+    """Enable TCP keepalive and disable Nagle on a connected socket.
+
+    Keepalive lets the kernel notice a gateway that rebooted and forgot the
+    connection; no-delay sends small Modbus frames immediately.
+    """
+    if sock is None or sock.type != socket.SOCK_STREAM:
+        return False
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # Fine-grained keepalive timers are platform specific
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE)
+    elif hasattr(socket, "TCP_KEEPALIVE"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, KEEPALIVE_IDLE)
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KEEPALIVE_INTERVAL)
+    if hasattr(socket, "TCP_KEEPCNT"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, KEEPALIVE_COUNT)
+    return True
+
+
+class RttEstimator:
+    """Smoothed round-trip time and variance, TCP retransmit style."""
+
+    def __init__(self) -> None:
+        """Initialize the estimator."""
+        self.srtt: float | None = None
+        self.rttvar: float | None = None
+        self.rto = RTO_INITIAL
+        self.samples = 0
+        self.timeouts = 0
+        self.last_rtt: float | None = None
+
+    @property
+    def timeout(self) -> float:
+        """Return the timeout to use for the next request."""
+        return self.rto
+
+    def sample(self, rtt: float) -> None:
+        """Feed a measured round trip (only for requests that were not retried)."""
+        self.samples += 1
+        self.last_rtt = rtt
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - RTT_BETA) * self.rttvar + RTT_BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - RTT_ALPHA) * self.srtt + RTT_ALPHA * rtt
+        self.rto = min(RTO_MAX, max(RTO_MIN, self.srtt + RTT_K * self.rttvar))
+
+    def timed_out(self) -> None:
+        """Back off the timeout after a request went unanswered."""
+        self.timeouts += 1
+        self.rto = min(RTO_MAX, self.rto * 2)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the learned values for diagnostics."""
+        return {
+            "srtt": self.srtt,
+            "rttvar": self.rttvar,
+            "rto": self.rto,
+            "last_rtt": self.last_rtt,
+            "samples": self.samples,
+            "timeouts": self.timeouts,
+        }
+
+
+class RequestPacer:
+    """Adaptive gap between consecutive requests to the same gateway.
+
+    The gap shrinks while transactions succeed and grows after timeouts or
+    garbled frames, so the bridge gets breathing room only when it needs it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the pacer."""
+        self.gap = GAP_INITIAL
+        self._last_done = 0.0
+        self.successes = 0
+        self.failures = 0
+
+    async def wait(self) -> None:
+        """Sleep until the gap since the previous transaction has elapsed."""
+        delay = self._last_done + self.gap - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def done(self, success: bool) -> None:
+        """Record the end of a transaction and adapt the gap."""
+        self._last_done = time.monotonic()
+        if success:
+            self.successes += 1
+            self.gap = max(GAP_MIN, self.gap * GAP_DECAY)
+        else:
+            self.failures += 1
+            self.gap = min(GAP_MAX, self.gap * GAP_GROWTH + GAP_STEP)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the learned values for diagnostics."""
+        return {
+            "gap": self.gap,
+            "successes": self.successes,
+            "failures": self.failures,
+        }
+
+
+class GatewayLink:
+    """Learned link state shared by every device behind one gateway."""
+
+    def __init__(self, host: str, port: int) -> None:
+        """Initialize the link state."""
+        self.host = host
+        self.port = port
+        self.rtt = RttEstimator()
+        self.pacer = RequestPacer()
+        # Held for each transaction (pacing wait to outcome) by every device
+        # behind the gateway, so the pacing gap applies between units too
+        self.lock = asyncio.Lock()
+        # bus_trace.TraceRecorder while a trace of this gateway is recorded
+        self.recorder: Any = None
+
+    async def transact(
+        self,
+        client: Any,
+        method: str,
+        kwargs: dict[str, Any],
+        attempts: int = TRANSACTION_ATTEMPTS,
+        max_timeout: float | None = None,
+        observe: Callable[..., None] | None = None,
+    ) -> Any:
+        """Run one Modbus request with adaptive pacing and timeout.
+
+        The link lock is held from the pacing wait until the outcome is
+        recorded, so units behind the gateway never overlap. Timeouts are
+        retried while attempts remain and the client is connected; round
+        trips of retried requests are not sampled (Karn's algorithm).
+        max_timeout caps the adaptive timeout, e.g. for probes. observe is
+        called for every attempt like DeviceMetrics.transaction. Returns the
+        response, Modbus exception responses included.
+        """
+        # Imported here so the rest of this module loads without pymodbus
+        from pymodbus.exceptions import ModbusException, ModbusIOException
+
+        request = getattr(client, method)
+        for attempt in range(attempts):
+            # One transaction at a time per gateway, whichever unit it is for:
+            # the pacing gap only holds if units cannot send back to back
+            async with self.lock:
+                await self.pacer.wait()
+                start = time.monotonic()
+                try:
+                    timeout = self.rtt.timeout
+                    if max_timeout is not None:
+                        timeout = min(timeout, max_timeout)
+                    result = await asyncio.wait_for(request(**kwargs), timeout=timeout)
+                except (asyncio.TimeoutError, ModbusIOException):
+                    if self.recorder:
+                        self.recorder.record(method, kwargs, start, outcome=OUTCOME_TIMEOUT)
+                    if observe:
+                        observe(method, kwargs, time.monotonic() - start, outcome="timeout")
+                    self.pacer.done(success=False)
+                    self.rtt.timed_out()
+                    if attempt + 1 < attempts and client.connected:
+                        _LOGGER.debug(
+                            "%s %s timed out, retrying with timeout %.2fs",
+                            method, kwargs.get("address"), self.rtt.timeout
+                        )
+                        continue
+                    raise
+                except ModbusException:
+                    if self.recorder:
+                        self.recorder.record(method, kwargs, start, outcome=OUTCOME_ERROR)
+                    if observe:
+                        observe(method, kwargs, time.monotonic() - start)
+                    raise
+
+                if self.recorder:
+                    self.recorder.record(method, kwargs, start, result)
+                if observe:
+                    observe(method, kwargs, time.monotonic() - start, result)
+                # Exception responses still made the round trip, only lost or
+                # garbled frames count against the link
+                self.pacer.done(success=True)
+                if attempt == 0:
+                    self.rtt.sample(time.monotonic() - start)
+                return result
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the learned values for diagnostics."""
+        return {
+            "rtt": self.rtt.as_dict(),
+            "pacing": self.pacer.as_dict(),
+            "trace": self.recorder.as_dict() if self.recorder else None,
+        }
+
+
+class ReconnectTracker:
+    """Jittered exponential reconnect backoff with outage accounting."""
+
+    def __init__(self) -> None:
+        """Initialize the tracker."""
+        self.attempt = 0
+        self.reconnects = 0
+        self.failed_attempts = 0
+        self.last_duration: float | None = None
+        self.total_duration = 0.0
+        self._outage_start: float | None = None
+
+    def next_delay(self) -> float:
+        """Return how long to wait before the next connect attempt."""
+        if self.attempt == 0:
+            return 0.0
+        return random.uniform(0, min(RECONNECT_CAP, RECONNECT_BASE * 2 ** self.attempt))
+
+    def lost(self) -> None:
+        """Mark the start of an outage (first call wins)."""
+        if self._outage_start is None:
+            self._outage_start = time.monotonic()
+
+    def failed(self) -> None:
+        """Record a failed connect attempt."""
+        self.lost()
+        self.attempt += 1
+        self.failed_attempts += 1
+
+    def connected(self) -> None:
+        """Record a successful (re)connect and close the outage."""
+        if self._outage_start is not None:
+            self.last_duration = time.monotonic() - self._outage_start
+            self.total_duration += self.last_duration
+            self.reconnects += 1
+        self._outage_start = None
+        self.attempt = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return reconnect statistics for diagnostics."""
+        return {
+            "reconnects": self.reconnects,
+            "failed_attempts": self.failed_attempts,
+            "last_reconnect_duration": self.last_duration,
+            "total_reconnect_duration": self.total_duration,
+        }
@@ -0,0 +1,45 @@
+"""Diagnostics support for Midea Heat Pump Water Heater."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    return {
+        "config": async_redact_data(dict(entry.data), TO_REDACT),
+        "last_update_success": coordinator.last_update_success,
+        "update_interval": coordinator.update_interval.total_seconds(),
+        "nominal_interval": coordinator.nominal_interval,
+        "data": coordinator.data,
+        "link": coordinator.link.as_dict(),
+        "connection": {
+            **coordinator.reconnect.as_dict(),
+            "probes": coordinator.probes,
+            "probe_failures": coordinator.probe_failures,
+        },
+        "polling": {
+            **coordinator.poll_stats.as_dict(),
+            "polled_keys": coordinator.polled_keys,
+        },
+        "fleet": coordinator.fleet.as_dict(),
+        "cache_server": {
+            **coordinator.cache_server.as_dict(),
+            **coordinator.cache_stats,
+            "max_age": coordinator.cache_max_age,
+            "writes_allowed": coordinator.cache_server_writes,
+        } if coordinator.cache_server else None,
+    }
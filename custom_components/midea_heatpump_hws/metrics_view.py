@@ -0,0 +1,84 @@
+"""OpenMetrics endpoint for bus and poll performance of every configured heater."""
+from __future__ import annotations
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .core.metrics import CONTENT_TYPE, Exposition
+
+METRICS_URL = f"/api/{DOMAIN}/metrics"
+
+
+@callback
+def async_setup_metrics_view(hass: HomeAssistant) -> None:
+    """Register the metrics view."""
+    hass.http.register_view(MideaMetricsView(hass))
+
+
+class MideaMetricsView(HomeAssistantView):
+    """Serve the in-memory coordinator counters as OpenMetrics text.
+
+    Rendered from the counters on every scrape, without reading the state
+    machine; authenticate with a long-lived access token (Bearer header).
+    """
+
+    url = METRICS_URL
+    name = f"api:{DOMAIN}:metrics"
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the view."""
+        self.hass = hass
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the metrics of every loaded heater."""
+        exposition = Exposition()
+        gateways = set()
+        for entry_id, entry_data in self.hass.data.get(DOMAIN, {}).items():
+            coordinator = entry_data["coordinator"]
+            gateway = f"{coordinator.host}:{coordinator.port}"
+            labels = {
+                "entry_id": entry_id,
+                "name": entry_data["config"].get("name", ""),
+                "gateway": gateway,
+                "unit": coordinator.modbus_unit,
+            }
+            exposition.device(labels, coordinator.metrics)
+            exposition.counter(
+                "midea_hws_reconnects", "Reconnects after a lost connection", labels,
+                coordinator.reconnect.reconnects,
+            )
+            exposition.counter(
+                "midea_hws_failed_connects", "Failed connect attempts", labels,
+                coordinator.reconnect.failed_attempts,
+            )
+            exposition.counter(
+                "midea_hws_poll_cycles", "Poll cycles", labels, coordinator.poll_stats.cycles,
+            )
+            exposition.counter(
+                "midea_hws_poll_overruns", "Poll cycles over their time budget", labels,
+                coordinator.poll_stats.overruns,
+            )
+            exposition.gauge(
+                "midea_hws_up", "1 if the last poll succeeded", labels, int(coordinator.last_update_success),
+            )
+
+            # Round-trip state is shared by the units behind a gateway
+            if gateway not in gateways:
+                gateways.add(gateway)
+                rtt = coordinator.link.rtt
+                exposition.gauge(
+                    "midea_hws_gateway_srtt_seconds", "Smoothed round-trip time", {"gateway": gateway}, rtt.srtt,
+                )
+                exposition.gauge(
+                    "midea_hws_gateway_timeout_seconds", "Current request timeout", {"gateway": gateway},
+                    rtt.timeout,
+                )
+                exposition.gauge(
+                    "midea_hws_gateway_pacing_gap_seconds", "Current gap between requests", {"gateway": gateway},
+                    coordinator.link.pacer.gap,
+                )
+
+        return web.Response(body=exposition.render().encode(), headers={"Content-Type": CONTENT_TYPE})
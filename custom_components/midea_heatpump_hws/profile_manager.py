@@ -8,12 +8,17 @@ from typing import Any
 
 from homeassistant.core import HomeAssistant
 
+from .core.fingerprint import ProfileFeatures, compile_features
+
 _LOGGER = logging.getLogger(__name__)
 
 PROFILE_DIR = Path(__file__).parent / "models"
 DEFAULT_PROFILES_DIR = PROFILE_DIR / "defaults"
 CUSTOM_PROFILES_DIR = PROFILE_DIR / "custom"
 
+# Compiled fingerprint features per profile file: path -> (mtime, features)
+_FEATURE_CACHE: dict[Path, tuple[float, ProfileFeatures]] = {}
+
 
 class ProfileManager:
     """Manage device profiles for the integration."""
@@ -67,6 +72,23 @@ class ProfileManager:
         
         return profiles
     
+    def get_profile_features(self) -> dict[str, ProfileFeatures]:
+        """Get fingerprint features of all profiles, compiled once per file version."""
+        features = {}
+        for prefix, directory in (("default", DEFAULT_PROFILES_DIR), ("custom", CUSTOM_PROFILES_DIR)):
+            for profile_file in directory.glob("*.json"):
+                try:
+                    mtime = profile_file.stat().st_mtime
+                    cached = _FEATURE_CACHE.get(profile_file)
+                    if cached is None or cached[0] != mtime:
+                        with open(profile_file, 'r') as f:
+                            cached = (mtime, compile_features(json.load(f)))
+                        _FEATURE_CACHE[profile_file] = cached
+                    features[f"{prefix}_{profile_file.stem}"] = cached[1]
+                except Exception as e:
+                    _LOGGER.error("Failed to compile profile %s: %s", profile_file, e)
+        return features
+    
     def load_profile(self, profile_id: str) -> dict[str, Any] | None:
         """Load a specific profile."""
         profiles = self.get_available_profiles()
@@ -92,8 +114,14 @@ class ProfileManager:
             
             "connection": {
                 "port": config.get("port", 502),
+                "transport": config.get("transport", "tcp"),
+                "baudrate": config.get("baudrate", 9600),
+                "parity": config.get("parity", "N"),
                 "modbus_unit": config.get("modbus_unit", 1),
-                "scan_interval": config.get("scan_interval", 60)
+                "scan_interval": config.get("scan_interval", 60),
+                "adaptive_polling": config.get("adaptive_polling", False),
+                "min_scan_interval": config.get("min_scan_interval", 10),
+                "max_scan_interval": config.get("max_scan_interval", 300)
             },
             
             "registers": {
@@ -152,6 +180,8 @@ class ProfileManager:
                 "enable_additional_sensors": config.get("enable_additional_sensors", True)
             }
         }
+        if config.get("read_layout"):
+            profile_data["polling"] = {"blocks": [list(block) for block in config["read_layout"]]}
         
         # Save to file
         profile_path = CUSTOM_PROFILES_DIR / f"{safe_name}.json"
@@ -226,8 +256,14 @@ class ProfileManager:
         # Keep user's connection settings
         config["host"] = user_input.get("host")
         config["port"] = profile_data.get("connection", {}).get("port", 502)
+        config["transport"] = profile_data.get("connection", {}).get("transport", "tcp")
+        config["baudrate"] = profile_data.get("connection", {}).get("baudrate", 9600)
+        config["parity"] = profile_data.get("connection", {}).get("parity", "N")
         config["modbus_unit"] = profile_data.get("connection", {}).get("modbus_unit", 1)
         config["scan_interval"] = profile_data.get("connection", {}).get("scan_interval", 60)
+        config["adaptive_polling"] = profile_data.get("connection", {}).get("adaptive_polling", False)
+        config["min_scan_interval"] = profile_data.get("connection", {}).get("min_scan_interval", 10)
+        config["max_scan_interval"] = profile_data.get("connection", {}).get("max_scan_interval", 300)
         
         # Apply register settings from profile
         registers = profile_data.get("registers", {})
@@ -281,6 +317,11 @@ class ProfileManager:
         defaults = profile_data.get("defaults", {})
         config["target_temperature"] = defaults.get("target_temperature", 65)
         config["enable_additional_sensors"] = defaults.get("enable_additional_sensors", True)
+
+        # Block layout found by the scanner (modbus_test.py --make-profile)
+        blocks = profile_data.get("polling", {}).get("blocks")
+        if blocks:
+            config["read_layout"] = [[int(start), int(count)] for start, count in blocks]
         
         # Apply user's entity name if provided
         config["name"] = user_input.get("name", profile_data.get("name", "Hot Water System"))
@@ -0,0 +1,245 @@
+"""Bulk provisioning of heater fleets from CSV or YAML."""
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import logging
+import random
+from typing import Any
+
+import yaml
+
+from .const import DEFAULT_BAUDRATE, DEFAULT_PARITY, DEFAULT_TRANSPORT
+from .core.read_plan import read_registers
+from .core.transport import TRANSPORTS, create_client
+
+_LOGGER = logging.getLogger(__name__)
+
+# Gateways validated at the same time
+DEFAULT_MAX_CONCURRENT = 4
+
+# Connect deadline and per-request timeout while validating (seconds),
+# connect attempts and the base of their jittered backoff
+VALIDATE_CONNECT_TIMEOUT = 2.0
+VALIDATE_REQUEST_TIMEOUT = 3.0
+VALIDATE_ATTEMPTS = 3
+VALIDATE_BACKOFF = 0.25
+
+# Registers probed while validating, with the setup form defaults
+KEY_REGISTER_DEFAULTS = {
+    "power_register": 0,
+    "mode_register": 1,
+    "target_temp_register": 2,
+    "sterilize_register": None,
+    "temp_register": 102,
+    "tank_top_temp_register": 101,
+    "tank_bottom_temp_register": 102,
+    "condensor_temp_register": 103,
+    "outdoor_temp_register": 104,
+    "exhaust_temp_register": 105,
+    "suction_temp_register": 106,
+    "heater_assist_register": None,
+    "sanitize_state_register": None,
+}
+
+
+class FleetRowError(Exception):
+    """A fleet row that cannot be provisioned."""
+
+
+def parse_fleet(text: str) -> list[dict[str, Any]]:
+    """Parse fleet rows from CSV (with a header line) or YAML.
+
+    YAML may be a list of rows or a mapping with a "heaters" list. Each row
+    has host and profile, and optionally port, unit, name and transport.
+    """
+    stripped = text.strip()
+    if not stripped:
+        return []
+
+    first_line = stripped.splitlines()[0]
+    # YAML block lists, mappings and flow lists ([{host: ..}, ..]) may have commas too
+    if "," in first_line and not first_line.lstrip().startswith(("-", "heaters:", "[", "{")):
+        rows = list(csv.DictReader(io.StringIO(stripped)))
+    else:
+        loaded = yaml.safe_load(stripped)
+        if isinstance(loaded, dict):
+            loaded = loaded.get("heaters")
+        if not isinstance(loaded, list):
+            raise FleetRowError("YAML must be a list of heaters or a mapping with a 'heaters' list")
+        rows = loaded
+
+    parsed = []
+    for row in rows:
+        if not isinstance(row, dict):
+            raise FleetRowError(f"Invalid row: {row!r}")
+        parsed.append({
+            key.strip().lower(): value.strip() if isinstance(value, str) else value
+            for key, value in row.items()
+            if key is not None and value not in (None, "")
+        })
+    return parsed
+
+
+def resolve_profile(profiles: dict[str, dict[str, Any]], wanted: str) -> str | None:
+    """Return the profile id matching an id, file stem or display name."""
+    if wanted in profiles:
+        return wanted
+    wanted_lower = wanted.lower()
+    for profile_id, info in profiles.items():
+        stem = profile_id.split("_", 1)[1] if "_" in profile_id else profile_id
+        if wanted_lower in (stem.lower(), str(info.get("name", "")).lower()):
+            return profile_id
+    return None
+
+
+def build_row_config(profile_manager, profiles: dict[str, dict[str, Any]], row: dict[str, Any]) -> dict[str, Any]:
+    """Build a config entry's data for one fleet row."""
+    if not row.get("host"):
+        raise FleetRowError("Missing host")
+    if not row.get("profile"):
+        raise FleetRowError("Missing profile")
+    profile_id = resolve_profile(profiles, str(row["profile"]))
+    if profile_id is None:
+        raise FleetRowError(f"Unknown profile '{row['profile']}'")
+
+    profile_data = profiles[profile_id]["data"]
+    user_input = {"host": row["host"]}
+    if row.get("name"):
+        user_input["name"] = row["name"]
+    config = profile_manager.apply_profile_to_config(profile_data, user_input)
+
+    # Row values override the profile's connection defaults
+    try:
+        if "port" in row:
+            config["port"] = int(row["port"])
+        if "unit" in row:
+            config["modbus_unit"] = int(row["unit"])
+    except ValueError as err:
+        raise FleetRowError(f"Invalid port or unit: {err}") from err
+    if "transport" in row:
+        if row["transport"] not in TRANSPORTS:
+            raise FleetRowError(f"Unknown transport '{row['transport']}'")
+        config["transport"] = row["transport"]
+    return config
+
+
+def key_registers(config: dict[str, Any]) -> list[int]:
+    """Return the registers to probe for a (possibly partial) config."""
+    registers = {config.get(key, default) for key, default in KEY_REGISTER_DEFAULTS.items()}
+    return sorted(register for register in registers if register is not None)
+
+
+async def async_connect_client(config: dict[str, Any], attempts: int = VALIDATE_ATTEMPTS):
+    """Connect a short-lived validation client, or return None.
+
+    One client object is reused across attempts; attempts have a short
+    deadline and are spaced with jittered exponential backoff.
+    """
+    client = create_client(
+        config.get("transport", DEFAULT_TRANSPORT),
+        host=config["host"],
+        port=config["port"],
+        timeout=VALIDATE_REQUEST_TIMEOUT,
+        retries=0,
+        baudrate=config.get("baudrate", DEFAULT_BAUDRATE),
+        parity=config.get("parity", DEFAULT_PARITY),
+    )
+    for attempt in range(attempts):
+        if attempt:
+            await asyncio.sleep(random.uniform(0, VALIDATE_BACKOFF * 2 ** attempt))
+        try:
+            if await asyncio.wait_for(client.connect(), timeout=VALIDATE_CONNECT_TIMEOUT):
+                return client
+        except Exception as err:
+            _LOGGER.debug(
+                "Connect attempt %d to %s:%s failed: %s", attempt + 1, config["host"], config["port"], err
+            )
+        client.close()
+    return None
+
+
+async def async_probe_unit(client, unit: int, registers: list[int]) -> dict[int, int]:
+    """Read the key registers of one unit, return register -> raw value."""
+
+    async def read(address: int, count: int):
+        return await asyncio.wait_for(
+            client.read_holding_registers(address=address, count=count, device_id=unit),
+            timeout=VALIDATE_REQUEST_TIMEOUT,
+        )
+
+    return await read_registers(read, registers)
+
+
+def gateway_key(config: dict[str, Any]) -> tuple[str, str, int]:
+    """Return what identifies the gateway of a config: transport, host and port."""
+    return config.get("transport", DEFAULT_TRANSPORT), config["host"], config["port"]
+
+
+async def _probe_units(
+    probe, configs: list[dict[str, Any]], results: dict[int, str | None], indexes: list[int]
+) -> None:
+    """Validate units with probe(unit, registers), one at a time: the bus behind a gateway is shared anyway."""
+    for index in indexes:
+        config = configs[index]
+        try:
+            snapshot = await probe(config.get("modbus_unit", 1), key_registers(config))
+            results[index] = None if snapshot else "No register could be read"
+        except Exception as err:
+            results[index] = f"No response: {str(err) or type(err).__name__}"
+
+
+async def _validate_gateway(
+    configs: list[dict[str, Any]], results: dict[int, str | None], indexes: list[int], coordinator=None
+) -> None:
+    """Validate every unit behind one gateway over a single connection.
+
+    A loaded coordinator connected to the gateway is asked over its own
+    connection: a gateway that accepts one client would refuse a second.
+    """
+    if coordinator is not None and coordinator.connected:
+        await _probe_units(coordinator.async_probe, configs, results, indexes)
+        return
+
+    client = await async_connect_client(configs[indexes[0]])
+    if client is None:
+        for index in indexes:
+            results[index] = "Unable to connect"
+        return
+
+    async def probe(unit: int, registers: list[int]) -> dict[int, int]:
+        return await async_probe_unit(client, unit, registers)
+
+    try:
+        await _probe_units(probe, configs, results, indexes)
+    finally:
+        client.close()
+
+
+async def async_validate_fleet(
+    configs: list[dict[str, Any]],
+    max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+    coordinators: dict[tuple[str, str, int], Any] | None = None,
+) -> dict[int, str | None]:
+    """Validate fleet rows, return row index -> error (None when reachable).
+
+    Rows are grouped per gateway so each gateway sees one connection, and at
+    most max_concurrent gateways are validated at the same time. Gateways
+    in coordinators (gateway_key -> coordinator) are validated over the
+    coordinator's connection.
+    """
+    coordinators = coordinators or {}
+    gateways: dict[tuple[str, str, int], list[int]] = {}
+    for index, config in enumerate(configs):
+        gateways.setdefault(gateway_key(config), []).append(index)
+
+    semaphore = asyncio.Semaphore(max_concurrent)
+    results: dict[int, str | None] = {}
+
+    async def validate(key: tuple[str, str, int], indexes: list[int]) -> None:
+        async with semaphore:
+            await _validate_gateway(configs, results, indexes, coordinators.get(key))
+
+    await asyncio.gather(*(validate(key, indexes) for key, indexes in gateways.items()))
+    return results
@@ -122,6 +122,11 @@ class MideaTemperatureSensor(CoordinatorEntity, SensorEntity):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
 
+    async def async_added_to_hass(self) -> None:
+        """Ask the coordinator to poll this entity's register while it exists."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_add_register_consumer(self._sensor_id))
+
     @property
     def device_info(self):
         """Return device info to link this sensor to the main device."""
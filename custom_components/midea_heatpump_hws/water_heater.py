@@ -26,6 +26,16 @@ from .coordinator import MideaModbusCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+# Sensor temperatures also shown as water heater attributes
+_ATTRIBUTE_SENSOR_KEYS = (
+    "tank_top_temp",
+    "tank_bottom_temp",
+    "condensor_temp",
+    "outdoor_temp",
+    "exhaust_temp",
+    "suction_temp",
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -201,15 +211,7 @@ class MideaWaterHeater(CoordinatorEntity, WaterHeaterEntity, RestoreEntity):
         
         # Add additional sensor temperatures if enabled
         if self._enable_additional_sensors and self.coordinator.data:
-            sensor_names = [
-                "tank_top_temp",
-                "tank_bottom_temp",
-                "condensor_temp",
-                "outdoor_temp",
-                "exhaust_temp",
-                "suction_temp",
-            ]
-            for sensor_name in sensor_names:
+            for sensor_name in _ATTRIBUTE_SENSOR_KEYS:
                 if sensor_name in self.coordinator.data:
                     # Add temperature unit to the attribute name for clarity
                     attr_name = f"{sensor_name}_{self.temperature_unit}"
@@ -221,6 +223,12 @@ class MideaWaterHeater(CoordinatorEntity, WaterHeaterEntity, RestoreEntity):
         """Run when entity about to be added."""
         await super().async_added_to_hass()
 
+        # Keep the registers behind the sensor attributes polled, whether
+        # or not their sensor entities are enabled
+        if self._enable_additional_sensors:
+            for key in _ATTRIBUTE_SENSOR_KEYS:
+                self.async_on_remove(self.coordinator.async_add_register_consumer(key))
+
         # Restore previous state
         old_state = await self.async_get_last_state()
         if old_state is not None:
@@ -0,0 +1,181 @@
+"""Websocket API for streaming live Midea Heat Pump data."""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN
+from .coordinator import MideaModbusCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+WS_TYPE_SUBSCRIBE_SNAPSHOT = f"{DOMAIN}/subscribe_snapshot"
+WS_TYPE_SUBSCRIBE_REGISTERS = f"{DOMAIN}/subscribe_registers"
+
+# Default and smallest minimum time between two pushes to the same
+# subscriber (seconds): without a floor nothing would be coalesced
+DEFAULT_MIN_INTERVAL = 1.0
+MIN_INTERVAL_FLOOR = 0.1
+
+STREAM_SCHEMA = {
+    vol.Required("entry_id"): str,
+    vol.Optional("min_interval", default=DEFAULT_MIN_INTERVAL): vol.All(
+        vol.Coerce(float), vol.Range(min=MIN_INTERVAL_FLOOR, max=3600)
+    ),
+}
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, ws_subscribe_snapshot)
+    websocket_api.async_register_command(hass, ws_subscribe_registers)
+
+
+class StreamSubscription:
+    """Rate-limited, coalescing push channel for one websocket subscriber.
+
+    Only the latest pending payload is kept: snapshots replace each other and
+    register deltas are merged per address, so a client gets the newest
+    values instead of a growing backlog. Coalescing is time-based only:
+    updates are held back until min_interval has passed since the last
+    push, whatever the client's actual read rate or send buffer.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection: websocket_api.ActiveConnection,
+        msg_id: int,
+        min_interval: float,
+        registers: bool,
+    ) -> None:
+        """Initialize the subscription."""
+        self._hass = hass
+        self._connection = connection
+        self._msg_id = msg_id
+        self._min_interval = min_interval
+        self._registers = registers
+        self._pending: dict[Any, Any] | None = None
+        self._last_sent = 0.0
+        self._timer: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_push(self, data: dict[str, Any], changes: dict[int, int]) -> None:
+        """Accept a new update from the coordinator."""
+        if self._registers:
+            if not changes:
+                return
+            if self._pending is None:
+                self._pending = {}
+            self._pending.update(changes)
+        else:
+            self._pending = dict(data)
+
+        if self._timer is not None:
+            # A flush is already scheduled, it will pick up the latest payload
+            return
+
+        delay = self._last_sent + self._min_interval - time.monotonic()
+        if delay <= 0:
+            self._async_flush()
+        else:
+            self._timer = self._hass.loop.call_later(delay, self._async_flush).cancel
+
+    @callback
+    def _async_flush(self) -> None:
+        """Send the pending payload to the client."""
+        self._timer = None
+        if self._pending is None:
+            return
+
+        payload = self._pending
+        self._pending = None
+        self._last_sent = time.monotonic()
+
+        if self._registers:
+            event = {"registers": {str(register): value for register, value in payload.items()}}
+        else:
+            event = {"data": payload}
+        self._connection.send_message(websocket_api.event_message(self._msg_id, event))
+
+    @callback
+    def async_cancel(self) -> None:
+        """Stop any scheduled flush."""
+        if self._timer is not None:
+            self._timer()
+            self._timer = None
+        self._pending = None
+
+
+def _get_coordinator(hass: HomeAssistant, entry_id: str) -> MideaModbusCoordinator | None:
+    """Return the coordinator for a config entry, if loaded."""
+    entry_data = hass.data.get(DOMAIN, {}).get(entry_id)
+    if not entry_data:
+        return None
+    return entry_data["coordinator"]
+
+
+@callback
+def _async_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+    registers: bool,
+) -> None:
+    """Subscribe a websocket connection to a coordinator's stream."""
+    coordinator = _get_coordinator(hass, msg["entry_id"])
+    if coordinator is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Unknown entry_id")
+        return
+
+    subscription = StreamSubscription(
+        hass, connection, msg["id"], msg["min_interval"], registers
+    )
+    remove_listener = coordinator.async_add_stream_listener(subscription.async_push)
+
+    @callback
+    def unsubscribe() -> None:
+        remove_listener()
+        subscription.async_cancel()
+
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_result(msg["id"])
+
+    # Send the current state so the client doesn't wait a full poll cycle
+    if registers:
+        subscription.async_push(coordinator.data or {}, dict(coordinator.register_image))
+    elif coordinator.data:
+        subscription.async_push(coordinator.data, {})
+
+
+@websocket_api.websocket_command(
+    {vol.Required("type"): WS_TYPE_SUBSCRIBE_SNAPSHOT, **STREAM_SCHEMA}
+)
+@callback
+def ws_subscribe_snapshot(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Subscribe to decoded data snapshots of a device."""
+    _async_subscribe(hass, connection, msg, registers=False)
+
+
+@websocket_api.websocket_command(
+    {vol.Required("type"): WS_TYPE_SUBSCRIBE_REGISTERS, **STREAM_SCHEMA}
+)
+@callback
+def ws_subscribe_registers(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Subscribe to raw register deltas of a device."""
+    _async_subscribe(hass, connection, msg, registers=True)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Core library benchmark
+Usage: python benchmark_core.py [options]
+
+Measures the integration's Home Assistant-free core package on its own:
+
+  import:  wall time of a fresh interpreter importing the core modules the
+           tools use, next to importing the coordinator (needs Home
+           Assistant installed, skipped otherwise)
+  plan:    building the block read plan of a profile
+  decode:  decoding one poll cycle - the plan's blocks cut from a register
+           image and every key decoded - which is the coordinator's hot path
+           once the reads are done
+
+Example: python benchmark_core.py -n 20000 --profile ../custom_components/midea_heatpump_hws/models/defaults/ecospring_hp300.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from core_loader import INTEGRATION_DIR, load_core_module
+from modbus_simulator import DEFAULT_REGISTERS
+
+decode = load_core_module("decode")
+read_plan = load_core_module("read_plan")
+
+FILES_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PROFILE = INTEGRATION_DIR / "models" / "defaults" / "midea_170l.json"
+
+IMPORTS = {
+    "core": "from core_loader import load_core_module\n"
+            "for name in ('decode', 'read_plan', 'transport', 'bus_trace'): load_core_module(name)",
+    "coordinator": f"sys.path.insert(0, {str(INTEGRATION_DIR.parent.parent)!r})\n"
+                   "import custom_components.midea_heatpump_hws.coordinator",
+}
+
+
+def time_import(statement, runs):
+    """Median wall time of a fresh interpreter running statement, None if it fails"""
+    script = f"import sys, time\nstart = time.perf_counter()\n{statement}\nprint(time.perf_counter() - start)"
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", script], cwd=FILES_DIR, capture_output=True, text=True)
+        if result.returncode:
+            return None
+        samples.append(float(result.stdout.split()[-1]))
+    return statistics.median(samples)
+
+
+def decode_cycle(codec, blocks, image):
+    """Decode every planned key from a register image, like one poll cycle"""
+    data = {}
+    for block in blocks:
+        registers = [image[register] for register in range(block.start, block.start + block.count)]
+        for key, register in block.keys.items():
+            codec.decode(key, registers[register - block.start], data)
+    return data
+
+
+def run(args):
+    with open(args.profile) as f:
+        profile = json.load(f)
+    keys = decode.profile_registers(profile)
+    codec = decode.RegisterCodec.from_profile(profile)
+    # Registers the image lacks (gaps inside blocks) read as zero
+    image = {register: DEFAULT_REGISTERS.get(register, 0) for register in range(0, max(keys.values()) + 1)}
+
+    print(f"⚙️  Core benchmark: {profile.get('name', args.profile)}, {len(keys)} keys, {args.count} iterations")
+    print("-" * 56)
+    for name, statement in IMPORTS.items():
+        elapsed = time_import(statement, args.import_runs)
+        result = "not importable (Home Assistant missing?)" if elapsed is None else f"{elapsed * 1000:8.1f} ms"
+        print(f"import {name:<13} {result}")
+
+    start = time.perf_counter()
+    for _ in range(args.count):
+        blocks = read_plan.build_read_plan(keys)
+    plan = (time.perf_counter() - start) / args.count
+    print(f"{'plan':<20} {plan * 1e6:8.2f} µs  ({len(blocks)} blocks)")
+
+    start = time.perf_counter()
+    for _ in range(args.count):
+        data = decode_cycle(codec, blocks, image)
+    cycle = (time.perf_counter() - start) / args.count
+    print(f"{'decode':<20} {cycle * 1e6:8.2f} µs per cycle ({cycle / len(keys) * 1e9:.0f} ns per key)")
+    print("-" * 56)
+    print(f"Decoded: {', '.join(f'{key}={value}' for key, value in sorted(data.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the integration core without Home Assistant')
+    parser.add_argument('-n', '--count', type=int, default=10000, help='Iterations for plan/decode (default: 10000)')
+    parser.add_argument('--import-runs', type=int, default=5, help='Fresh interpreters per import timing (default: 5)')
+    parser.add_argument('--profile', default=str(DEFAULT_PROFILE), help='Device profile JSON (default: Midea 170L)')
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Gateway discovery benchmark
+Usage: python benchmark_discovery.py [options]
+
+Starts stand-in gateways (modbus_simulator.py) on loopback aliases of one /24
+- some answering Modbus TCP, some in transparent RTU mode - then sweeps the
+subnet with the integration's discovery and checks that every gateway is
+found and classified. On Linux the whole 127.0.0.0/8 is routed to the
+loopback interface, so no alias setup is needed; elsewhere add the aliases
+first (e.g. ifconfig lo0 alias 127.0.10.5 on macOS).
+
+Example: python benchmark_discovery.py --subnet 127.0.10.0/24 --gateways 10 --transparent 3
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import random
+import socket
+import time
+
+from core_loader import load_core_module
+from modbus_simulator import ModbusSimulator, SimulatedDevice, start_server
+
+discovery = load_core_module("discovery")
+
+
+def free_port(host):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+async def run(args):
+    hosts = discovery.subnet_hosts(args.subnet)
+    rng = random.Random(args.seed)
+    chosen = rng.sample(hosts, args.gateways + args.transparent)
+    modbus_hosts = set(chosen[:args.gateways])
+    transparent_hosts = set(chosen[args.gateways:])
+    port = args.port or free_port(chosen[0])
+
+    simulator = ModbusSimulator({1: SimulatedDevice()})
+    servers = []
+    for host in chosen:
+        mode = "tcp" if host in modbus_hosts else "rtu_over_tcp"
+        servers.append(await start_server(simulator, host, port, mode))
+
+    print(f"📡 Sweeping {args.subnet} ({len(hosts)} hosts) on port {port}: "
+          f"{len(modbus_hosts)} Modbus TCP gateways, {len(transparent_hosts)} in transparent mode")
+    print(f"   concurrency {args.max_concurrent}, connect timeout {args.connect_timeout}s, "
+          f"read timeout {args.read_timeout}s")
+
+    try:
+        for round_number in range(1, args.rounds + 1):
+            start = time.perf_counter()
+            found = await discovery.async_scan_subnet(
+                args.subnet, port,
+                max_concurrent=args.max_concurrent,
+                connect_timeout=args.connect_timeout,
+                read_timeout=args.read_timeout,
+            )
+            elapsed = time.perf_counter() - start
+
+            confirmed = {gateway.host for gateway in found if gateway.confirmed}
+            unconfirmed = {gateway.host for gateway in found if not gateway.confirmed}
+            ok = confirmed == modbus_hosts and unconfirmed == transparent_hosts
+            print(f"   round {round_number}: {elapsed * 1000:8.1f} ms, {len(confirmed)} confirmed, "
+                  f"{len(unconfirmed)} open only {'✅' if ok else '❌'}")
+            if not ok:
+                print(f"      missed: {sorted(modbus_hosts - confirmed, key=ipaddress.ip_address)} "
+                      f"{sorted(transparent_hosts - unconfirmed, key=ipaddress.ip_address)}")
+    finally:
+        for server in servers:
+            server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark subnet discovery of Modbus gateways on loopback aliases')
+    parser.add_argument('--subnet', default='127.0.10.0/24', help='Loopback subnet to sweep (default: 127.0.10.0/24)')
+    parser.add_argument('--port', type=int, help='Port for the stand-in gateways (default: a free port)')
+    parser.add_argument('--gateways', type=int, default=10, help='Gateways answering Modbus TCP (default: 10)')
+    parser.add_argument('--transparent', type=int, default=3,
+                        help='Gateways in transparent RTU mode, open but silent to MBAP (default: 3)')
+    parser.add_argument('--max-concurrent', type=int, default=discovery.DISCOVERY_MAX_CONCURRENT,
+                        help=f'Connects in flight (default: {discovery.DISCOVERY_MAX_CONCURRENT})')
+    parser.add_argument('--connect-timeout', type=float, default=discovery.DISCOVERY_CONNECT_TIMEOUT,
+                        help=f'Connect timeout per host in seconds (default: {discovery.DISCOVERY_CONNECT_TIMEOUT})')
+    parser.add_argument('--read-timeout', type=float, default=discovery.DISCOVERY_READ_TIMEOUT,
+                        help=f'Confirming read timeout in seconds (default: {discovery.DISCOVERY_READ_TIMEOUT})')
+    parser.add_argument('--rounds', type=int, default=3, help='Sweeps to run (default: 3)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for gateway placement (default: 1)')
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Fault injection benchmark
+Usage: python benchmark_faults.py [options]
+
+Drives the integration's MideaModbusCoordinator against the stand-in server
+(modbus_simulator.py) with scripted gateway faults and measures how the
+reconnect and error paths cope:
+
+  drop:      a share of the responses is lost
+  delay:     every response arrives late
+  illegal:   chosen registers answer with an illegal data address exception
+  reset:     the gateway drops the connection every few requests
+  blackhole: the gateway accepts TCP connections but never answers
+
+Each scenario polls a healthy gateway, turns the fault on, then clears it
+and polls until the data is complete again. Reported per scenario: time to
+detect (fault start until the first failed or incomplete cycle), time to
+recover (fault end until the first complete cycle), cycle durations, failed
+cycles and the log volume the integration and pymodbus produced.
+
+Needs Home Assistant installed (pip install homeassistant), the coordinator
+runs on a bare HomeAssistant instance.
+
+Example: python benchmark_faults.py --scenarios reset blackhole --interval 5 --fault-time 30
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from modbus_simulator import (
+    FaultInjector,
+    ModbusSimulator,
+    SimulatedDevice,
+    bound_port,
+    parse_units,
+    start_server,
+)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+try:
+    from homeassistant.core import HomeAssistant
+except ImportError:
+    HomeAssistant = None
+
+INTEGRATION = "custom_components.midea_heatpump_hws"
+DEFAULT_PROFILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "midea_heatpump_hws",
+    "models", "defaults", "midea_170l.json",
+)
+
+SCENARIOS = ["drop", "delay", "illegal", "reset", "blackhole"]
+
+
+def fault_settings(scenario, args):
+    """FaultInjector settings for a scenario"""
+    if scenario == "drop":
+        return {"drop": args.drop}
+    if scenario == "delay":
+        return {"delay": args.delay}
+    if scenario == "illegal":
+        return {"illegal": set(parse_units(args.illegal))}
+    if scenario == "reset":
+        return {"reset_every": args.reset_every}
+    return {"blackhole": True}
+
+
+class LogCounter(logging.Handler):
+    """Count the records and formatted bytes (tracebacks included) that would reach the log"""
+
+    def __init__(self, level):
+        super().__init__(level)
+        self.setFormatter(logging.Formatter("%(asctime)s %(levelname)s (%(threadName)s) [%(name)s] %(message)s"))
+        self.records = 0
+        self.bytes = 0
+
+    def emit(self, record):
+        if record.name.startswith((INTEGRATION, "pymodbus")):
+            self.records += 1
+            self.bytes += len(self.format(record)) + 1
+
+
+async def poll_until(coordinator, stop, interval, cycles, done=None):
+    """Refresh every interval seconds until stop (monotonic) or done() returns True"""
+    while time.monotonic() < stop:
+        start = time.monotonic()
+        await coordinator.async_refresh()
+        end = time.monotonic()
+        data = coordinator.data or {}
+        complete = all(data.get(key) is not None for key in coordinator.polled_keys)
+        cycles.append((start, end, coordinator.last_update_success and complete))
+        if done and done():
+            return
+        await asyncio.sleep(max(0.0, start + interval - time.monotonic()))
+
+
+async def run_scenario(hass, scenario, config, args, counter):
+    """Run one scenario against a fresh server and coordinator, return its numbers"""
+    # Imported here so --help works without Home Assistant
+    from custom_components.midea_heatpump_hws.coordinator import MideaModbusCoordinator
+
+    faults = FaultInjector(ModbusSimulator({1: SimulatedDevice()}, latency=args.latency), seed=args.seed)
+    server = await start_server(faults, "127.0.0.1", 0, args.transport)
+    coordinator = MideaModbusCoordinator(hass, {**config, "port": bound_port(server)})
+    cycles = []
+    try:
+        await poll_until(coordinator, time.monotonic() + args.settle, args.interval, cycles)
+        healthy = len(cycles)
+
+        for name, value in fault_settings(scenario, args).items():
+            setattr(faults, name, value)
+        logs = counter.records, counter.bytes
+        fault_start = time.monotonic()
+        await poll_until(coordinator, fault_start + args.fault_time, args.interval, cycles)
+        faulty = len(cycles)
+
+        faults.clear()
+        fault_end = time.monotonic()
+        await poll_until(
+            coordinator, fault_end + args.recover_time, args.interval, cycles,
+            done=lambda: cycles[-1][2] and cycles[-1][1] > fault_end,
+        )
+        logs = counter.records - logs[0], counter.bytes - logs[1]
+    finally:
+        await coordinator.async_shutdown()
+        server.close()
+
+    detected = next((end for _, end, ok in cycles[healthy:] if not ok), None)
+    recovered = next((end for _, end, ok in cycles[faulty:] if ok and end > fault_end), None)
+    baseline = [end - start for start, end, _ in cycles[1:healthy]]
+    during = [end - start for start, end, _ in cycles[healthy:faulty]]
+    return {
+        "scenario": scenario,
+        "detect": None if detected is None else detected - fault_start,
+        "recover": None if recovered is None else recovered - fault_end,
+        "healthy_cycle": statistics.median(baseline) if baseline else None,
+        "fault_cycle_mean": statistics.mean(during) if during else None,
+        "fault_cycle_max": max(during) if during else None,
+        "cycles": len(cycles) - healthy,
+        "failed": sum(1 for _, _, ok in cycles[healthy:] if not ok),
+        "log_records": logs[0],
+        "log_bytes": logs[1],
+        "requests": faults.requests,
+        "dropped": faults.dropped,
+        "resets": faults.resets,
+    }
+
+
+def seconds(value, digits=2):
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+async def run(args):
+    from custom_components.midea_heatpump_hws.profile_manager import ProfileManager
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        with open(args.profile) as f:
+            profile = json.load(f)
+        config = ProfileManager(hass).apply_profile_to_config(profile, {"host": "127.0.0.1"})
+        config["transport"] = args.transport
+        config["scan_interval"] = args.interval
+
+        counter = LogCounter(getattr(logging, args.log_level))
+        root = logging.getLogger()
+        root.handlers = [counter]
+        root.setLevel(counter.level)
+        logging.getLogger("homeassistant").setLevel(logging.CRITICAL)
+
+        print(f"💥 Fault scenarios against {profile.get('name', args.profile)} over {args.transport}: "
+              f"poll every {args.interval}s, {args.settle}s healthy, {args.fault_time}s faulty, "
+              f"up to {args.recover_time}s to recover, logging at {args.log_level}")
+        print("-" * 100)
+        print(f"{'Scenario':<10} {'Detect s':>9} {'Recover s':>10} {'Healthy ms':>11} {'Fault avg s':>12} "
+              f"{'Fault max s':>12} {'Failed':>9} {'Log lines':>10} {'Log KB':>8}")
+        print("-" * 100)
+        results = []
+        try:
+            for scenario in args.scenarios:
+                result = await run_scenario(hass, scenario, config, args, counter)
+                results.append(result)
+                healthy = result["healthy_cycle"]
+                print(f"{scenario:<10} {seconds(result['detect']):>9} {seconds(result['recover']):>10} "
+                      f"{'-' if healthy is None else f'{healthy * 1000:.1f}':>11} "
+                      f"{seconds(result['fault_cycle_mean']):>12} {seconds(result['fault_cycle_max']):>12} "
+                      f"{result['failed']:>4}/{result['cycles']:<4} {result['log_records']:>10} "
+                      f"{result['log_bytes'] / 1024:>8.1f}")
+        finally:
+            await hass.async_stop(force=True)
+        print("-" * 100)
+        print("Detect: fault start to the first failed or incomplete cycle (- never noticed)")
+        print("Recover: fault cleared to the first complete cycle (- not within --recover-time)")
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"args": vars(args), "results": results}, f, indent=2)
+            print(f"💾 Results saved to {args.json}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure how the coordinator detects and recovers from gateway faults')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS,
+                        help='Scenarios to run (default: all)')
+    parser.add_argument('--transport', choices=['tcp', 'rtu_over_tcp'], default='tcp',
+                        help='Transport between coordinator and stand-in (default: tcp)')
+    parser.add_argument('--profile', default=DEFAULT_PROFILE, help='Device profile JSON (default: Midea 170L)')
+    parser.add_argument('--interval', type=float, default=5.0, help='Poll interval in seconds (default: 5)')
+    parser.add_argument('--settle', type=float, default=15.0,
+                        help='Seconds of healthy polling before the fault (default: 15)')
+    parser.add_argument('--fault-time', type=float, default=30.0, help='Seconds the fault lasts (default: 30)')
+    parser.add_argument('--recover-time', type=float, default=60.0,
+                        help='Seconds to wait for recovery after the fault (default: 60)')
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='Network latency of the healthy stand-in in seconds (default: 0.005)')
+    parser.add_argument('--drop', type=float, default=0.5, help='Share of responses lost in drop (default: 0.5)')
+    parser.add_argument('--delay', type=float, default=3.0, help='Response delay in delay, seconds (default: 3.0)')
+    parser.add_argument('--illegal', default='104,105',
+                        help="Registers rejected in illegal (default: 104,105)")
+    parser.add_argument('--reset-every', type=int, default=4,
+                        help='Drop the connection every Nth request in reset (default: 4)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for dropped responses (default: 1)')
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='WARNING',
+                        help='Lowest level counted as log volume (default: WARNING, as Home Assistant)')
+    parser.add_argument('--json', metavar='FILE', help='Also save the numbers as JSON, to compare runs')
+    args = parser.parse_args()
+
+    if HomeAssistant is None:
+        print("❌ Home Assistant is not installed: pip install homeassistant")
+        raise SystemExit(1)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Profile fingerprinting benchmark
+Usage: python benchmark_fingerprint.py [options]
+
+Ranks the bundled profiles against the simulator's register image, then
+times compiling and ranking a large synthetic profile library, to check that
+automatic profile detection stays fast as the community library grows.
+
+Example: python benchmark_fingerprint.py --profiles 10000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from core_loader import INTEGRATION_DIR, load_core_module
+from modbus_simulator import DEFAULT_REGISTERS
+
+fingerprint = load_core_module("fingerprint")
+
+PROFILE_KEYS = ("power", "mode", "target_temp", "current_temp", "tank_top_temp", "tank_bottom_temp",
+                "condensor_temp", "outdoor_temp", "exhaust_temp", "suction_temp")
+
+
+def synthetic_profile(rng):
+    """Random but well-formed profile, like a community contribution"""
+    base = rng.choice((0, 100, 200, 1000))
+    registers = {key: base + rng.randrange(0, 24) for key in PROFILE_KEYS}
+    if rng.random() < 0.3:
+        registers["heater_assist_register"] = base + rng.randrange(0, 24)
+    return {
+        "registers": registers,
+        "mode_values": {"eco": rng.randrange(0, 5), "performance": rng.randrange(0, 5)},
+        "scaling": {
+            "current_temp": {"scale": rng.choice((0.1, 0.5, 1.0)), "offset": rng.choice((0.0, -15.0, -30.0))},
+            "target_temp": {"scale": rng.choice((0.5, 1.0)), "offset": 0.0},
+            "sensors": {"scale": rng.choice((0.1, 0.5, 1.0)), "offset": rng.choice((0.0, -15.0))},
+        },
+        "temp_limits": {"eco": {"min": rng.randrange(35, 60), "max": rng.randrange(60, 75)}},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark automatic profile detection')
+    parser.add_argument('--profiles', type=int, default=10000, help='Synthetic profiles to rank (default: 10000)')
+    parser.add_argument('--rounds', type=int, default=20, help='Ranking rounds to average (default: 20)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    snapshot = {register: value for register, value in DEFAULT_REGISTERS.items()
+                if register in fingerprint.FINGERPRINT_REGISTERS}
+
+    print("🔍 Bundled profiles vs. simulator register image")
+    bundled = {}
+    for profile_file in sorted((INTEGRATION_DIR / "models" / "defaults").glob("*.json")):
+        bundled[profile_file.stem] = fingerprint.compile_features(json.loads(profile_file.read_text()))
+    for profile_id, confidence in fingerprint.rank_profiles(bundled, snapshot):
+        print(f"   {profile_id:<24} {confidence:>6.0%}")
+
+    rng = random.Random(args.seed)
+    profiles = [synthetic_profile(rng) for _ in range(args.profiles)]
+
+    start = time.perf_counter()
+    index = {f"synthetic_{i}": fingerprint.compile_features(profile) for i, profile in enumerate(profiles)}
+    index.update(bundled)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        ranked = fingerprint.rank_profiles(index, snapshot)
+    rank_time = (time.perf_counter() - start) / args.rounds
+
+    print(f"\n⏱️  {len(index)} profiles: compile {compile_time * 1000:.1f} ms (once per file version), "
+          f"rank {rank_time * 1000:.2f} ms per detection")
+    print(f"   Best match: {ranked[0][0]} ({ranked[0][1]:.0%})")
+
+
+if __name__ == "__main__":
+    main()
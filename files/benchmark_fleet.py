@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Fleet polling benchmark
+Usage: python benchmark_fleet.py [options]
+
+Polls many simulated heaters from one event loop, the way Home Assistant
+does with one coordinator per heater, and measures event loop latency:
+
+  lockstep:  every heater polls on the same tick (coordinators started
+             together at setup)
+  staggered: the integration's fleet scheduler spreads heaters over the
+             interval and caps concurrent polls
+
+The simulator runs in a separate process (modbus_simulator.py, one unit per
+heater) so only the client side loads the measured loop.
+
+Example: python benchmark_fleet.py --heaters 100 --interval 5 --duration 30
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmark_transports import percentile, transport
+from core_loader import load_core_module
+
+fleet = load_core_module("fleet")
+
+# Block reads of one poll cycle (control block, sensor block)
+POLL_BLOCKS = ((0, 4), (101, 9))
+
+# Loop latency sampling period (seconds)
+TICK = 0.005
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_port(port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Simulator did not start")
+
+
+def busy(seconds):
+    """Burn CPU like decoding and writing entity states would"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def poll(client, unit, work):
+    registers = 0
+    for address, count in POLL_BLOCKS:
+        result = await client.read_holding_registers(address=address, count=count, device_id=unit)
+        if not result.isError():
+            registers += count
+    busy(work)
+    return registers
+
+
+async def monitor_lag(samples, stop):
+    """Record how late the loop wakes a sleeper, a proxy for UI/state latency"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        samples.append(time.perf_counter() - start - TICK)
+
+
+async def heater_lockstep(client, unit, args, start, stop, counters):
+    cycle = 0
+    while not stop.is_set():
+        delay = start + cycle * args.interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if stop.is_set():
+            return
+        registers = await poll(client, unit, args.work_ms / 1000)
+        counters["registers"] += registers
+        counters["polls"] += 1
+        cycle += 1
+
+
+async def heater_staggered(client, unit, args, scheduler, stop, counters):
+    member = f"heater-{unit}"
+    scheduler.join(member)
+    while not stop.is_set():
+        async with scheduler.slot():
+            registers = await poll(client, unit, args.work_ms / 1000)
+        scheduler.record(registers)
+        counters["registers"] += registers
+        counters["polls"] += 1
+        await asyncio.sleep(scheduler.next_delay(member, args.interval))
+
+
+async def run_mode(mode, port, args):
+    clients = []
+    for unit in range(1, args.heaters + 1):
+        client = transport.create_client("tcp", host="127.0.0.1", port=port, timeout=10)
+        if not await client.connect():
+            raise RuntimeError(f"Heater {unit}: connect failed")
+        clients.append(client)
+
+    stop = asyncio.Event()
+    lag = []
+    counters = {"polls": 0, "registers": 0}
+    scheduler = fleet.FleetScheduler(args.max_concurrent)
+    start = time.monotonic()
+
+    tasks = [asyncio.create_task(monitor_lag(lag, stop))]
+    for unit, client in enumerate(clients, start=1):
+        if mode == "lockstep":
+            tasks.append(asyncio.create_task(heater_lockstep(client, unit, args, start, stop, counters)))
+        else:
+            tasks.append(asyncio.create_task(heater_staggered(client, unit, args, scheduler, stop, counters)))
+
+    await asyncio.sleep(args.duration)
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.monotonic() - start
+    for client in clients:
+        client.close()
+
+    return {
+        "lag_mean": statistics.mean(lag),
+        "lag_p99": percentile(lag, 0.99),
+        "lag_max": max(lag),
+        "polls_per_second": counters["polls"] / elapsed,
+        "registers_per_second": counters["registers"] / elapsed,
+        "peak_in_flight": scheduler.peak_in_flight if mode == "staggered" else args.heaters,
+    }
+
+
+async def run(args, port):
+    await wait_for_port(port)
+    print(f"🏢 Fleet benchmark: {args.heaters} heaters, {args.interval}s interval, {args.duration}s per mode, "
+          f"{args.work_ms} ms state work per poll")
+    print("-" * 84)
+    print(f"{'Mode':<10} {'Lag mean ms':>12} {'Lag p99 ms':>11} {'Lag max ms':>11} "
+          f"{'Polls/s':>9} {'Regs/s':>9} {'Peak in flight':>15}")
+    print("-" * 84)
+    for mode in args.modes:
+        result = await run_mode(mode, port, args)
+        print(f"{mode:<10} {result['lag_mean'] * 1000:>12.2f} {result['lag_p99'] * 1000:>11.2f} "
+              f"{result['lag_max'] * 1000:>11.2f} {result['polls_per_second']:>9.1f} "
+              f"{result['registers_per_second']:>9.0f} {result['peak_in_flight']:>15}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure event loop latency when polling a fleet of heaters')
+    parser.add_argument('--heaters', type=int, default=100, help='Simulated heaters (default: 100)')
+    parser.add_argument('--interval', type=float, default=5, help='Poll interval per heater in seconds (default: 5)')
+    parser.add_argument('--duration', type=float, default=20, help='Measured seconds per mode (default: 20)')
+    parser.add_argument('--max-concurrent', type=int, default=fleet.FLEET_MAX_CONCURRENT,
+                        help=f'Fleet concurrency cap for staggered mode (default: {fleet.FLEET_MAX_CONCURRENT})')
+    parser.add_argument('--work-ms', type=float, default=0.5, help='CPU time per poll for state updates (default: 0.5)')
+    parser.add_argument('--modes', nargs='+', choices=['lockstep', 'staggered'], default=['lockstep', 'staggered'],
+                        help='Modes to compare (default: both)')
+    args = parser.parse_args()
+
+    port = free_port()
+    simulator = subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve().parent / "modbus_simulator.py"),
+         "--port", str(port), "--units", f"1-{args.heaters}"],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(run(args, port))
+    finally:
+        simulator.terminate()
+        simulator.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Trace replay benchmark
+Usage: python benchmark_replay.py <trace file> [options]
+
+Serves a trace recorded with the integration's start_trace service from the
+replaying stand-in (modbus_simulator.py --replay) and sends the recorded
+requests again, in order, through the integration's transport client. Every
+request has to end the way it did on the real bus (same values, same
+exception, timeout), so a failure session from a production gateway becomes
+a deterministic regression test for the read path, and the round trips are
+compared with the recorded ones.
+
+Example: python benchmark_replay.py 192_168_1_60_502_20261019_101500.trace --pace
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from pymodbus.exceptions import ModbusException
+
+from benchmark_transports import transport
+from core_loader import load_core_module
+from modbus_simulator import ReplaySimulator, bound_port, start_server
+
+bus_trace = load_core_module("bus_trace")
+
+METHODS = {
+    0x03: "read_holding_registers",
+    0x04: "read_input_registers",
+    0x06: "write_register",
+    0x10: "write_registers",
+}
+
+
+async def send(client, record, timeout):
+    """Send one recorded request, return (outcome, values, round trip)"""
+    method = getattr(client, METHODS[record.function])
+    if record.function == 0x06:
+        kwargs = {"address": record.address, "value": record.count, "device_id": record.unit}
+    elif record.function == 0x10:
+        kwargs = {"address": record.address, "values": list(record.values), "device_id": record.unit}
+    else:
+        kwargs = {"address": record.address, "count": record.count, "device_id": record.unit}
+    if not client.connected:
+        await client.connect()
+    start = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(method(**kwargs), timeout=timeout)
+    except asyncio.TimeoutError:
+        return bus_trace.OUTCOME_TIMEOUT, (), time.perf_counter() - start
+    except ModbusException:
+        return bus_trace.OUTCOME_ERROR, (), time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    if result.isError():
+        return bus_trace.OUTCOME_EXCEPTION, (), elapsed
+    return bus_trace.OUTCOME_OK, tuple(getattr(result, "registers", None) or ()), elapsed
+
+
+def percentile(values, share):
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(share * 100) - 1]
+
+
+def ms(value):
+    return "-" if value is None else f"{value * 1000:.1f}"
+
+
+async def run(args):
+    with open(args.trace, "rb") as f:
+        _, label, records = bus_trace.read_trace(f.read())
+    records = [record for record in records if record.function in METHODS]
+    if not records:
+        print(f"❌ {args.trace} holds no replayable requests")
+        return False
+
+    simulator = ReplaySimulator(records, args.timing)
+    server = await start_server(simulator, "127.0.0.1", 0, args.transport)
+    client = transport.create_client(args.transport, "127.0.0.1", bound_port(server), timeout=args.timeout)
+    await client.connect()
+
+    print(f"📼 Replaying {len(records)} requests of {label} recorded over {records[-1].offset:.1f}s "
+          f"({args.transport}, timing x{args.timing}{', recorded pacing' if args.pace else ''})")
+
+    recorded = {outcome: [] for outcome in bus_trace.OUTCOME_NAMES}
+    replayed = {outcome: [] for outcome in bus_trace.OUTCOME_NAMES}
+    mismatches = []
+    started = time.perf_counter()
+    try:
+        for record in records:
+            if args.pace:
+                delay = record.offset * args.timing - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            answered = record.outcome in (bus_trace.OUTCOME_OK, bus_trace.OUTCOME_EXCEPTION)
+            # Unanswered requests wait as long as the integration did
+            timeout = args.timeout if answered else max(record.duration * args.timing, 0.05)
+            outcome, values, elapsed = await send(client, record, timeout)
+            recorded[record.outcome].append(record.duration)
+            replayed[outcome].append(elapsed)
+            expected_outcome = record.outcome if answered else bus_trace.OUTCOME_TIMEOUT
+            # Writes answer without values, the recorded ones are what was written
+            read = record.function in (0x03, 0x04)
+            if outcome != expected_outcome or (outcome == bus_trace.OUTCOME_OK and read and values != record.values):
+                mismatches.append((record, bus_trace.OUTCOME_NAMES[outcome]))
+    finally:
+        client.close()
+        server.close()
+    elapsed = time.perf_counter() - started
+
+    print("-" * 72)
+    print(f"{'Outcome':<10} {'Recorded':>9} {'Replayed':>9} {'p50 rec ms':>11} {'p50 rep ms':>11} {'p95 rec ms':>11} {'p95 rep ms':>11}")
+    print("-" * 72)
+    for outcome, name in bus_trace.OUTCOME_NAMES.items():
+        if recorded[outcome] or replayed[outcome]:
+            print(f"{name:<10} {len(recorded[outcome]):>9} {len(replayed[outcome]):>9} "
+                  f"{ms(percentile(recorded[outcome], 0.5)):>11} {ms(percentile(replayed[outcome], 0.5)):>11} "
+                  f"{ms(percentile(recorded[outcome], 0.95)):>11} {ms(percentile(replayed[outcome], 0.95)):>11}")
+    print("-" * 72)
+    print(f"Replay took {elapsed:.2f}s for {simulator.requests} requests")
+    if mismatches:
+        print(f"❌ {len(mismatches)} request(s) ended differently than recorded:")
+        for record, outcome in mismatches[:10]:
+            print(f"   {record} -> {outcome}")
+        return False
+    print("✅ Every request ended as recorded")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recorded Modbus trace through the integration transport')
+    parser.add_argument('trace', help='Trace file from the start_trace service')
+    parser.add_argument('--transport', choices=['tcp', 'rtu_over_tcp', 'udp'], default='tcp',
+                        help='Transport to replay over (default: tcp)')
+    parser.add_argument('--timing', type=float, default=1.0,
+                        help='Scale recorded round trips and pacing, 0 for none (default: 1.0)')
+    parser.add_argument('--pace', action='store_true', help='Keep the recorded spacing between requests')
+    parser.add_argument('--timeout', type=float, default=2.0,
+                        help='Timeout for requests that were answered when recorded (default: 2.0)')
+    args = parser.parse_args()
+
+    # Recorded timeouts are replayed as timeouts, keep pymodbus quiet about them
+    logging.getLogger("pymodbus").setLevel(logging.CRITICAL)
+    raise SystemExit(0 if asyncio.run(run(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
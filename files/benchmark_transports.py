@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Transport latency benchmark
+Usage: python benchmark_transports.py [options]
+
+Compares per-transaction latency of Modbus TCP (MBAP), RTU-over-TCP, UDP and
+serial RTU (over a pseudo-terminal) against the local stand-in server
+(modbus_simulator.py), using the same client factory as the integration's
+coordinator.
+
+Without --bus-baud this measures framing and socket overhead only; with it,
+the simulator adds serial bus time so the numbers resemble an EW11 bridge.
+
+Example: python benchmark_transports.py -n 500 --bus-baud 9600
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from core_loader import load_core_module
+from modbus_simulator import ModbusSimulator, SimulatedDevice, TRANSPORTS, bound_port, start_server
+
+transport = load_core_module("transport")
+
+
+async def bench_transport(name, count, warmup, bus_baud, address, registers):
+    """Run count reads over one transport, return latency samples in seconds"""
+    simulator = ModbusSimulator({1: SimulatedDevice()}, bus_baud=bus_baud)
+    server = await start_server(simulator, "127.0.0.1", 0, name)
+    if name == "serial":
+        client = transport.create_client(name, host=server.device, port=0, timeout=5)
+    else:
+        client = transport.create_client(name, host="127.0.0.1", port=bound_port(server), timeout=5)
+
+    try:
+        start = time.perf_counter()
+        if not await client.connect():
+            raise RuntimeError(f"{name}: connect failed")
+        connect_time = time.perf_counter() - start
+
+        samples = []
+        for i in range(warmup + count):
+            start = time.perf_counter()
+            result = await client.read_holding_registers(address=address, count=registers, device_id=1)
+            elapsed = time.perf_counter() - start
+            if result.isError():
+                raise RuntimeError(f"{name}: read failed: {result}")
+            if i >= warmup:
+                samples.append(elapsed)
+        return connect_time, samples
+    finally:
+        client.close()
+        server.close()
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run(args):
+    print(f"⏱️  Transport benchmark: {args.count} reads of {args.registers} registers at {args.address}"
+          + (f", {args.bus_baud} baud bus" if args.bus_baud else ", no bus emulation"))
+    print("-" * 86)
+    print(f"{'Transport':<14} {'Connect ms':>11} {'Mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'Max ms':>9} {'Trans/s':>10}")
+    print("-" * 86)
+
+    for name in args.transports:
+        connect_time, samples = await bench_transport(
+            name, args.count, args.warmup, args.bus_baud, args.address, args.registers
+        )
+        mean = statistics.mean(samples)
+        print(f"{name:<14} {connect_time * 1000:>11.2f} {mean * 1000:>9.3f} "
+              f"{percentile(samples, 0.5) * 1000:>9.3f} {percentile(samples, 0.95) * 1000:>9.3f} "
+              f"{max(samples) * 1000:>9.3f} {1 / mean:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-transaction latency of Modbus transports')
+    parser.add_argument('-n', '--count', type=int, default=200, help='Measured transactions per transport (default: 200)')
+    parser.add_argument('--warmup', type=int, default=20, help='Unmeasured warm-up transactions (default: 20)')
+    parser.add_argument('--address', type=int, default=101, help='First register to read (default: 101)')
+    parser.add_argument('--registers', type=int, default=9, help='Registers per read (default: 9)')
+    parser.add_argument('--bus-baud', type=int, help='Emulate serial bus timing at this baud rate')
+    parser.add_argument('--transports', nargs='+', choices=TRANSPORTS, default=list(TRANSPORTS),
+                        help='Transports to compare (default: all)')
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
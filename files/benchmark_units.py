@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Unit id scan benchmark
+Usage: python benchmark_units.py [options]
+
+Simulates a multi-drop RS485 bus with several heaters behind one gateway
+(modbus_simulator.py with bus timing and a gateway response timeout for
+absent units) and compares ways of finding the unit ids:
+
+  sequential: one read per id with a pymodbus client, waiting for each
+              reply or timeout (what modbus_test.py and most tools do)
+  pipelined:  the integration's unit scan - several reads queued at the
+              gateway, matched by transaction id
+  bounded:    pipelined, stopping once the expected number of units answered
+
+Example: python benchmark_units.py --units 1,2,5,12,33 --last 64 --bus-baud 9600 --gateway-timeout 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from benchmark_transports import transport
+from core_loader import load_core_module
+from modbus_simulator import ModbusSimulator, SimulatedDevice, bound_port, parse_units, start_server
+
+discovery = load_core_module("discovery")
+
+
+async def scan_sequential(port, args):
+    client = transport.create_client(
+        "rtu_over_tcp" if args.rtu else "tcp", host="127.0.0.1", port=port, timeout=args.timeout
+    )
+    if not await client.connect():
+        raise RuntimeError("connect failed")
+    found = []
+    try:
+        for unit in range(1, args.last + 1):
+            # pymodbus drops the connection after repeated timeouts
+            if not client.connected and not await client.connect():
+                raise RuntimeError("reconnect failed")
+            try:
+                result = await client.read_holding_registers(address=0, count=1, device_id=unit)
+            except Exception:
+                continue
+            if not result.isError():
+                found.append(unit)
+    finally:
+        client.close()
+    return found
+
+
+async def scan_pipelined(port, args, expected=None):
+    return await discovery.async_scan_units(
+        "127.0.0.1", port, last=args.last, expected=expected, rtu=args.rtu,
+        window=args.window, gap=args.gap, timeout=args.timeout,
+    )
+
+
+async def run(args):
+    units = parse_units(args.units)
+    simulator = ModbusSimulator(
+        {unit: SimulatedDevice() for unit in units},
+        bus_baud=args.bus_baud,
+        gateway_timeout=args.gateway_timeout,
+    )
+    server = await start_server(simulator, "127.0.0.1", 0, "rtu_over_tcp" if args.rtu else "tcp")
+    port = bound_port(server)
+    expected = [unit for unit in units if unit <= args.last]
+
+    print(f"🚌 Unit scan: ids 1-{args.last}, units {expected} on the bus, "
+          f"{'RTU over TCP' if args.rtu else 'Modbus TCP'} gateway")
+    print(f"   bus {args.bus_baud or 'instant'} baud, gateway timeout {args.gateway_timeout}s, "
+          f"read timeout {args.timeout}s, window {1 if args.rtu else args.window}")
+    print("-" * 64)
+    print(f"{'Mode':<12} {'Time s':>8} {'Requests':>9} {'Found':>6}  Result")
+    print("-" * 64)
+
+    modes = {
+        "sequential": lambda: scan_sequential(port, args),
+        "pipelined": lambda: scan_pipelined(port, args),
+        "bounded": lambda: scan_pipelined(port, args, expected=len(expected)),
+    }
+    try:
+        for mode in args.modes:
+            requests = simulator.requests
+            start = time.perf_counter()
+            found = await modes[mode]()
+            elapsed = time.perf_counter() - start
+            # Let queued requests of this mode drain before the next one
+            await asyncio.sleep(args.gateway_timeout or 0)
+            result = "✅" if found == expected else f"❌ {found}"
+            print(f"{mode:<12} {elapsed:>8.2f} {simulator.requests - requests:>9} {len(found):>6}  {result}")
+    finally:
+        server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare unit id scans against a simulated multi-drop bus')
+    parser.add_argument('--units', default='1,2,5,12,33', help="Unit ids on the bus (default: 1,2,5,12,33)")
+    parser.add_argument('--last', type=int, default=64, help='Highest unit id to scan (default: 64)')
+    parser.add_argument('--bus-baud', type=int, default=9600, help='Serial bus speed (default: 9600)')
+    parser.add_argument('--gateway-timeout', type=float, default=0.05,
+                        help='Seconds the gateway waits for an absent unit (default: 0.05)')
+    parser.add_argument('--timeout', type=float, default=0.2, help='Read timeout in seconds (default: 0.2)')
+    parser.add_argument('--window', type=int, default=discovery.UNIT_SCAN_WINDOW,
+                        help=f'Reads queued at the gateway (default: {discovery.UNIT_SCAN_WINDOW})')
+    parser.add_argument('--gap', type=float, default=discovery.UNIT_SCAN_GAP,
+                        help=f'Spacing between reads in seconds (default: {discovery.UNIT_SCAN_GAP})')
+    parser.add_argument('--rtu', action='store_true', help='Transparent RTU-over-TCP gateway (one read at a time)')
+    parser.add_argument('--modes', nargs='+', choices=['sequential', 'pipelined', 'bounded'],
+                        default=['sequential', 'pipelined', 'bounded'], help='Modes to compare (default: all)')
+    args = parser.parse_args()
+
+    # Timeouts for absent units are expected, keep pymodbus quiet about them
+    logging.getLogger("pymodbus").setLevel(logging.CRITICAL)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
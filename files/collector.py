@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Headless sample collector
+Usage: python collector.py DEVICE [DEVICE ...] [options]
+       python collector.py --read DIR
+
+Polls one or many heaters without Home Assistant, using the integration's
+core package (block read plan, adaptive timeouts and pacing, reconnect
+backoff, fleet scheduling), and appends every poll to columnar chunk files:
+one directory per heater, one file per --chunk-rows samples, holding a
+timestamp column and one raw uint16 column per register. The profile's
+scaling is stored in each file header and applied when reading, so months
+of 5 second samples from a fleet take a few bytes per register and sample
+and analysis tools can memory-map the columns (see core/timeseries.py).
+
+A DEVICE is host[:port][/units] for a gateway (units comma separated,
+default 1), or a serial device path with --transport serial. Heaters behind
+one gateway share its connection and take turns on the bus.
+
+--read prints what a directory (or a tree of heater directories) holds.
+
+Example: python collector.py 192.168.1.80:502/1,2 --profile ecospring_hp300 --interval 5 --out /var/lib/midea
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+
+from pymodbus.exceptions import ModbusException, ModbusIOException
+
+from core_loader import INTEGRATION_DIR, load_core_module
+
+decode = load_core_module("decode")
+fleet = load_core_module("fleet")
+read_plan = load_core_module("read_plan")
+timeseries = load_core_module("timeseries")
+transport = load_core_module("transport")
+
+PROFILE_DIRS = [INTEGRATION_DIR / "models" / "defaults", INTEGRATION_DIR / "models" / "custom"]
+
+# Same connect limit as the coordinator
+CONNECT_TIMEOUT = 3.0
+
+
+def load_profile(name):
+    """Load a profile JSON from a path or by name from the integration's models"""
+    candidates = [name] + [str(directory / f"{name}.json") for directory in PROFILE_DIRS]
+    for path in candidates:
+        if os.path.isfile(path):
+            with open(path) as f:
+                return json.load(f)
+    raise SystemExit(f"❌ Profile not found: {name}")
+
+
+def parse_device(spec, default_port):
+    """Split host[:port][/units] into (host, port, [units])"""
+    host, units = spec, "1"
+    head, _, tail = spec.rpartition("/")
+    if head and tail.replace(",", "").isdigit():
+        host, units = head, tail
+    port = default_port
+    if ":" in host and not host.startswith("/"):
+        host, _, port_text = host.rpartition(":")
+        port = int(port_text)
+    return host, port, [int(unit) for unit in units.split(",")]
+
+
+class Gateway:
+    """One connection and its learned link state, shared by the heaters behind it"""
+
+    def __init__(self, host, port, args):
+        self.host = host
+        self.port = port
+        self.link = transport.GatewayLink(host, port)
+        self.reconnect = transport.ReconnectTracker()
+        # Serializes connecting, transactions take turns on link.lock
+        self.connect_lock = asyncio.Lock()
+        self.client = transport.create_client(
+            args.transport, host=host, port=port, timeout=transport.RTO_MAX,
+            retries=0, reconnect_delay=0, baudrate=args.baudrate, parity=args.parity,
+        )
+
+    async def ensure_connected(self):
+        """Connect with the reconnect backoff, False if this attempt failed"""
+        async with self.connect_lock:
+            if self.client.connected:
+                return True
+            delay = self.reconnect.next_delay()
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                connected = await asyncio.wait_for(self.client.connect(), timeout=CONNECT_TIMEOUT)
+            except Exception as err:
+                logging.debug("Connect to %s:%s failed: %s", self.host, self.port, err)
+                connected = False
+            if not connected:
+                self.reconnect.failed()
+                return False
+            self.reconnect.connected()
+            return True
+
+    async def read(self, address, count, unit):
+        """Read holding registers with adaptive pacing and timeout, like the coordinator"""
+        return await self.link.transact(
+            self.client, "read_holding_registers", {"address": address, "count": count, "device_id": unit}
+        )
+
+    def close(self):
+        self.client.close()
+
+
+class Heater:
+    """One heater: its read plan and chunk series"""
+
+    def __init__(self, gateway, unit, profile, registers, args):
+        self.gateway = gateway
+        self.unit = unit
+        self.name = f"{gateway.host.strip('/').replace('/', '_')}_{gateway.port}_{unit}"
+        self.registers = registers
+        self.layout = [(int(start), int(count)) for start, count in profile.get("polling", {}).get("blocks", [])]
+        self.singles = set()
+        self.plan = None
+        self.polls = 0
+        self.incomplete = 0
+        codec = decode.RegisterCodec.from_profile(profile)
+        header = {
+            "label": f"{gateway.host}:{gateway.port} unit {unit}",
+            "profile": profile.get("name"),
+            "capacity": args.chunk_rows,
+            "interval": args.interval,
+            "mode_values": codec.mode_values,
+            "columns": [
+                {"key": key, "register": register, "scale": codec.scaling(key)[0], "offset": codec.scaling(key)[1]}
+                for key, register in registers.items()
+            ],
+        }
+        self.series = timeseries.ChunkSeries(os.path.join(args.out, self.name), header)
+
+    def on_reject(self, block, result):
+        """Keep the registers of a block the device rejects separate from now on"""
+        if block.count == 1:
+            return
+        logging.debug("%s: block %s rejected (%s), reading its registers one by one", self.name, block, result)
+        self.singles.update(block.registers)
+        self.plan = None
+
+    async def poll(self):
+        """Read every register once, return key -> raw value of those read
+
+        The gateway is held per transaction, so units behind it interleave,
+        and a unit stops at its first block without an answer instead of
+        timing out on every block.
+        """
+        if self.plan is None:
+            self.plan = read_plan.build_read_plan(self.registers, singles=self.singles, layout=self.layout)
+
+        def read(address, count):
+            return self.gateway.read(address, count, self.unit)
+
+        raw = {}
+        for block in list(self.plan):
+            if not self.gateway.client.connected:
+                break
+            try:
+                await read_plan.read_block(read, block, raw, self.on_reject)
+            except (asyncio.TimeoutError, ModbusException) as err:
+                logging.info("%s: read of %s failed: %s", self.name, block, str(err) or type(err).__name__)
+                if not self.gateway.client.connected:
+                    self.gateway.reconnect.lost()
+                    break
+                # A unit that let one block time out is not answering the next ones either
+                if isinstance(err, (asyncio.TimeoutError, ModbusIOException)):
+                    break
+        return raw
+
+
+async def until_stopped(coro, stop):
+    """Await coro, cancelling it if stop is set first (None then)"""
+    task = asyncio.ensure_future(coro)
+    stopped = asyncio.ensure_future(stop.wait())
+    await asyncio.wait([task, stopped], return_when=asyncio.FIRST_COMPLETED)
+    stopped.cancel()
+    if task.done():
+        return task.result()
+    task.cancel()
+    await asyncio.wait([task])
+    return None
+
+
+async def collect(heater, scheduler, args, stop):
+    member = heater.name
+    await asyncio.sleep(scheduler.join(member))
+    since_flush = 0
+
+    async def cycle():
+        # Connect (and back off) outside the slot, which only covers the bus cycle
+        if not await heater.gateway.ensure_connected():
+            return time.time(), {}
+        async with scheduler.slot():
+            return time.time(), await heater.poll()
+
+    try:
+        while not stop.is_set():
+            result = await until_stopped(cycle(), stop)
+            if result is None:
+                break
+            timestamp, raw = result
+            scheduler.record(len(raw))
+            heater.polls += 1
+            if len(raw) < len(heater.registers):
+                heater.incomplete += 1
+            # A heater that did not answer at all leaves no row, a partial
+            # answer is stored with the missing registers marked
+            if raw:
+                heater.series.append(timestamp, raw)
+                since_flush += 1
+                if since_flush >= args.flush:
+                    heater.series.flush()
+                    since_flush = 0
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=scheduler.next_delay(member, args.interval))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        scheduler.leave(member)
+        heater.series.close()
+
+
+async def run(args):
+    profile = load_profile(args.profile)
+    registers = decode.profile_registers(profile)
+    if not registers:
+        raise SystemExit("❌ The profile maps no registers")
+    default_port = args.port or profile.get("connection", {}).get("port", 502)
+
+    gateways = {}
+    heaters = []
+    for spec in args.devices:
+        host, port, units = parse_device(spec, default_port)
+        gateway = gateways.get((host, port))
+        if gateway is None:
+            gateway = gateways[(host, port)] = Gateway(host, port, args)
+        heaters.extend(Heater(gateway, unit, profile, registers, args) for unit in units)
+
+    print(f"📈 Collecting {len(registers)} registers of {len(heaters)} heater(s) "
+          f"behind {len(gateways)} gateway(s) every {args.interval:g}s into {args.out}")
+    print(f"   Profile: {profile.get('name', args.profile)}, {args.chunk_rows} rows per chunk file")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    if args.duration:
+        loop.call_later(args.duration, stop.set)
+
+    scheduler = fleet.FleetScheduler(args.max_concurrent)
+    start = time.monotonic()
+    await asyncio.gather(*(collect(heater, scheduler, args, stop) for heater in heaters))
+    elapsed = time.monotonic() - start
+    for gateway in gateways.values():
+        gateway.close()
+
+    print(f"\n✅ Stopped after {elapsed:.0f}s")
+    for heater in heaters:
+        print(f"   {heater.name}: {heater.polls} polls, {heater.incomplete} incomplete, "
+              f"{heater.series.chunks} new chunk file(s)")
+    for gateway in gateways.values():
+        print(f"   {gateway.host}:{gateway.port}: {gateway.reconnect.reconnects} reconnects, "
+              f"timeout {gateway.link.rtt.timeout:.2f}s")
+
+
+def column_stats(chunk, key):
+    """(count, sum, min, max) of the decoded values read in one chunk column, streamed from the mapping"""
+    count, total, low, high = 0, 0, None, None
+    with chunk.raw(key) as raw:
+        for value in raw:
+            if value == timeseries.MISSING:
+                continue
+            count += 1
+            total += value
+            if low is None or value < low:
+                low = value
+            if high is None or value > high:
+                high = value
+    if not count:
+        return 0, 0.0, None, None
+    column = chunk.columns[key]
+    scale, offset = column["scale"], column["offset"]
+    low, high = sorted((low * scale + offset, high * scale + offset))
+    return count, total * scale + count * offset, low, high
+
+
+def summarize(directory):
+    """Print the chunks of a heater directory and per-key statistics"""
+    paths = timeseries.list_chunks(directory)
+    if not paths:
+        return False
+    # key -> [count, sum, min, max] over all chunks, in decoded units
+    columns = {}
+    rows = 0
+    first = last = None
+    size = 0
+    for path in paths:
+        with timeseries.Chunk(path) as chunk:
+            size += os.path.getsize(path)
+            if not chunk.rows:
+                continue
+            rows += chunk.rows
+            with chunk.timestamps() as stamps:
+                first = stamps[0] if first is None else first
+                last = stamps[-1]
+            for key in chunk.columns:
+                count, total, low, high = column_stats(chunk, key)
+                stats = columns.setdefault(key, [0, 0.0, None, None])
+                stats[0] += count
+                stats[1] += total
+                if low is not None:
+                    stats[2] = low if stats[2] is None else min(stats[2], low)
+                    stats[3] = high if stats[3] is None else max(stats[3], high)
+            label = chunk.header.get("label", directory)
+
+    if not rows:
+        print(f"📁 {directory}: {len(paths)} chunk file(s), no samples")
+        return True
+    span = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(first)), time.strftime(
+        "%Y-%m-%d %H:%M:%S", time.localtime(last))
+    print(f"📁 {directory} ({label})")
+    print(f"   {rows} samples in {len(paths)} chunk file(s), {size / 1024:.0f} KiB on disk, {span[0]} - {span[1]}")
+    for key, (count, total, low, high) in columns.items():
+        if count:
+            print(f"   {key:<20} min {low:>8.1f}  mean {total / count:>8.1f}  "
+                  f"max {high:>8.1f}  ({rows - count} missing)")
+        else:
+            print(f"   {key:<20} never read")
+    return True
+
+
+def read(directory):
+    found = summarize(directory)
+    if os.path.isdir(directory):
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if os.path.isdir(path):
+                found = summarize(path) or found
+    if not found:
+        print(f"❌ No chunk files in {directory}")
+        raise SystemExit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Poll heaters without Home Assistant into columnar sample files')
+    parser.add_argument('devices', nargs='*', help='host[:port][/units], e.g. 192.168.1.80:502/1,2')
+    parser.add_argument('--profile', default='midea_170l',
+                        help='Profile JSON path or name in models/defaults or models/custom (default: midea_170l)')
+    parser.add_argument('--out', default='midea_data', help='Output directory (default: midea_data)')
+    parser.add_argument('--interval', type=float, default=5.0, help='Poll interval in seconds (default: 5)')
+    parser.add_argument('--transport', choices=transport.TRANSPORTS, default=transport.TRANSPORT_TCP,
+                        help='Modbus transport (default: tcp)')
+    parser.add_argument('--port', type=int, help="Port for devices without one (default: the profile's, else 502)")
+    parser.add_argument('--baudrate', type=int, default=9600, help='Serial baud rate (default: 9600)')
+    parser.add_argument('--parity', choices=['N', 'E', 'O'], default='N', help='Serial parity (default: N)')
+    parser.add_argument('--chunk-rows', type=int, default=timeseries.CHUNK_DEFAULT_ROWS,
+                        help=f'Samples per chunk file (default: {timeseries.CHUNK_DEFAULT_ROWS}, a day at 5s)')
+    parser.add_argument('--flush', type=int, default=12, help='Sync a chunk to disk every N samples (default: 12)')
+    parser.add_argument('--max-concurrent', type=int, default=fleet.FLEET_MAX_CONCURRENT,
+                        help=f'Heaters polled at the same time (default: {fleet.FLEET_MAX_CONCURRENT})')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds (default: until interrupted)')
+    parser.add_argument('--read', metavar='DIR', help='Summarize collected chunk files instead of polling')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Log connection and read failures')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(asctime)s %(message)s")
+    logging.getLogger("pymodbus").setLevel(logging.CRITICAL)
+    if args.read:
+        read(args.read)
+        return
+    if not args.devices:
+        parser.error("give at least one device, or --read DIR")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
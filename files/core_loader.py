@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Loader for the integration's Home Assistant-free core package
+Usage: from core_loader import load_core_module
+
+Imports custom_components/midea_heatpump_hws/core without the integration
+package around it (which needs Home Assistant), so the tools in this
+directory share the integration's decoding, transport and scheduling code.
+
+Example: decode = load_core_module("decode")
+"""
+
+import importlib
+import importlib.util
+import sys
+from pathlib import Path
+
+INTEGRATION_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "midea_heatpump_hws"
+CORE_DIR = INTEGRATION_DIR / "core"
+CORE_PACKAGE = "midea_heatpump_core"
+
+
+def load_core_module(name):
+    """Import a module of the core package by name, e.g. 'transport'"""
+    if CORE_PACKAGE not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            CORE_PACKAGE, CORE_DIR / "__init__.py", submodule_search_locations=[str(CORE_DIR)]
+        )
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[CORE_PACKAGE] = package
+        spec.loader.exec_module(package)
+    return importlib.import_module(f"{CORE_PACKAGE}.{name}")
@@ -0,0 +1,804 @@
+#!/usr/bin/env python3
+"""
+Local Modbus stand-in server for the Midea heat pump integration
+Usage: python modbus_simulator.py [options]
+
+Serves a Midea-style holding register image so the integration,
+modbus_test.py and the benchmarks can run without hardware.
+
+Transports:
+  tcp:          Modbus TCP (MBAP header), like an EW11 in Modbus TCP mode
+  rtu_over_tcp: Raw RTU frames over TCP, like an EW11 in transparent mode
+  udp:          Modbus TCP (MBAP) over UDP
+  serial:       RTU frames on a pseudo-terminal, like a USB-RS485 adapter
+                (POSIX only, the device path to use is printed on start)
+
+Replay: --replay answers like the gateway in a trace recorded with the
+integration's start_trace service (latencies, timeouts, exceptions)
+
+Model: --model SPEED replaces the static image with a thermal tank model
+(heating by mode, standing loss, compressor-driven sensors) reacting to
+writes, with time accelerated SPEED times (8640: a day in 10 seconds)
+
+Faults: --drop, --delay, --illegal, --reset-every and --blackhole turn the
+stand-in into a misbehaving gateway (benchmark_faults.py scripts them)
+
+Example: python modbus_simulator.py --port 5020 --transport rtu_over_tcp --bus-baud 9600
+"""
+
+import abc
+import argparse
+import asyncio
+import math
+import os
+import random
+import struct
+import time
+
+from core_loader import load_core_module
+
+# Default register image: Midea 170L in eco mode, tank at ~60°C
+DEFAULT_REGISTERS = {
+    0: 1,      # Power on
+    1: 1,      # Eco mode
+    2: 65,     # Target temperature
+    3: 0,      # Sterilize off
+    101: 150,  # Tank top (150 × 0.5 - 15 = 60°C)
+    102: 148,  # Tank bottom
+    103: 110,  # Condensor
+    104: 80,   # Outdoor
+    105: 70,   # Exhaust (raw °C)
+    106: 75,   # Suction
+    107: 0,
+    108: 0,    # Heater assist
+    109: 0,    # Sanitize state
+}
+
+# Modbus exception codes
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+ILLEGAL_DATA_VALUE = 0x03
+
+# Maximum registers per read request (Modbus spec)
+MAX_READ_COUNT = 125
+
+# Returned instead of a response to drop the client's connection
+RESET_CONNECTION = object()
+
+# Trace outcomes answered when replaying (see bus_trace.py)
+REPLAY_OK = 0
+REPLAY_EXCEPTION = 1
+
+TRANSPORTS = ("tcp", "rtu_over_tcp", "udp", "serial")
+
+# Tank model (°C, simulated seconds), roughly a 170L heat pump water heater
+TANK_LITRES = 170
+ROOM_TEMP = 20.0             # Air around the tank
+TOP_LOSS_TAU = 48 * 3600     # Time constants of the tank layers cooling to room
+BOTTOM_LOSS_TAU = 24 * 3600  # temperature (the bottom loses more, through the inlet)
+MIXING_TAU = 6 * 3600        # Time constant of top and bottom evening out
+HYSTERESIS = 5.0             # Reheat once the tank bottom is this far below target
+HEAT_PUMP_LIMIT = 65.0       # The compressor cannot heat water beyond this
+ASSIST_GAP = 10.0            # Performance mode adds the element this far below target
+STERILIZE_TEMP = 70.0
+STERILIZE_HOLD = 600         # Seconds held at STERILIZE_TEMP
+OUTDOOR_SWING = 5.0          # Day/night outdoor amplitude (coldest at 03:00)
+SENSOR_TAU = 120             # Lag of condensor, suction, exhaust and outdoor sensors
+MODEL_STEP = 10              # Integration step
+
+# Mode register value -> (compressor heat, element heat) in watts
+MODE_HEAT = {1: (1000, 1500), 2: (1500, 1500), 4: (0, 1500)}
+
+# Sanitize state register values (109) while heating to / holding STERILIZE_TEMP
+SANITIZE_HEATING = 32
+SANITIZE_HOLDING = 33
+
+
+def crc16(frame):
+    """Compute the Modbus RTU CRC of a frame"""
+    crc = 0xFFFF
+    for byte in frame:
+        crc ^= byte
+        for _ in range(8):
+            if crc & 1:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+    return crc
+
+
+def exception_pdu(function_code, exception_code):
+    """Build a Modbus exception response PDU"""
+    return bytes([function_code | 0x80, exception_code])
+
+
+def sensor_raw(temp):
+    """Encode a temperature like the Midea sensor registers (raw × 0.5 - 15)"""
+    return max(0, round((temp + 15) * 2))
+
+
+def sensor_temp(raw):
+    return raw * 0.5 - 15
+
+
+class TankModel:
+    """Simple thermal model behind the Midea register map
+
+    Two tank layers heated by the compressor and/or the element depending on
+    power, mode, target and sterilize registers (written by clients), cooling
+    with standing loss. Condensor, suction, exhaust and outdoor follow the
+    compressor with a lag, outdoor swings over the day. Time runs speed
+    times faster than the wall clock, so a day of heating cycles can pass
+    in seconds.
+    """
+
+    def __init__(self, registers, speed=1.0, outdoor=15.0, clock=time.monotonic):
+        self.registers = registers
+        self.speed = speed
+        self.outdoor = outdoor
+        self.clock = clock
+        self.top = sensor_temp(registers[101])
+        self.bottom = sensor_temp(registers[102])
+        self.condensor = sensor_temp(registers[103])
+        self.outdoor_sensor = sensor_temp(registers[104])
+        self.exhaust = float(registers[105])
+        self.suction = sensor_temp(registers[106])
+        self.compressor = False
+        self.element = False
+        self.heating = False
+        self.held = 0.0
+        self.elapsed = 0.0  # Simulated seconds since start (start = midnight)
+        self.heating_cycles = 0
+        self.compressor_seconds = 0.0
+        self.element_seconds = 0.0
+        self._last = clock()
+
+    def advance(self):
+        """Catch the model up with the (accelerated) clock"""
+        now = self.clock()
+        self.step((now - self._last) * self.speed)
+        self._last = now
+
+    def step(self, seconds):
+        """Run the model for seconds of simulated time and update the registers"""
+        while seconds > 0:
+            dt = min(seconds, MODEL_STEP)
+            self._integrate(dt)
+            seconds -= dt
+        self._publish()
+
+    def ambient(self):
+        """Outdoor air temperature at the current simulated time of day"""
+        day = self.elapsed / 86400
+        return self.outdoor - OUTDOOR_SWING * math.cos(2 * math.pi * (day - 0.125))
+
+    def _integrate(self, dt):
+        registers = self.registers
+        power = bool(registers.get(0))
+        sterilize = bool(registers.get(3))
+        target = STERILIZE_TEMP if sterilize else registers.get(2, 0)
+        compressor_heat, element_heat = MODE_HEAT.get(registers.get(1), MODE_HEAT[1])
+
+        # Thermostat with hysteresis on the tank bottom (current temperature),
+        # a sterilize cycle heats right away and keeps going until it is done
+        if not power:
+            self.heating = False
+        elif not self.heating and (self.bottom < target - HYSTERESIS or sterilize):
+            self.heating = True
+            self.heating_cycles += 1
+        elif self.heating and self.bottom >= target and not sterilize:
+            self.heating = False
+        below = self.heating and self.bottom < target
+
+        # Compressor up to its limit, the element beyond it, in electric mode
+        # and (performance) while far below target
+        self.compressor = below and compressor_heat > 0 and self.bottom < HEAT_PUMP_LIMIT
+        self.element = below and (
+            not self.compressor
+            or (registers.get(1) == 2 and self.bottom < target - ASSIST_GAP)
+        )
+        heat = (compressor_heat if self.compressor else 0) + (element_heat if self.element else 0)
+        self.compressor_seconds += dt if self.compressor else 0
+        self.element_seconds += dt if self.element else 0
+
+        # Each layer holds half the water (4186 J/kg·K)
+        layer = TANK_LITRES / 2 * 4186
+        self.bottom += heat * 0.5 * dt / layer
+        self.top += heat * 0.5 * dt / layer
+        self.top -= (self.top - ROOM_TEMP) * dt / TOP_LOSS_TAU
+        self.bottom -= (self.bottom - ROOM_TEMP) * dt / BOTTOM_LOSS_TAU
+        if self.bottom > self.top:
+            # Warmer water rises: the layers mix
+            self.top = self.bottom = (self.top + self.bottom) / 2
+        else:
+            exchange = (self.top - self.bottom) * dt / MIXING_TAU / 2
+            self.top -= exchange
+            self.bottom += exchange
+
+        # Sterilize cycle: heat to STERILIZE_TEMP, hold it, then clear the request
+        if sterilize and power and (self.held or self.bottom >= STERILIZE_TEMP):
+            self.held += dt
+            if self.held >= STERILIZE_HOLD:
+                registers[3] = 0
+                self.held = 0.0
+        elif not sterilize:
+            self.held = 0.0
+
+        # Sensors follow the compressor with a lag
+        ambient = self.ambient()
+        if self.compressor:
+            targets = (min(self.bottom + 8, 70), ambient - 1.5, ambient - 8, self.bottom + 25)
+        else:
+            targets = (self.bottom, ambient, ambient, ROOM_TEMP)
+        lag = min(1.0, dt / SENSOR_TAU)
+        self.condensor += (targets[0] - self.condensor) * lag
+        self.outdoor_sensor += (targets[1] - self.outdoor_sensor) * lag
+        self.suction += (targets[2] - self.suction) * lag
+        self.exhaust += (targets[3] - self.exhaust) * lag
+        self.elapsed += dt
+
+    def _publish(self):
+        registers = self.registers
+        registers[101] = sensor_raw(self.top)
+        registers[102] = sensor_raw(self.bottom)
+        registers[103] = sensor_raw(self.condensor)
+        registers[104] = sensor_raw(self.outdoor_sensor)
+        registers[105] = max(0, round(self.exhaust))  # Raw °C
+        registers[106] = sensor_raw(self.suction)
+        registers[108] = int(self.element)
+        if registers.get(3):
+            registers[109] = SANITIZE_HOLDING if self.held else SANITIZE_HEATING
+        else:
+            registers[109] = 0
+
+    def as_dict(self):
+        return {
+            "simulated_hours": round(self.elapsed / 3600, 2),
+            "top": round(self.top, 1),
+            "bottom": round(self.bottom, 1),
+            "heating_cycles": self.heating_cycles,
+            "compressor_hours": round(self.compressor_seconds / 3600, 2),
+            "element_hours": round(self.element_seconds / 3600, 2),
+        }
+
+
+class SimulatedDevice:
+    """Holding register image of one Modbus unit, optionally driven by a TankModel"""
+
+    def __init__(self, registers=None, speed=None, outdoor=15.0):
+        self.registers = dict(DEFAULT_REGISTERS if registers is None else registers)
+        self.model = TankModel(self.registers, speed, outdoor) if speed else None
+        self.reads = 0
+        self.writes = 0
+
+    def read(self, address, count):
+        """Return register values, or None if any address is unmapped"""
+        if self.model:
+            self.model.advance()
+        values = []
+        for register in range(address, address + count):
+            if register not in self.registers:
+                return None
+            values.append(self.registers[register])
+        return values
+
+    def write(self, address, value):
+        """Write one register, return False if the address is unmapped"""
+        if address not in self.registers:
+            return False
+        if self.model:
+            # Run the model up to now with the old settings first
+            self.model.advance()
+        self.registers[address] = value
+        return True
+
+    def handle_pdu(self, pdu):
+        """Process a request PDU and return the response PDU"""
+        function_code = pdu[0]
+
+        if function_code in (0x03, 0x04):
+            address, count = struct.unpack(">HH", pdu[1:5])
+            if not 1 <= count <= MAX_READ_COUNT:
+                return exception_pdu(function_code, ILLEGAL_DATA_VALUE)
+            values = self.read(address, count)
+            if values is None:
+                return exception_pdu(function_code, ILLEGAL_DATA_ADDRESS)
+            self.reads += 1
+            return bytes([function_code, 2 * count]) + struct.pack(f">{count}H", *values)
+
+        if function_code == 0x06:
+            address, value = struct.unpack(">HH", pdu[1:5])
+            if not self.write(address, value):
+                return exception_pdu(function_code, ILLEGAL_DATA_ADDRESS)
+            self.writes += 1
+            return pdu[:5]
+
+        if function_code == 0x10:
+            address, count, byte_count = struct.unpack(">HHB", pdu[1:6])
+            values = struct.unpack(f">{count}H", pdu[6:6 + byte_count])
+            if any(register not in self.registers for register in range(address, address + count)):
+                return exception_pdu(function_code, ILLEGAL_DATA_ADDRESS)
+            for offset, value in enumerate(values):
+                self.write(address + offset, value)
+            self.writes += 1
+            return pdu[:5]
+
+        return exception_pdu(function_code, ILLEGAL_FUNCTION)
+
+
+class ModbusSimulator:
+    """Dispatch requests to simulated units, optionally emulating a serial bus"""
+
+    def __init__(self, devices=None, bus_baud=None, gateway_timeout=None, latency=None):
+        self.devices = devices if devices is not None else {1: SimulatedDevice()}
+        self.bus_baud = bus_baud
+        self.gateway_timeout = gateway_timeout
+        self.latency = latency
+        self.requests = 0
+        self._bus = asyncio.Lock()
+
+    async def handle(self, unit, pdu):
+        """Return the response PDU for a request, or None if nobody answers"""
+        self.requests += 1
+        if self.latency:
+            # Network and gateway processing time, not holding the bus
+            await asyncio.sleep(self.latency)
+        device = self.devices.get(unit)
+        if device is None:
+            # No unit with this id on the bus: silence, like real RS485. A
+            # gateway holds the bus until its response timeout expires.
+            if self.gateway_timeout:
+                async with self._bus:
+                    await asyncio.sleep(self.gateway_timeout)
+            return None
+
+        response = device.handle_pdu(pdu)
+        if self.bus_baud:
+            # Request and response as RTU frames (unit + PDU + CRC), 10 bits
+            # per byte, one frame on the bus at a time
+            async with self._bus:
+                await asyncio.sleep((len(pdu) + len(response) + 6) * 10 / self.bus_baud)
+        return response
+
+
+class ReplaySimulator:
+    """Answer requests the way a recorded trace (bus_trace.py) says the gateway did
+
+    Every recorded request (unit, function, address, count) gets its
+    recorded outcomes in order, starting over when they run out, after the
+    recorded round trip: the values, the same exception response, or
+    silence for timeouts and lost connections. Requests the trace does not
+    contain are served from the last values it saw after the median round
+    trip, and rejected like unmapped addresses where it saw none.
+    """
+
+    def __init__(self, records, timing=1.0):
+        self.timing = timing
+        self.requests = 0
+        self.replayed = 0
+        self.recorded = len(records)
+        self._outcomes = {}
+        self._next = {}
+        self.image = {}  # (unit, address) -> last value seen
+        durations = []
+        for record in records:
+            self._outcomes.setdefault(record.key, []).append(record)
+            if record.outcome == REPLAY_OK and record.function in (0x03, 0x04):
+                self.image.update(((record.unit, record.address + offset), value)
+                                  for offset, value in enumerate(record.values))
+                durations.append(record.duration)
+        durations.sort()
+        self.median = durations[len(durations) // 2] if durations else 0.0
+        self.units = sorted({record.unit for record in records})
+
+    async def handle(self, unit, pdu):
+        """Return the response PDU for a request, or None if nobody answers"""
+        self.requests += 1
+        function_code = pdu[0]
+        address, count = struct.unpack(">HH", pdu[1:5]) if len(pdu) >= 5 else (0, 0)
+        recorded = self._outcomes.get((unit, function_code, address, count))
+        if recorded is None:
+            return await self._from_image(unit, pdu, function_code, address, count)
+
+        index = self._next.get(recorded[0].key, 0)
+        self._next[recorded[0].key] = (index + 1) % len(recorded)
+        record = recorded[index]
+        self.replayed += 1
+        if record.outcome not in (REPLAY_OK, REPLAY_EXCEPTION):
+            # Timeout or lost connection: the client never got an answer
+            return None
+        await asyncio.sleep(record.duration * self.timing)
+        if record.outcome == REPLAY_EXCEPTION:
+            return exception_pdu(function_code, record.exception_code)
+        if function_code in (0x06, 0x10):
+            return pdu[:5]
+        return bytes([function_code, 2 * len(record.values)]) + struct.pack(f">{len(record.values)}H", *record.values)
+
+    async def _from_image(self, unit, pdu, function_code, address, count):
+        await asyncio.sleep(self.median * self.timing)
+        if function_code in (0x03, 0x04):
+            if not 1 <= count <= MAX_READ_COUNT:
+                return exception_pdu(function_code, ILLEGAL_DATA_VALUE)
+            keys = [(unit, register) for register in range(address, address + count)]
+            if any(key not in self.image for key in keys):
+                return exception_pdu(function_code, ILLEGAL_DATA_ADDRESS)
+            return bytes([function_code, 2 * count]) + struct.pack(f">{count}H", *(self.image[key] for key in keys))
+        if function_code == 0x06:
+            if (unit, address) not in self.image:
+                return exception_pdu(function_code, ILLEGAL_DATA_ADDRESS)
+            self.image[(unit, address)] = count
+            return pdu[:5]
+        if function_code == 0x10 and len(pdu) >= 6 + 2 * count:
+            keys = [(unit, register) for register in range(address, address + count)]
+            if any(key not in self.image for key in keys):
+                return exception_pdu(function_code, ILLEGAL_DATA_ADDRESS)
+            self.image.update(zip(keys, struct.unpack(f">{count}H", pdu[6:6 + 2 * count])))
+            return pdu[:5]
+        return exception_pdu(function_code, ILLEGAL_FUNCTION)
+
+
+class FaultInjector:
+    """Wrap a simulator with scriptable faults for resilience tests
+
+    drop:        share of responses silently lost (0-1)
+    delay:       seconds added before every response
+    illegal:     registers answered with an illegal data address exception
+    reset_every: drop the connection instead of answering every Nth request
+    blackhole:   accept connections but never answer
+
+    The attributes are read per request, so a running scenario can change
+    them (clear() restores a healthy gateway).
+    """
+
+    def __init__(self, simulator, drop=0.0, delay=0.0, illegal=(), reset_every=0, blackhole=False, seed=None):
+        self.simulator = simulator
+        self.drop = drop
+        self.delay = delay
+        self.illegal = set(illegal)
+        self.reset_every = reset_every
+        self.blackhole = blackhole
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.dropped = 0
+        self.resets = 0
+
+    def clear(self):
+        """Stop injecting faults"""
+        self.drop = 0.0
+        self.delay = 0.0
+        self.illegal = set()
+        self.reset_every = 0
+        self.blackhole = False
+
+    @property
+    def active(self):
+        return bool(self.drop or self.delay or self.illegal or self.reset_every or self.blackhole)
+
+    async def handle(self, unit, pdu):
+        """Return the response PDU, None for silence or RESET_CONNECTION"""
+        self.requests += 1
+        if self.blackhole:
+            return None
+        if self.reset_every and self.requests % self.reset_every == 0:
+            self.resets += 1
+            return RESET_CONNECTION
+        function_code = pdu[0]
+        if self.illegal and function_code in (0x03, 0x04, 0x06, 0x10) and len(pdu) >= 5:
+            address, count = struct.unpack(">HH", pdu[1:5])
+            if function_code == 0x06:
+                count = 1
+            if self.illegal.intersection(range(address, address + count)):
+                return exception_pdu(function_code, ILLEGAL_DATA_ADDRESS)
+
+        response = await self.simulator.handle(unit, pdu)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.drop and self.random.random() < self.drop:
+            self.dropped += 1
+            return None
+        return response
+
+    def __getattr__(self, name):
+        # Counters and settings of the wrapped simulator (devices, units, ...)
+        return getattr(self.simulator, name)
+
+
+def load_replay(path, timing=1.0):
+    """Build a ReplaySimulator from a trace file, return (simulator, gateway label)"""
+    bus_trace = load_core_module("bus_trace")
+    with open(path, "rb") as f:
+        _, label, records = bus_trace.read_trace(f.read())
+    return ReplaySimulator(records, timing), label
+
+
+def rtu_request_length(buffer):
+    """Return the full length of the RTU request at the start of buffer, or None"""
+    if len(buffer) < 2:
+        return None
+    function_code = buffer[1]
+    if function_code in (0x03, 0x04, 0x06):
+        return 8
+    if function_code == 0x10:
+        if len(buffer) < 7:
+            return None
+        return 9 + buffer[6]
+    # Unknown function: treat the rest of the buffer as one frame
+    return len(buffer)
+
+
+class _StreamProtocol(asyncio.Protocol, abc.ABC):
+    """Base for stream transports: frames are processed in order, one at a time"""
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.transport = None
+        self.buffer = b""
+        self.queue = asyncio.Queue()
+        self.worker = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.worker = asyncio.get_running_loop().create_task(self._process())
+
+    def connection_lost(self, exc):
+        if self.worker:
+            self.worker.cancel()
+
+    def data_received(self, data):
+        self.buffer += data
+        for frame in self.split_frames():
+            self.queue.put_nowait(frame)
+
+    async def _process(self):
+        while True:
+            frame = await self.queue.get()
+            response = await self.respond(frame)
+            if response is RESET_CONNECTION:
+                # Injected fault: the gateway drops the connection
+                getattr(self.transport, "abort", self.transport.close)()
+                return
+            if response and not self.transport.is_closing():
+                self.transport.write(response)
+
+    @abc.abstractmethod
+    def split_frames(self):
+        """Remove the complete request frames from the buffer and return them"""
+
+    @abc.abstractmethod
+    async def respond(self, frame):
+        """Return the response frame to a request frame, None for no answer or RESET_CONNECTION"""
+
+
+class MbapProtocol(_StreamProtocol):
+    """Modbus TCP (MBAP header) server connection"""
+
+    def split_frames(self):
+        frames = []
+        while len(self.buffer) >= 7:
+            length = struct.unpack(">H", self.buffer[4:6])[0]
+            total = 6 + length
+            if len(self.buffer) < total:
+                break
+            frames.append(self.buffer[:total])
+            self.buffer = self.buffer[total:]
+        return frames
+
+    async def respond(self, frame):
+        transaction_id, unit = struct.unpack(">H", frame[:2])[0], frame[6]
+        response = await self.simulator.handle(unit, frame[7:])
+        if response is None or response is RESET_CONNECTION:
+            return response
+        return struct.pack(">HHHB", transaction_id, 0, len(response) + 1, unit) + response
+
+
+class RtuProtocol(_StreamProtocol):
+    """RTU frames over a TCP stream (transparent bridge)"""
+
+    def split_frames(self):
+        frames = []
+        while True:
+            length = rtu_request_length(self.buffer)
+            if length is None or len(self.buffer) < length:
+                break
+            frames.append(self.buffer[:length])
+            self.buffer = self.buffer[length:]
+        return frames
+
+    async def respond(self, frame):
+        if len(frame) < 4 or crc16(frame[:-2]) != int.from_bytes(frame[-2:], "little"):
+            # Corrupt frame: a real device stays silent
+            return None
+        unit = frame[0]
+        response = await self.simulator.handle(unit, frame[1:-2])
+        if response is None or response is RESET_CONNECTION:
+            return response
+        reply = bytes([unit]) + response
+        return reply + crc16(reply).to_bytes(2, "little")
+
+
+class MbapDatagramProtocol(asyncio.DatagramProtocol):
+    """Modbus TCP (MBAP header) over UDP, one frame per datagram"""
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) >= 8:
+            asyncio.get_running_loop().create_task(self._respond(data, addr))
+
+    async def _respond(self, frame, addr):
+        transaction_id, unit = struct.unpack(">H", frame[:2])[0], frame[6]
+        response = await self.simulator.handle(unit, frame[7:])
+        # A datagram gateway has no connection to drop
+        if response is not None and response is not RESET_CONNECTION:
+            self.transport.sendto(
+                struct.pack(">HHHB", transaction_id, 0, len(response) + 1, unit) + response, addr
+            )
+
+
+class PtyServer(asyncio.Transport):
+    """Serve RTU frames on the master side of a pseudo-terminal
+
+    Clients open the slave device (see .device) exactly like a USB-RS485
+    adapter, so the integration's serial transport runs end to end.
+    """
+
+    def __init__(self, simulator):
+        super().__init__()
+        import tty
+
+        self.master, slave = os.openpty()
+        self.device = os.ttyname(slave)
+        # Raw mode so the line discipline doesn't mangle binary frames
+        tty.setraw(slave)
+        os.close(slave)
+        os.set_blocking(self.master, False)
+        self._closing = False
+        self._loop = asyncio.get_running_loop()
+        self.protocol = RtuProtocol(simulator)
+        self.protocol.connection_made(self)
+        self._loop.add_reader(self.master, self._read_ready)
+
+    def _read_ready(self):
+        try:
+            data = os.read(self.master, 4096)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            # EIO: no client has the slave open, wait for the next one
+            return
+        if data:
+            self.protocol.data_received(data)
+
+    def write(self, data):
+        os.write(self.master, data)
+
+    def is_closing(self):
+        return self._closing
+
+    def close(self):
+        if self._closing:
+            return
+        self._closing = True
+        self._loop.remove_reader(self.master)
+        self.protocol.connection_lost(None)
+        os.close(self.master)
+
+
+async def start_server(simulator, host="127.0.0.1", port=5020, transport="tcp"):
+    """Start serving the simulator, return the server (or datagram transport)"""
+    loop = asyncio.get_running_loop()
+    if transport == "serial":
+        return PtyServer(simulator)
+    if transport == "udp":
+        server, _ = await loop.create_datagram_endpoint(
+            lambda: MbapDatagramProtocol(simulator), local_addr=(host, port)
+        )
+        return server
+    if transport == "rtu_over_tcp":
+        return await loop.create_server(lambda: RtuProtocol(simulator), host, port)
+    if transport == "tcp":
+        return await loop.create_server(lambda: MbapProtocol(simulator), host, port)
+    raise ValueError(f"Unsupported transport: {transport}")
+
+
+def bound_port(server):
+    """Return the port a server from start_server() is listening on"""
+    if hasattr(server, "sockets"):
+        return server.sockets[0].getsockname()[1]
+    return server.get_extra_info("sockname")[1]
+
+
+def parse_units(text):
+    """Parse a unit id list like '1,2,5-7'"""
+    units = set()
+    for part in text.split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            units.update(range(int(first), int(last) + 1))
+        elif part:
+            units.add(int(part))
+    return sorted(units)
+
+
+async def run(args):
+    if args.replay:
+        simulator, label = load_replay(args.replay, args.timing)
+        args.units = ",".join(map(str, simulator.units))
+        print(f"📼 Replaying {simulator.recorded} recorded requests of {label} "
+              f"(median round trip {simulator.median * 1000:.0f} ms, timing x{args.timing})")
+    else:
+        simulator = ModbusSimulator(
+            {unit: SimulatedDevice(speed=args.model, outdoor=args.outdoor) for unit in parse_units(args.units)},
+            bus_baud=args.bus_baud,
+            gateway_timeout=args.gateway_timeout,
+            latency=args.latency,
+        )
+    if args.drop or args.delay or args.illegal or args.reset_every or args.blackhole:
+        simulator = FaultInjector(
+            simulator,
+            drop=args.drop,
+            delay=args.delay,
+            illegal=parse_units(args.illegal) if args.illegal else (),
+            reset_every=args.reset_every,
+            blackhole=args.blackhole,
+        )
+    server = await start_server(simulator, args.host, args.port, args.transport)
+    if args.transport == "serial":
+        print(f"🧪 Simulating units {args.units} on serial device {server.device} (RTU)")
+    else:
+        print(f"🧪 Simulating units {args.units} on {args.host}:{bound_port(server)} ({args.transport})")
+    if args.bus_baud:
+        print(f"   Emulating a {args.bus_baud} baud RS485 bus")
+    if args.latency:
+        print(f"   Adding {args.latency * 1000:.0f} ms network latency per request")
+    if args.gateway_timeout:
+        print(f"   Absent units hold the bus for {args.gateway_timeout}s (gateway response timeout)")
+    if args.model and not args.replay:
+        print(f"🌡️  Tank model running at x{args.model:g} speed (a simulated day every "
+              f"{86400 / args.model:.0f}s), outdoor {args.outdoor}°C ± {OUTDOOR_SWING}°C")
+    if isinstance(simulator, FaultInjector):
+        print(f"⚠️  Injecting faults: drop {simulator.drop:.0%}, delay {simulator.delay}s, "
+              f"illegal {sorted(simulator.illegal) or '-'}, reset every {simulator.reset_every or '-'}, "
+              f"blackhole {'on' if simulator.blackhole else 'off'}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Modbus stand-in server for the Midea heat pump integration')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=5020, help='Port to listen on (default: 5020)')
+    parser.add_argument('--transport', choices=TRANSPORTS, default='tcp', help='Framing/transport (default: tcp)')
+    parser.add_argument('--units', default='1', help="Unit ids to simulate, e.g. '1,2,5-7' (default: 1)")
+    parser.add_argument('--bus-baud', type=int, help='Emulate serial bus timing at this baud rate')
+    parser.add_argument('--gateway-timeout', type=float,
+                        help='Seconds the bus stays busy for a request to an absent unit')
+    parser.add_argument('--latency', type=float, help='Seconds of network latency added to every request')
+    parser.add_argument('--replay', metavar='FILE', help='Answer like the gateway in a recorded trace (start_trace service)')
+    parser.add_argument('--timing', type=float, default=1.0,
+                        help='Scale the recorded round trips when replaying, 0 for none (default: 1.0)')
+    parser.add_argument('--model', type=float, metavar='SPEED',
+                        help='Drive the registers with the tank model, time running SPEED times faster (e.g. 1, 8640)')
+    parser.add_argument('--outdoor', type=float, default=15.0, help='Mean outdoor temperature for the model (default: 15)')
+    parser.add_argument('--drop', type=float, default=0.0, help='Share of responses to drop, 0-1 (fault injection)')
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds added before every response (fault injection)')
+    parser.add_argument('--illegal', help="Registers answered with an illegal data address exception, e.g. '104,105'")
+    parser.add_argument('--reset-every', type=int, default=0, help='Drop the connection on every Nth request')
+    parser.add_argument('--blackhole', action='store_true', help='Accept connections but never answer')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("\n⏹️  Simulator stopped")
+
+
+if __name__ == "__main__":
+    main()
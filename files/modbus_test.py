@@ -7,13 +7,84 @@ Modes:
   Default: Read known water heater registers
   -t: Test mode for discovering operating modes  
   -m: Map mode to scan for available registers
+  -a: Async scan of several tables and unit ids
+  -c: Capture mode, samples ranges to a file and prints changes
+  --analyze: Rank the registers of a capture file
+  --make-profile: Draft a profile JSON from a scan or capture
 
 Example: python modbus_test.py 192.168.1.80 502 -m
 """
 
-from pymodbus.client import ModbusTcpClient
+from pymodbus.client import AsyncModbusTcpClient, ModbusTcpClient
+from pymodbus.exceptions import ModbusIOException
 import sys
+import time
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import statistics
 import argparse
+import json
+from datetime import datetime
+
+from core_loader import load_core_module
+
+try:
+    import numpy as np
+except ImportError:  # Capture analysis falls back to pure Python
+    np = None
+
+# Scaling and mode mapping shared with the integration
+decode = load_core_module("decode")
+CODEC = decode.RegisterCodec()
+
+# Display names of the integration's modes
+MODE_LABELS = {"eco": "Eco", "performance": "Hybrid", "electric": "E-Heater"}
+
+# Largest block read allowed by the Modbus spec
+MAX_BLOCK_SIZE = 125
+MAX_BIT_BLOCK_SIZE = 2000
+
+# Tables covered by the async scan: key -> (name, pymodbus read method, bit table)
+SCAN_TABLES = {
+    "hr": ("Holding", "read_holding_registers", False),
+    "ir": ("Input", "read_input_registers", False),
+    "co": ("Coil", "read_coils", True),
+    "di": ("Discrete", "read_discrete_inputs", True),
+}
+
+# Modbus exception code for an unsupported function (table)
+ILLEGAL_FUNCTION = 1
+
+# Consecutive timeouts after which the scan gives up on a unit id
+UNREACHABLE_TIMEOUTS = 3
+
+# Capture file: magic, then unit id and range count, then (start, count) per
+# range; followed by fixed-size records of timestamp, failed-range bit mask
+# and the raw values of all ranges
+CAPTURE_MAGIC = b"MHWSCAP1"
+CAPTURE_HEADER = "<HH"
+CAPTURE_RANGE = "<HH"
+CAPTURE_MAX_RANGES = 32
+
+# Temperature interpretations tried for unknown registers:
+# (name, scale, offset, valid range in °C)
+TEMP_FORMULAS = [
+    ("Raw", 1, 0, (0, 150)),
+    ("Scale+Offset", 0.5, -15, (-20, 120)),
+    ("Scale×0.1", 0.1, 0, (0, 150)),
+    ("Offset-40", 1, -40, (-40, 100)),
+]
+
+# Draft profiles: sensor readings a heater plausibly shows (°C), raw set
+# point range, most distinct values of an enumerated register and the
+# sensor keys filled in address order
+PROFILE_SENSOR_RANGE = (-30, 90)
+PROFILE_TARGET_RANGE = (30, 80)
+PROFILE_MAX_DISTINCT = 8
+PROFILE_SENSOR_KEYS = ["tank_top_temp", "tank_bottom_temp", "condensor_temp", "outdoor_temp", "exhaust_temp", "suction_temp"]
 
 # Water heat pump register configuration
 WATER_HEATER_REGISTERS = [
@@ -34,17 +105,13 @@ WATER_HEATER_REGISTERS = [
 
 def process_value(raw_value, register_config):
     """Apply scaling and offset to raw register value"""
-    processed = raw_value
-    
-    # Apply scale first (Home Assistant modbus order)
-    if "scale" in register_config:
-        processed *= register_config["scale"]
-    
-    # Then apply offset
-    if "offset" in register_config:
-        processed += register_config["offset"]
-    
-    return processed
+    return decode.scale_value(raw_value, register_config.get("scale", 1), register_config.get("offset", 0))
+
+
+def mode_label(value):
+    """Display name of a mode register value, 'Other' if unknown"""
+    mode = CODEC.mode(value)
+    return MODE_LABELS[mode] if mode else "Other"
 
 def format_value(raw_value, register_config):
     """Format the value with appropriate units and precision"""
@@ -58,25 +125,14 @@ def format_value(raw_value, register_config):
     elif register_config["type"] == "status":
         return "ON" if processed == 1 else "OFF"
     elif register_config["type"] == "mode":
-        # Map heat pump operating modes
-        mode_map = {
-            1: "Eco",
-            2: "Hybrid", 
-            4: "E-Heater"
-        }
-        if processed in mode_map:
-            return mode_map[processed]
-        else:
-            return "Other"
+        return mode_label(processed)
     else:
         return str(processed)
 
 def is_unknown_mode(raw_value, register_config):
     """Check if this is an unknown operating mode"""
     if register_config["type"] == "mode":
-        processed = process_value(raw_value, register_config)
-        mode_map = {1: "Eco", 2: "Hybrid", 4: "E-Heater"}
-        return processed not in mode_map
+        return CODEC.mode(process_value(raw_value, register_config)) is None
     return False
 
 def test_operating_modes(client):
@@ -106,8 +162,7 @@ def test_operating_modes(client):
                         print(f"❌ Read error: {result}")
                     else:
                         current_mode = result.registers[0]
-                        mode_map = {1: "Eco", 2: "Hybrid", 4: "E-Heater"}
-                        mode_name = mode_map.get(current_mode, "Other")
+                        mode_name = mode_label(current_mode)
                         print(f"📖 Current mode: {current_mode} ({mode_name})")
                 except Exception as e:
                     print(f"❌ Exception reading mode: {e}")
@@ -162,8 +217,7 @@ def test_operating_modes(client):
                         actual_value = read_result.registers[0]
                         if actual_value == test_value:
                             print(f"✅ Verified: Mode is now {actual_value}")
-                            mode_map = {1: "Eco", 2: "Hybrid", 4: "E-Heater"}
-                            if actual_value not in mode_map:
+                            if CODEC.mode(actual_value) is None:
                                 print(f"🎉 NEW MODE DISCOVERED: {actual_value}")
                                 print("   Please check your heat pump display and document what this mode does!")
                         else:
@@ -223,8 +277,130 @@ def get_known_register_info(address):
             return reg
     return None
 
-def scan_modbus_registers(client, start_reg=0, end_reg=255):
-    """Scan a range of Modbus registers to discover available data"""
+def describe_register(address, raw_value, use_known=True):
+    """Return (display name, notes, is_known) for a scanned register"""
+    # Check if this is a known register (the known map is holding registers)
+    known_reg = get_known_register_info(address) if use_known else None
+
+    if known_reg:
+        # This is a known register - show the known name
+        return known_reg["name"], known_reg["description"], True
+
+    # Unknown register - try temperature interpretations
+    valid_temps = []
+    temp_details = []
+    for name, scale, offset, (min_temp, max_temp) in TEMP_FORMULAS:
+        calc_temp = decode.scale_value(raw_value, scale, offset)
+        if min_temp <= calc_temp <= max_temp:
+            valid_temps.append(f"{calc_temp:.1f}°C")
+            temp_details.append(f"{name}: {calc_temp:.1f}°C")
+
+    if valid_temps:
+        # Show possible temperature values
+        display_name = "/".join(valid_temps[:3])  # Show max 3 interpretations
+        notes = f"Possible temperature formulas: {', '.join(temp_details)}"
+    else:
+        # Not a temperature - classify the value
+        if raw_value == 0:
+            display_name = "Zero"
+            notes = "Could be Off/Disabled state"
+        elif raw_value == 1:
+            display_name = "Boolean"
+            notes = "Could be On/Enabled state"
+        elif 1 < raw_value <= 10:
+            display_name = f"Mode {raw_value}"
+            notes = "Could be operating mode or status code"
+        elif raw_value > 1000:
+            display_name = "Large value"
+            notes = f"Large numeric value - could be counter, timestamp, or scaled measurement"
+        else:
+            display_name = f"Value {raw_value}"
+            notes = "Unknown purpose - monitor for changes during operation"
+    return display_name, notes, False
+
+def bisection_steps(start, end, values):
+    """Find the readable registers of a block the device rejected
+
+    Devices reject a block read if any register in it is unmapped. From each
+    readable register the run is grown by doubling the block size, then the
+    first unmapped register is found by bisection, so a readable run of n
+    registers costs about 2·log2(n) requests instead of n. end is exclusive.
+
+    A generator so sync and async scans share it: it yields (address, count)
+    reads and is sent back the values, or None if the read failed.
+    """
+    address = start
+    while address < end:
+        first = yield address, 1
+        if first is None:
+            address += 1
+            continue
+
+        good, run, bad = 1, first, None
+        while good < end - address:
+            size = min(good * 2, end - address)
+            block = yield address, size
+            if block is None:
+                bad = size
+                break
+            good, run = size, block
+        if bad is not None:
+            while bad - good > 1:
+                size = (good + bad) // 2
+                block = yield address, size
+                if block is None:
+                    bad = size
+                else:
+                    good, run = size, block
+
+        values.update(zip(range(address, address + good), run))
+        # read(address, good + 1) failed, so address + good is unmapped
+        address += good + (1 if bad is not None else 0)
+
+def bisect_failed_block(read, start, end, values):
+    """Run bisection_steps() with a blocking read(address, count)"""
+    steps = bisection_steps(start, end, values)
+    try:
+        request = next(steps)
+        while True:
+            request = steps.send(read(*request))
+    except StopIteration:
+        pass
+
+def read_register_map(client, start_reg, end_reg, block_size=MAX_BLOCK_SIZE, progress=None):
+    """Read every readable holding register in a range using block reads
+
+    Returns ({address: raw value}, requests sent). Blocks the device rejects
+    are bisected into their readable runs; block_size=1 reads one register
+    per request.
+    """
+    requests = 0
+
+    def read(address, count):
+        nonlocal requests
+        requests += 1
+        try:
+            result = client.read_holding_registers(address=address, count=count)
+        except Exception:
+            return None
+        if result.isError():
+            return None
+        return result.registers
+
+    values = {}
+    for block_start in range(start_reg, end_reg + 1, block_size):
+        count = min(block_size, end_reg + 1 - block_start)
+        block = read(block_start, count)
+        if block is not None:
+            values.update(zip(range(block_start, block_start + count), block))
+        elif count > 1:
+            bisect_failed_block(read, block_start, block_start + count, values)
+        if progress:
+            progress(block_start + count - start_reg, len(values), requests)
+    return values, requests
+
+def scan_modbus_registers(client, start_reg=0, end_reg=255, block_size=MAX_BLOCK_SIZE):
+    """Scan a range of Modbus registers to discover available data, return {address: raw value}"""
     print("\n" + "="*94)
     print("🔍 MODBUS REGISTER SCAN MODE")
     print("="*94)
@@ -233,7 +409,6 @@ def scan_modbus_registers(client, start_reg=0, end_reg=255):
     print("-"*94)
     
     successful_reads = []
-    failed_count = 0
     total_registers = end_reg - start_reg + 1
     
     print(f"{'Register':<10} {'Raw Value':<12} {'Hex':<8} {'Name/Temps':<25}     {'Notes'}")
@@ -241,87 +416,37 @@ def scan_modbus_registers(client, start_reg=0, end_reg=255):
     
     # Progress tracking
     progress_interval = max(1, total_registers // 20)  # Show progress every 5%
-    
-    for i, reg_addr in enumerate(range(start_reg, end_reg + 1)):
+    shown = [0]
+
+    def show_progress(done, found, requests):
         # Show progress for large scans
-        if total_registers > 50 and (i % progress_interval == 0 or i == total_registers - 1):
-            progress = (i + 1) / total_registers * 100
-            print(f"Progress: {progress:.0f}% ({i+1}/{total_registers} registers)", end='\r', flush=True)
-        
-        try:
-            result = client.read_holding_registers(address=reg_addr, count=1)
-            
-            if result.isError():
-                failed_count += 1
-                continue
-                
-            raw_value = result.registers[0]
-            hex_value = f"0x{raw_value:04X}"
-            
-            # Check if this is a known register
-            known_reg = get_known_register_info(reg_addr)
-            
-            if known_reg:
-                # This is a known register - show the known name
-                display_name = known_reg["name"]
-                notes = known_reg["description"]
-            else:
-                # Unknown register - try temperature interpretations
-                temp_formulas = [
-                    {"name": "Raw", "calc": raw_value, "range": (0, 150)},
-                    {"name": "Scale+Offset", "calc": (raw_value * 0.5) - 15, "range": (-20, 120)},
-                    {"name": "Scale×0.1", "calc": raw_value * 0.1, "range": (0, 150)},
-                    {"name": "Offset-40", "calc": raw_value - 40, "range": (-40, 100)},
-                ]
-                
-                # Find valid temperature interpretations
-                valid_temps = []
-                temp_details = []
-                for formula in temp_formulas:
-                    calc_temp = formula["calc"]
-                    min_temp, max_temp = formula["range"]
-                    if min_temp <= calc_temp <= max_temp:
-                        valid_temps.append(f"{calc_temp:.1f}°C")
-                        temp_details.append(f"{formula['name']}: {calc_temp:.1f}°C")
-                
-                if valid_temps:
-                    # Show possible temperature values
-                    display_name = "/".join(valid_temps[:3])  # Show max 3 interpretations
-                    notes = f"Possible temperature formulas: {', '.join(temp_details)}"
-                else:
-                    # Not a temperature - classify the value
-                    if raw_value == 0:
-                        display_name = "Zero"
-                        notes = "Could be Off/Disabled state"
-                    elif raw_value == 1:
-                        display_name = "Boolean"
-                        notes = "Could be On/Enabled state" 
-                    elif 1 < raw_value <= 10:
-                        display_name = f"Mode {raw_value}"
-                        notes = "Could be operating mode or status code"
-                    elif raw_value > 1000:
-                        display_name = "Large value"
-                        notes = f"Large numeric value - could be counter, timestamp, or scaled measurement"
-                    else:
-                        display_name = f"Value {raw_value}"
-                        notes = "Unknown purpose - monitor for changes during operation"
-            
-            # Clear progress line and show result
-            if total_registers > 50:
-                print(' ' * 64, end='\r')  # Clear progress line
-            print(f"{reg_addr:<10} {raw_value:<12} {hex_value:<8} {display_name:<25}     {notes}")
-            
-            successful_reads.append({
-                'address': reg_addr,
-                'raw_value': raw_value,
-                'is_known': known_reg is not None,
-                'display_name': display_name,
-                'notes': notes
-            })
-            
-        except Exception as e:
-            failed_count += 1
-            continue
+        if total_registers > 50 and (done - shown[0] >= progress_interval or done == total_registers):
+            shown[0] = done
+            progress = done / total_registers * 100
+            print(f"Progress: {progress:.0f}% ({done}/{total_registers} registers, {requests} requests)", end='\r', flush=True)
+
+    start_time = time.monotonic()
+    values, requests = read_register_map(client, start_reg, end_reg, block_size, show_progress)
+    elapsed = time.monotonic() - start_time
+    failed_count = total_registers - len(values)
+
+    # Clear progress line
+    if total_registers > 50:
+        print(' ' * 80, end='\r')
+
+    for reg_addr in sorted(values):
+        raw_value = values[reg_addr]
+        hex_value = f"0x{raw_value:04X}"
+        display_name, notes, is_known = describe_register(reg_addr, raw_value)
+        print(f"{reg_addr:<10} {raw_value:<12} {hex_value:<8} {display_name:<25}     {notes}")
+
+        successful_reads.append({
+            'address': reg_addr,
+            'raw_value': raw_value,
+            'is_known': is_known,
+            'display_name': display_name,
+            'notes': notes
+        })
     
     # Summary
     print("-"*94)
@@ -330,6 +455,7 @@ def scan_modbus_registers(client, start_reg=0, end_reg=255):
     print(f"Successful reads: {len(successful_reads)}")
     print(f"Failed/unreadable registers: {failed_count}")
     print(f"Success rate: {len(successful_reads)/total_registers*100:.1f}%")
+    print(f"Requests sent: {requests} (block size {block_size}) in {elapsed:.1f}s")
     
     if successful_reads:
         # Analyze results
@@ -377,6 +503,8 @@ def scan_modbus_registers(client, start_reg=0, end_reg=255):
         print("- Compare calculated temperatures with your heat pump's display")
         print("- Monitor unknown registers during heat pump operation to understand their purpose")
         print("- Consecutive register blocks often contain related sensor data")
+        print("- Use --make-profile FILE to turn this scan into a draft profile")
+    return values
 
 def get_scan_range():
     """Get register range from user input"""
@@ -418,7 +546,660 @@ def get_scan_range():
         print("\n❌ Scan cancelled")
         return None, None
 
-def read_water_heater_registers(host, port, slave_id=1, test_mode=False, map_mode=False):
+def parse_units(text):
+    """Parse a unit id list like '1,2,5-7'"""
+    units = set()
+    for part in text.split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            units.update(range(int(first), int(last) + 1))
+        elif part.strip():
+            units.add(int(part))
+    return sorted(units)
+
+class AsyncScan:
+    """Concurrent scan of several tables and unit ids over a pool of connections"""
+
+    def __init__(self, host, port, units, tables, start_reg, end_reg, block_size, in_flight, timeout):
+        self.host = host
+        self.port = port
+        self.units = units
+        self.tables = tables
+        self.start_reg = start_reg
+        self.end_reg = end_reg
+        self.block_size = block_size
+        self.in_flight = in_flight
+        self.timeout = timeout
+        self.values = {}  # (unit, table, address) -> raw value
+        self.requests = 0
+        self.scanned = 0
+        self.unsupported = set()  # (unit, table) answering Illegal Function
+        self.unreachable = set()  # units given up on after consecutive timeouts
+        self.timeouts = {}  # unit -> timeouts since its last answer
+        self.started = None
+
+    @property
+    def total(self):
+        return len(self.units) * len(self.tables) * (self.end_reg - self.start_reg + 1)
+
+    def blocks(self):
+        """Yield (unit, table, start, count) work items in address order"""
+        for unit in self.units:
+            for table in self.tables:
+                size = min(self.block_size * 16, MAX_BIT_BLOCK_SIZE) if SCAN_TABLES[table][2] else self.block_size
+                for block_start in range(self.start_reg, self.end_reg + 1, size):
+                    yield unit, table, block_start, min(size, self.end_reg + 1 - block_start)
+
+    async def connect(self):
+        """Open up to in_flight connections, as many as the gateway accepts"""
+        clients = []
+        for _ in range(self.in_flight):
+            client = AsyncModbusTcpClient(host=self.host, port=self.port, timeout=self.timeout, retries=0)
+            if not await client.connect():
+                client.close()
+                break
+            clients.append(client)
+        return clients
+
+    async def read(self, client, unit, table, address, count):
+        """Read one block, return its values or None if the device rejected it"""
+        self.requests += 1
+        if not client.connected and not await client.connect():
+            return None
+        method = getattr(client, SCAN_TABLES[table][1])
+        try:
+            result = await method(address=address, count=count, device_id=unit)
+        except (asyncio.TimeoutError, ModbusIOException):
+            # A unit timing out again and again: nothing at this id
+            self.timeouts[unit] = self.timeouts.get(unit, 0) + 1
+            if self.timeouts[unit] >= UNREACHABLE_TIMEOUTS:
+                self.unreachable.add(unit)
+            return None
+        except Exception:
+            return None
+        self.timeouts[unit] = 0
+        self.unreachable.discard(unit)
+        if result.isError():
+            if getattr(result, "exception_code", None) == ILLEGAL_FUNCTION:
+                self.unsupported.add((unit, table))
+            return None
+        if SCAN_TABLES[table][2]:
+            return [int(bit) for bit in result.bits[:count]]
+        return result.registers
+
+    async def scan_block(self, client, unit, table, block_start, count):
+        values = {}
+        block = await self.read(client, unit, table, block_start, count)
+        if block is not None:
+            values.update(zip(range(block_start, block_start + count), block))
+        elif count > 1 and (unit, table) not in self.unsupported and unit not in self.unreachable:
+            steps = bisection_steps(block_start, block_start + count, values)
+            try:
+                request = next(steps)
+                # Stop splitting once the unit is given up on
+                while unit not in self.unreachable:
+                    request = steps.send(await self.read(client, unit, table, *request))
+            except StopIteration:
+                pass
+        for address, value in values.items():
+            self.values[(unit, table, address)] = value
+
+    async def worker(self, client, work):
+        for unit, table, block_start, count in work:
+            if unit not in self.unreachable and (unit, table) not in self.unsupported:
+                await self.scan_block(client, unit, table, block_start, count)
+            self.scanned += count
+
+    async def report_progress(self):
+        while True:
+            await asyncio.sleep(0.5)
+            self.print_progress()
+
+    def print_progress(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.scanned / elapsed if elapsed else 0
+        print(f"Progress: {self.scanned / self.total * 100:.0f}% ({self.scanned}/{self.total} addresses, "
+              f"{len(self.values)} readable, {self.requests} requests, {rate:.0f} registers/s)   ",
+              end='\r', flush=True)
+
+    async def run(self):
+        clients = await self.connect()
+        if not clients:
+            print("❌ Failed to connect to water heater")
+            return False
+        if len(clients) < self.in_flight:
+            print(f"⚠️  Gateway accepted {len(clients)} of {self.in_flight} connections, scanning with {len(clients)} in flight")
+
+        # Workers share one iterator, so each block is read exactly once
+        work = iter(list(self.blocks()))
+        self.started = time.monotonic()
+        progress = asyncio.create_task(self.report_progress())
+        try:
+            await asyncio.gather(*(self.worker(client, work) for client in clients))
+        finally:
+            progress.cancel()
+            for client in clients:
+                client.close()
+        self.print_progress()
+        print()
+        return True
+
+def async_scan(host, port, units, tables, start_reg, end_reg, block_size=MAX_BLOCK_SIZE, in_flight=1, timeout=1.0,
+               make_profile=None):
+    """Scan several tables and unit ids concurrently and print one merged report"""
+    print("\n" + "="*94)
+    print("⚡ ASYNC MODBUS SCAN MODE")
+    print("="*94)
+    table_names = ", ".join(SCAN_TABLES[table][0] for table in tables)
+    print(f"Scanning {table_names} {start_reg}-{end_reg} on unit(s) {', '.join(map(str, units))} "
+          f"with up to {in_flight} request(s) in flight...")
+    print("-"*94)
+
+    # Timeouts from absent unit ids are expected, keep pymodbus quiet about them
+    logging.getLogger("pymodbus").setLevel(logging.CRITICAL)
+    scan = AsyncScan(host, port, units, tables, start_reg, end_reg, block_size, in_flight, timeout)
+    if not asyncio.run(scan.run()):
+        return False
+    elapsed = time.monotonic() - scan.started
+
+    print(f"{'Unit':<6} {'Table':<10} {'Address':<9} {'Raw Value':<12} {'Hex':<8} {'Name/Temps':<25}     {'Notes'}")
+    print("-"*94)
+    table_order = list(SCAN_TABLES)
+    for unit, table, address in sorted(scan.values, key=lambda key: (key[0], table_order.index(key[1]), key[2])):
+        raw_value = scan.values[(unit, table, address)]
+        if SCAN_TABLES[table][2]:
+            display_name, notes = ("ON" if raw_value else "OFF"), "Bit"
+        else:
+            display_name, notes, _ = describe_register(address, raw_value, use_known=table == "hr")
+        print(f"{unit:<6} {SCAN_TABLES[table][0]:<10} {address:<9} {raw_value:<12} {f'0x{raw_value:04X}':<8} "
+              f"{display_name:<25}     {notes}")
+
+    print("-"*94)
+    print(f"📊 SCAN SUMMARY")
+    for unit in units:
+        if unit in scan.unreachable:
+            print(f"Unit {unit}: no response")
+            continue
+        counts = []
+        for table in tables:
+            if (unit, table) in scan.unsupported:
+                counts.append(f"{SCAN_TABLES[table][0]}: not supported")
+            else:
+                found = sum(1 for key in scan.values if key[0] == unit and key[1] == table)
+                counts.append(f"{SCAN_TABLES[table][0]}: {found}")
+        print(f"Unit {unit}: {', '.join(counts)}")
+    print(f"Requests sent: {scan.requests} in {elapsed:.1f}s "
+          f"({scan.total / elapsed if elapsed else 0:.0f} registers/s)")
+
+    if make_profile:
+        # Profiles describe holding registers of one unit: the first that has any
+        unit = next((unit for unit in units if any(key[:2] == (unit, "hr") for key in scan.values)), None)
+        values = {address: value for (key_unit, table, address), value in scan.values.items()
+                  if key_unit == unit and table == "hr"}
+        write_draft_profile(make_profile, snapshot_observations(values), unit, port)
+    return True
+
+def parse_ranges(text):
+    """Parse register ranges like '0-10,100-120', split into readable blocks"""
+    ranges = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        first = int(first)
+        last = int(last) if last else first
+        if not 0 <= first <= last <= 65535:
+            raise ValueError(f"Invalid range '{part}'")
+        for start in range(first, last + 1, MAX_BLOCK_SIZE):
+            ranges.append((start, min(MAX_BLOCK_SIZE, last + 1 - start)))
+    if not ranges or len(ranges) > CAPTURE_MAX_RANGES:
+        raise ValueError(f"Between 1 and {CAPTURE_MAX_RANGES} blocks of up to {MAX_BLOCK_SIZE} registers")
+    return ranges
+
+def capture_header(unit, ranges):
+    header = CAPTURE_MAGIC + struct.pack(CAPTURE_HEADER, unit, len(ranges))
+    for start, count in ranges:
+        header += struct.pack(CAPTURE_RANGE, start, count)
+    return header
+
+def read_capture_header(data):
+    """Return (unit, ranges, header length) of a capture file's contents"""
+    if data[:len(CAPTURE_MAGIC)] != CAPTURE_MAGIC:
+        raise ValueError("Not a capture file")
+    offset = len(CAPTURE_MAGIC)
+    unit, range_count = struct.unpack_from(CAPTURE_HEADER, data, offset)
+    offset += struct.calcsize(CAPTURE_HEADER)
+    ranges = []
+    for _ in range(range_count):
+        ranges.append(struct.unpack_from(CAPTURE_RANGE, data, offset))
+        offset += struct.calcsize(CAPTURE_RANGE)
+    return unit, ranges, offset
+
+def record_format(ranges):
+    return f"<dI{sum(count for _, count in ranges)}H"
+
+def capture_registers(host, port, slave_id, path, ranges, interval=1.0, duration=None):
+    """Block-read ranges at a fixed rate, append samples to a file and print changes"""
+    addresses = [address for start, count in ranges for address in range(start, start + count)]
+    header = capture_header(slave_id, ranges)
+    fmt = record_format(ranges)
+
+    if os.path.exists(path) and os.path.getsize(path):
+        with open(path, "rb") as f:
+            existing = f.read(len(header))
+        if existing != header:
+            print(f"❌ {path} holds a capture of other ranges or another unit, use a new file")
+            return False
+
+    print(f"📼 Capturing {len(addresses)} registers ({', '.join(f'{s}-{s + c - 1}' for s, c in ranges)}) "
+          f"of unit {slave_id} every {interval}s to {path}")
+    print("   Only changes are printed, press Ctrl+C to stop")
+    print("-" * 85)
+
+    client = ModbusTcpClient(host=host, port=port)
+    if not client.connect():
+        print("❌ Failed to connect to water heater")
+        return False
+
+    samples = 0
+    previous = {}
+    last_failed = 0
+    started = time.monotonic()
+    next_sample = started
+    try:
+        with open(path, "ab") as f:
+            if f.tell() == 0:
+                f.write(header)
+            while duration is None or time.monotonic() - started < duration:
+                timestamp = time.time()
+                values = []
+                failed = 0
+                for index, (start, count) in enumerate(ranges):
+                    try:
+                        result = client.read_holding_registers(address=start, count=count, device_id=slave_id)
+                    except Exception:
+                        result = None
+                    if result is None or result.isError():
+                        failed |= 1 << index
+                        values.extend([0] * count)
+                    else:
+                        values.extend(result.registers)
+                f.write(struct.pack(fmt, timestamp, failed, *values))
+                f.flush()
+                samples += 1
+
+                stamp = datetime.fromtimestamp(timestamp).strftime("%H:%M:%S.%f")[:-3]
+                if failed != last_failed:
+                    blocks = [f"{s}-{s + c - 1}" for index, (s, c) in enumerate(ranges) if failed & (1 << index)]
+                    if blocks:
+                        print(f"{stamp}  ⚠️  Block read(s) failing: {', '.join(blocks)} "
+                              "(use map mode -m to find the readable ranges)")
+                    else:
+                        print(f"{stamp}  ✅ All blocks readable again")
+                    last_failed = failed
+                position = 0
+                for index, (start, count) in enumerate(ranges):
+                    if not failed & (1 << index):
+                        for address, value in zip(range(start, start + count), values[position:position + count]):
+                            old = previous.get(address)
+                            if old is not None and old != value:
+                                print(f"{stamp}  Register {address:<6} {old:>6} → {value:<6} (0x{old:04X} → 0x{value:04X})")
+                            previous[address] = value
+                    position += count
+                if samples == 1:
+                    print(f"{stamp}  📸 Baseline of {len(previous)} registers recorded")
+
+                next_sample += interval
+                delay = next_sample - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Reads took longer than the interval: don't try to catch up
+                    next_sample = time.monotonic()
+    except KeyboardInterrupt:
+        print("\n⏹️  Capture stopped")
+    finally:
+        client.close()
+
+    elapsed = time.monotonic() - started
+    print(f"📊 {samples} samples in {elapsed:.1f}s appended to {path}")
+    return True
+
+def _capture_stats_numpy(path, ranges, header_length, reference):
+    """Per-register statistics from a memory-mapped capture (numpy)"""
+    columns = sum(count for _, count in ranges)
+    dtype = np.dtype([("time", "<f8"), ("failed", "<u4"), ("values", "<u2", (columns,))])
+    records = (os.path.getsize(path) - header_length) // dtype.itemsize
+    data = np.memmap(path, dtype=dtype, mode="r", offset=header_length, shape=(records,))
+
+    column_range = np.repeat(np.arange(len(ranges)), [count for _, count in ranges])
+    valid = ((data["failed"][:, None] >> column_range[None, :]) & 1) == 0
+    values = np.where(valid, data["values"], np.nan)
+    changes = ((np.diff(values, axis=0) != 0) & valid[1:] & valid[:-1]).sum(axis=0)
+
+    stats = []
+    for column in range(columns):
+        column_values = values[valid[:, column], column]
+        unique = np.unique(column_values)
+        stats.append({
+            "samples": len(column_values),
+            "min": int(column_values.min()) if len(column_values) else None,
+            "max": int(column_values.max()) if len(column_values) else None,
+            "variance": float(column_values.var()) if len(column_values) else 0.0,
+            "changes": int(changes[column]),
+            "distinct": [int(value) for value in unique] if len(unique) <= PROFILE_MAX_DISTINCT else None,
+        })
+    if reference is not None:
+        for column in range(columns):
+            both = valid[:, column] & valid[:, reference]
+            x, y = values[both, column], values[both, reference]
+            stats[column]["correlation"] = (
+                float(np.corrcoef(x, y)[0, 1]) if len(x) > 1 and x.std() and y.std() else None
+            )
+    return len(data), float(data["time"][0]) if len(data) else None, float(data["time"][-1]) if len(data) else None, stats
+
+def _capture_stats_python(path, ranges, header_length, reference):
+    """Per-register statistics from a memory-mapped capture (no numpy)"""
+    fmt = record_format(ranges)
+    size = struct.calcsize(fmt)
+    columns = sum(count for _, count in ranges)
+    column_range = [index for index, (_, count) in enumerate(ranges) for _ in range(count)]
+    series = [[] for _ in range(columns)]
+    records = 0
+    first_time = last_time = None
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        records = (len(mm) - header_length) // size
+        body = memoryview(mm)[header_length:header_length + records * size]
+        for record in struct.iter_unpack(fmt, body):
+            timestamp, failed = record[0], record[1]
+            first_time = timestamp if first_time is None else first_time
+            last_time = timestamp
+            for column in range(columns):
+                series[column].append(None if failed >> column_range[column] & 1 else record[2 + column])
+        body.release()
+
+    stats = []
+    for column in range(columns):
+        column_values = [value for value in series[column] if value is not None]
+        pairs = zip(series[column], series[column][1:])
+        unique = sorted(set(column_values))
+        stats.append({
+            "samples": len(column_values),
+            "min": min(column_values) if column_values else None,
+            "max": max(column_values) if column_values else None,
+            "variance": statistics.pvariance(column_values) if len(column_values) > 1 else 0.0,
+            "changes": sum(1 for a, b in pairs if a is not None and b is not None and a != b),
+            "distinct": unique if len(unique) <= PROFILE_MAX_DISTINCT else None,
+        })
+    if reference is not None:
+        for column in range(columns):
+            both = [(x, y) for x, y in zip(series[column], series[reference]) if x is not None and y is not None]
+            try:
+                correlation = statistics.correlation([x for x, _ in both], [y for _, y in both])
+            except (statistics.StatisticsError, ValueError):
+                correlation = None  # Fewer than two samples or a constant register
+            stats[column]["correlation"] = correlation
+    return records, first_time, last_time, stats
+
+def analyze_capture(path, by="variance", reference=None, top=20, make_profile=None, port=502):
+    """Rank the registers of a capture by variance or by correlation with a reference register"""
+    with open(path, "rb") as f:
+        head = f.read(len(CAPTURE_MAGIC) + struct.calcsize(CAPTURE_HEADER) + CAPTURE_MAX_RANGES * struct.calcsize(CAPTURE_RANGE))
+    try:
+        unit, ranges, header_length = read_capture_header(head)
+    except (ValueError, struct.error) as e:
+        print(f"❌ {path}: {e}")
+        return False
+    addresses = [address for start, count in ranges for address in range(start, start + count)]
+
+    reference_column = None
+    if by == "correlation":
+        if reference not in addresses:
+            print(f"❌ Reference register {reference} is not in the capture")
+            return False
+        reference_column = addresses.index(reference)
+
+    loader = _capture_stats_numpy if np is not None else _capture_stats_python
+    records, first_time, last_time, stats = loader(path, ranges, header_length, reference_column)
+    if not records:
+        print(f"❌ {path} holds no samples")
+        return False
+
+    print(f"📼 {path}: unit {unit}, {len(addresses)} registers, {records} samples "
+          f"over {last_time - first_time:.0f}s{'' if np is not None else ' (install numpy for faster analysis)'}")
+    print("-" * 85)
+
+    rows = [(address, stat) for address, stat in zip(addresses, stats) if stat["samples"]]
+    if by == "correlation":
+        rows = [row for row in rows if row[1]["correlation"] is not None and row[0] != reference]
+        rows.sort(key=lambda row: -abs(row[1]["correlation"]))
+        print(f"Registers ranked by correlation with register {reference}:")
+    else:
+        rows = [row for row in rows if row[1]["changes"]]
+        rows.sort(key=lambda row: (-row[1]["variance"], -row[1]["changes"]))
+        print("Registers ranked by variance (constant registers are left out):")
+    print(f"{'Register':<10} {'Min':>7} {'Max':>7} {'Variance':>10} {'Changes':>8} {'Corr.':>7}")
+    print("-" * 85)
+    for address, stat in rows[:top]:
+        correlation = stat.get("correlation")
+        print(f"{address:<10} {stat['min']:>7.0f} {stat['max']:>7.0f} {stat['variance']:>10.2f} "
+              f"{stat['changes']:>8} {'' if correlation is None else f'{correlation:+.2f}':>7}")
+    if not rows:
+        print("No register changed during the capture")
+
+    if make_profile:
+        observations = {address: stat for address, stat in zip(addresses, stats) if stat["samples"]}
+        write_draft_profile(make_profile, observations, unit, port)
+    return True
+
+def snapshot_observations(values):
+    """Observations for draft_profile() from one scan ({address: raw value})"""
+    return {address: {"min": value, "max": value, "changes": 0, "distinct": [value]} for address, value in values.items()}
+
+def readable_runs(addresses):
+    """Group addresses into (start, count) runs of consecutive registers
+
+    Devices that reject blocks touching unmapped registers accept any block
+    inside a run, so runs bound the block reads of a profile.
+    """
+    runs = []
+    for address in sorted(addresses):
+        if runs and address == runs[-1][0] + runs[-1][1]:
+            runs[-1][1] += 1
+        else:
+            runs.append([address, 1])
+    return [tuple(run) for run in runs]
+
+def _sensor_formula(candidates, observations, target):
+    """Pick the temperature formula under which most candidates are plausible sensors
+
+    Ties go to the formula that puts a sensor closest to the set point (the
+    tank is heated towards it). Returns (formula, plausible addresses).
+    """
+    low, high = PROFILE_SENSOR_RANGE
+    best = None
+    for formula in TEMP_FORMULAS:
+        _, scale, offset, _ = formula
+        plausible = [
+            address for address in candidates
+            if low <= observations[address]["min"] * scale + offset
+            and observations[address]["max"] * scale + offset <= high
+        ]
+        distance = 0
+        if target is not None and plausible:
+            distance = min(
+                abs((observations[address]["min"] + observations[address]["max"]) / 2 * scale + offset - target)
+                for address in plausible
+            )
+        score = (len(plausible), -distance)
+        if best is None or score > best[0]:
+            best = (score, formula, plausible)
+    return best[1], best[2]
+
+def draft_profile(observations, unit, port, name):
+    """Infer a draft profile (models/defaults schema) from scanned or captured registers
+
+    observations maps address -> {min, max, changes, distinct} of a holding
+    register (distinct is None for registers with many values). Returns
+    (profile, findings), findings being the guesses that need checking.
+    """
+    findings = []
+    addresses = sorted(observations)
+    runs = readable_runs(addresses)
+
+    def run_of(address):
+        return next(index for index, (start, count) in enumerate(runs) if start <= address < start + count)
+
+    def is_flag(address):
+        return observations[address]["max"] <= 1
+
+    def is_enumerated(address):
+        obs = observations[address]
+        return obs["distinct"] is not None and 1 <= obs["min"] and obs["max"] <= 10
+
+    # Control registers: an on/off flag, then an enumerated mode, a set point
+    # and further flags in the same run
+    power = next((address for address in addresses if is_flag(address)), None)
+    control_run = run_of(power) if power is not None else None
+    mode = next((address for address in addresses if address != power and is_enumerated(address)
+                 and control_run in (None, run_of(address))), None)
+    if control_run is None and mode is not None:
+        control_run = run_of(mode)
+    used = {address for address in (power, mode) if address is not None}
+    target = next((address for address in addresses if address not in used and run_of(address) == control_run
+                   and PROFILE_TARGET_RANGE[0] <= observations[address]["min"]
+                   and observations[address]["max"] <= PROFILE_TARGET_RANGE[1]), None)
+    used.add(target)
+    sterilize = next((address for address in addresses if address not in used and run_of(address) == control_run
+                      and is_flag(address)), None)
+    used.add(sterilize)
+
+    control = {}
+    for key, address, default in (("power", power, 0), ("mode", mode, 1), ("target_temp", target, 2), ("sterilize", sterilize, 3)):
+        if address is None:
+            findings.append(f"No {key} register found, using the Midea default {default}")
+            address = default
+        control[key] = address
+        used.add(address)
+
+    # Temperature sensors: readings above 1 outside the control run, in address order
+    target_value = observations[target]["max"] if target is not None else None
+    candidates = [address for address in addresses if address not in used
+                  and run_of(address) != control_run and observations[address]["min"] > 1]
+    formula, plausible = _sensor_formula(candidates, observations, target_value)
+    sensors = dict(zip(PROFILE_SENSOR_KEYS, plausible))
+    for key in PROFILE_SENSOR_KEYS[len(sensors):]:
+        findings.append(f"No register left for {key}, set it or leave it empty")
+    if len(plausible) > len(PROFILE_SENSOR_KEYS):
+        findings.append(f"{len(plausible) - len(PROFILE_SENSOR_KEYS)} more plausible temperature register(s): "
+                        f"{', '.join(map(str, plausible[len(PROFILE_SENSOR_KEYS):]))}")
+    if sensors:
+        findings.append("Sensor names follow address order (Midea layout), compare the readings with the heater's display")
+    used.update(sensors.values())
+    current = sensors.get("tank_bottom_temp", next(iter(sensors.values()), None))
+
+    # Mode values: keep the Midea values unless the capture saw others
+    mode_values = dict(decode.DEFAULT_MODE_VALUES)
+    seen = observations[mode]["distinct"] if mode in observations else None
+    if seen and set(seen) - set(mode_values.values()) and len(seen) <= len(mode_values):
+        mode_values = dict(zip(mode_values, seen))
+        findings.append(f"Mode values guessed from the values seen ({', '.join(map(str, seen))}), check them with -t")
+    elif not seen or len(seen) < 2:
+        findings.append("Mode values are the Midea defaults, capture (-c) while switching modes or check them with -t")
+
+    # Diagnostic candidates: enumerated registers that are not mapped yet,
+    # the ones that changed most first
+    diagnostics = {}
+    rest = [address for address in addresses if address not in used and observations[address]["distinct"] is not None]
+    rest.sort(key=lambda address: (-observations[address]["changes"], address))
+    for address in rest[:12]:
+        obs = observations[address]
+        values = ", ".join(map(str, obs["distinct"]))
+        if obs["changes"]:
+            diagnostics[f"{address}_candidate"] = f"Values {values} seen, changed {obs['changes']} time(s)"
+        else:
+            diagnostics[f"{address}_candidate"] = f"Constant {values}, capture (-c) it while the heater changes state"
+
+    # Polling blocks: the span of the mapped registers within each readable run
+    mapped = set(control.values()) | set(sensors.values())
+    blocks = []
+    for start, count in runs:
+        members = [address for address in mapped if start <= address < start + count]
+        if members:
+            first, last = min(members), max(members)
+            for block_start in range(first, last + 1, MAX_BLOCK_SIZE):
+                blocks.append([block_start, min(MAX_BLOCK_SIZE, last + 1 - block_start)])
+
+    _, scale, offset, _ = formula
+    target_default = target_value if target_value is not None and 35 <= target_value <= 75 else 65
+    profile = {
+        "name": name,
+        "model": "Unknown",
+        "manufacturer": "Unknown",
+        "version": "1.0",
+        "description": "Draft generated by modbus_test.py, verify before use",
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "author": "modbus_test.py",
+        "connection": {"port": port, "modbus_unit": unit, "scan_interval": 60},
+        "registers": {
+            **control,
+            "current_temp": current,
+            **{key: sensors.get(key) for key in PROFILE_SENSOR_KEYS},
+        },
+        "mode_values": mode_values,
+        "scaling": {
+            "current_temp": {"offset": float(offset), "scale": float(scale)},
+            "target_temp": {"offset": 0.0, "scale": 1.0},
+            "sensors": {"offset": float(offset), "scale": float(scale)},
+        },
+        "temp_limits": {
+            "eco": {"min": 60, "max": 65},
+            "performance": {"min": 60, "max": 70},
+            "electric": {"min": 60, "max": 70},
+        },
+        "defaults": {"target_temperature": target_default, "enable_additional_sensors": bool(sensors)},
+        "polling": {"blocks": blocks},
+        "notes": {"draft": findings, "diagnostic_registers": diagnostics},
+    }
+    return profile, findings
+
+def write_draft_profile(path, observations, unit, port):
+    """Write a draft profile for the scanned registers and print what was inferred"""
+    if not observations:
+        print("❌ No readable holding registers, no profile written")
+        return False
+    name = os.path.splitext(os.path.basename(path))[0].replace("_", " ").replace("-", " ").title()
+    profile, findings = draft_profile(observations, unit, port, f"{name} (draft)")
+    with open(path, "w") as f:
+        json.dump(profile, f, indent=2, ensure_ascii=False)
+
+    registers = profile["registers"]
+    scaling = profile["scaling"]["sensors"]
+    print(f"\n📝 Draft profile written to {path}")
+    print(f"   Control: power {registers['power']}, mode {registers['mode']}, "
+          f"target {registers['target_temp']}, sterilize {registers['sterilize']}")
+    sensors = [(key, registers[key]) for key in PROFILE_SENSOR_KEYS if registers[key] is not None]
+    if sensors:
+        print(f"   Sensors (raw × {scaling['scale']} {scaling['offset']:+}):")
+        for key, address in sensors:
+            obs = observations[address]
+            low = obs["min"] * scaling["scale"] + scaling["offset"]
+            high = obs["max"] * scaling["scale"] + scaling["offset"]
+            reading = f"{low:.1f}°C" if low == high else f"{low:.1f}..{high:.1f}°C"
+            print(f"     {key:<18} register {address:<6} {reading}")
+    blocks = profile["polling"]["blocks"]
+    print(f"   Polling blocks: {', '.join(f'{s}-{s + c - 1}' for s, c in blocks)} ({len(blocks)} read(s) per poll)")
+    if profile["notes"]["diagnostic_registers"]:
+        print(f"   Diagnostic candidates: {', '.join(key.split('_')[0] for key in profile['notes']['diagnostic_registers'])}")
+    for finding in findings:
+        print(f"   ⚠️  {finding}")
+    print("   Copy it to custom_components/midea_heatpump_hws/models/custom/ and choose it in the setup flow")
+    return True
+
+def read_water_heater_registers(host, port, slave_id=1, test_mode=False, map_mode=False, block_size=MAX_BLOCK_SIZE,
+                                make_profile=None):
     """Read all water heater registers and display in a table"""
     
     print(f"🌡️  Water Heat Pump Status - {host}:{port}")
@@ -495,7 +1276,9 @@ def read_water_heater_registers(host, port, slave_id=1, test_mode=False, map_mod
         if map_mode:
             start_reg, end_reg = get_scan_range()
             if start_reg is not None and end_reg is not None:
-                scan_modbus_registers(client, start_reg, end_reg)
+                values = scan_modbus_registers(client, start_reg, end_reg, block_size)
+                if make_profile:
+                    write_draft_profile(make_profile, snapshot_observations(values), slave_id, port)
         
         return success_count > 0 or map_mode  # Consider map mode successful even if main registers failed
             
@@ -516,14 +1299,41 @@ Examples:
   python modbus_test.py 10.0.0.100 502 -s 2
   python modbus_test.py 192.168.1.80 502 -t    (enable test mode)
   python modbus_test.py 192.168.1.80 502 -m    (enable map/scan mode)
+  python modbus_test.py 192.168.1.80 502 -m -b 1    (map mode, one register per request)
+  python modbus_test.py 192.168.1.80 502 -a --tables hr,ir,co,di --units 1-3 --in-flight 4 --range 0-255
+  python modbus_test.py 192.168.1.80 502 -c modes.cap --ranges 0-10,100-120 --interval 0.5
+  python modbus_test.py --analyze modes.cap --by correlation --reference 1
+  python modbus_test.py 192.168.1.80 502 -a --range 0-255 --make-profile my_heater.json
+  python modbus_test.py --analyze modes.cap --make-profile my_heater.json
         """
     )
     
-    parser.add_argument('host', help='IP address of water heater')
-    parser.add_argument('port', type=int, help='Port number (typically 502)')
+    parser.add_argument('host', nargs='?', help='IP address of water heater')
+    parser.add_argument('port', nargs='?', type=int, help='Port number (typically 502)')
     parser.add_argument('-s', '--slave', type=int, default=1, help='Slave ID (default: 1)')
     parser.add_argument('-t', '--test', action='store_true', help='Enable test mode to write values to operating mode register')
     parser.add_argument('-m', '--map', action='store_true', help='Enable map mode to scan for available registers')
+    parser.add_argument('-a', '--async-scan', action='store_true',
+                        help='Async scan of several tables and unit ids with requests in flight')
+    parser.add_argument('--tables', default='hr',
+                        help='Tables for the async scan: hr, ir, co, di, comma separated (default: hr)')
+    parser.add_argument('--units', help="Unit ids for the async scan, e.g. '1,2,5-7' (default: the slave ID)")
+    parser.add_argument('--in-flight', type=int, default=1,
+                        help='Requests in flight during the async scan, one connection each (default: 1)')
+    parser.add_argument('--range', help="Address range for the async scan, e.g. '0-255' (default: ask)")
+    parser.add_argument('--timeout', type=float, default=1.0, help='Async scan request timeout in seconds (default: 1.0)')
+    parser.add_argument('-c', '--capture', metavar='FILE', help='Capture mode: sample --ranges into FILE and print changes')
+    parser.add_argument('--ranges', default='0-3,101-109', help="Register ranges to capture (default: 0-3,101-109)")
+    parser.add_argument('--interval', type=float, default=1.0, help='Capture interval in seconds (default: 1.0)')
+    parser.add_argument('--duration', type=float, help='Stop capturing after this many seconds (default: Ctrl+C)')
+    parser.add_argument('--analyze', metavar='FILE', help='Rank the registers of a capture file (no connection needed)')
+    parser.add_argument('--by', choices=['variance', 'correlation'], default='variance', help='Ranking for --analyze (default: variance)')
+    parser.add_argument('--reference', type=int, help='Reference register for --by correlation')
+    parser.add_argument('--top', type=int, default=20, help='Registers to show with --analyze (default: 20)')
+    parser.add_argument('--make-profile', metavar='FILE',
+                        help='Write a draft profile JSON inferred from the map scan, async scan or --analyze capture')
+    parser.add_argument('-b', '--block-size', type=int, default=MAX_BLOCK_SIZE,
+                        help=f'Registers per read in map mode, 1 for one register per request (default: {MAX_BLOCK_SIZE})')
     
     # Handle case where no arguments provided
     if len(sys.argv) == 1:
@@ -532,7 +1342,16 @@ Examples:
     
     args = parser.parse_args()
     
+    if args.analyze:
+        if args.by == "correlation" and args.reference is None:
+            print("❌ Error: --by correlation needs --reference")
+            sys.exit(1)
+        success = analyze_capture(args.analyze, args.by, args.reference, args.top, args.make_profile, args.port or 502)
+        sys.exit(0 if success else 1)
+    
     # Validate arguments
+    if args.host is None or args.port is None:
+        parser.error("host and port are required")
     if not (1 <= args.port <= 65535):
         print("❌ Error: Port must be between 1 and 65535")
         sys.exit(1)
@@ -543,7 +1362,45 @@ Examples:
         print("   Run them separately for best results")
         sys.exit(1)
     
-    success = read_water_heater_registers(args.host, args.port, args.slave, args.test, args.map)
+    if args.make_profile and not (args.map or args.async_scan):
+        print("❌ Error: --make-profile needs map mode (-m), an async scan (-a) or --analyze")
+        sys.exit(1)
+    
+    if not (1 <= args.block_size <= MAX_BLOCK_SIZE):
+        print(f"❌ Error: Block size must be between 1 and {MAX_BLOCK_SIZE}")
+        sys.exit(1)
+    
+    if args.capture:
+        try:
+            ranges = parse_ranges(args.ranges)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        success = capture_registers(args.host, args.port, args.slave, args.capture, ranges, args.interval, args.duration)
+        sys.exit(0 if success else 1)
+    
+    if args.async_scan:
+        tables = [table.strip() for table in args.tables.split(",") if table.strip()]
+        if not tables or any(table not in SCAN_TABLES for table in tables):
+            print(f"❌ Error: Tables must be among {', '.join(SCAN_TABLES)}")
+            sys.exit(1)
+        if args.range:
+            try:
+                start_reg, end_reg = (int(part) for part in args.range.split("-"))
+            except ValueError:
+                print("❌ Error: Range must look like 0-255")
+                sys.exit(1)
+        else:
+            start_reg, end_reg = get_scan_range()
+            if start_reg is None:
+                sys.exit(1)
+        units = parse_units(args.units) if args.units else [args.slave]
+        success = async_scan(args.host, args.port, units, tables, start_reg, end_reg,
+                             args.block_size, max(1, args.in_flight), args.timeout, args.make_profile)
+        sys.exit(0 if success else 1)
+    
+    success = read_water_heater_registers(args.host, args.port, args.slave, args.test, args.map, args.block_size,
+                                          args.make_profile)
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":